@@ -0,0 +1,84 @@
+"""Alarme sonore préchargée, à faible latence de déclenchement"""
+import os
+import threading
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_ALARM_FILE = "alarm.mp3"
+
+# Petit tampon mixer : démarrage du son plus rapide (au prix de plus de réveils audio)
+MIXER_FREQUENCY = 44100
+MIXER_BUFFER = 512
+
+# Profils de volume : (secondes depuis le déclenchement, volume de 0 à 1)
+VOLUME_PROFILES = {
+    "constant": [(0, 1.0)],
+    "ramp": [(0, 0.2), (1, 0.4), (2, 0.6), (3, 0.8), (4, 1.0)],
+    "escalate": [(0, 0.5), (15, 0.75), (30, 1.0)]
+}
+
+
+def resolve_sound_path(path):
+    """Chemin absolu du fichier son (relatif au dossier de l'application)"""
+    path = os.path.expanduser(path)
+    if os.path.isabs(path):
+        return path
+    return os.path.join(HERE, path)
+
+
+class AlarmPlayer:
+    """Son d'alarme décodé une seule fois en PCM (mixer.Sound) puis rejoué"""
+
+    def __init__(self, sound_file=DEFAULT_ALARM_FILE, profile="constant", buffer=MIXER_BUFFER):
+        if profile not in VOLUME_PROFILES:
+            raise ValueError(f"Profil de volume inconnu : {profile}")
+        self.sound_path = resolve_sound_path(sound_file)
+        self.profile = profile
+        self.buffer = buffer
+        self.mixer = None
+        self.sound = None
+        self.channel = None
+        self._ramp_stop = threading.Event()
+
+    def load(self):
+        """Ouverture du périphérique audio et décodage du fichier (idempotent)"""
+        if self.sound is not None:
+            return
+        from pygame import mixer
+
+        if not mixer.get_init():
+            mixer.pre_init(frequency=MIXER_FREQUENCY, size=-16, channels=2, buffer=self.buffer)
+            mixer.init()
+        self.mixer = mixer
+        self.sound = mixer.Sound(self.sound_path)
+
+    def play(self):
+        """Démarrage de l'alarme en boucle selon le profil de volume"""
+        self.load()
+        steps = VOLUME_PROFILES[self.profile]
+        self.sound.set_volume(steps[0][1])
+        self.channel = self.sound.play(loops=-1)
+
+        if len(steps) > 1:
+            self._ramp_stop = threading.Event()
+            threading.Thread(target=self._ramp, args=(steps, self._ramp_stop), daemon=True).start()
+
+    def _ramp(self, steps, stopped):
+        """Montée du volume par paliers, interrompue par stop()"""
+        elapsed = steps[0][0]
+        for at, volume in steps[1:]:
+            if stopped.wait(at - elapsed):
+                return
+            elapsed = at
+            self.sound.set_volume(volume)
+
+    def stop(self):
+        self._ramp_stop.set()
+        if self.sound is not None:
+            self.sound.stop()
+
+    def quit(self):
+        self.stop()
+        if self.mixer is not None:
+            self.mixer.quit()
+            self.mixer = None
+            self.sound = None
@@ -0,0 +1,879 @@
+"""Mesures de performance de Computer-Alarm
+
+Usage : python bench.py [startup|cards|audio|scheduler|sampling|latency|throughput|soak|flaky|control|incidents|notifications|flash|charts|openmetrics|instrumentation|supervisor|power ...]
+
+Chaque mesure compare son résultat à un seuil (ou à l'ancienne
+implémentation) et le code de sortie vaut 1 si l'un d'eux est manqué ;
+une mesure ignorée faute d'écran ou de périphérique audio ne compte pas.
+"""
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from replay import (
+    EventRecorder, NullAlarmPlayer, TracePowerSource, VirtualClock, flaky_trace, replay, unplug_trace
+)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Objectif : démarrage à froid jusqu'à « armé » en mode headless
+STARTUP_TARGET_SECONDS = 0.5
+
+# Seuils des autres mesures
+LATENCY_TARGET_SECONDS = 0.1  # débranchement -> alarme avec réveil uevent (anti-rebond compris)
+REPLAY_SPEEDUP_TARGET = 100  # secondes simulées par seconde réelle
+SOAK_GROWTH_TARGET = 256 * 1024  # octets gagnés entre le premier et le dernier jour
+CONTROL_EMIT_TARGET = 50e-6  # coût d'une émission côté moteur, abonnés du socket compris
+INCIDENT_QUERY_TARGET = 1e-3  # p99 d'une requête sur l'historique des incidents
+CHART_DECIMATE_TARGET = 0.1  # décimation de 24 h d'historique
+OPENMETRICS_RENDER_TARGET = 0.005
+SPAN_DISABLED_TARGET = 1e-6
+SPAN_ENABLED_TARGET = 5e-6
+QUANTILE_ERROR_TARGET = 0.032  # précision de l'histogramme (2**-5)
+SUPERVISOR_RESTART_TARGET = 1.0  # kill -9 -> nouveau moniteur armé (médiane)
+
+
+def check(ok, message):
+    """0 si le seuil est tenu, sinon 1 et le message d'échec"""
+    if not ok:
+        print(f"ÉCHEC : {message}", file=sys.stderr)
+    return 0 if ok else 1
+
+
+def bench_startup(runs=5):
+    """Temps d'import (style -X importtime) et délai jusqu'à l'état armé"""
+    timings = []
+    imports = {}
+    # Configuration et journaux jetables : ni ~/.config ni ~/.security_logs ne sont touchés
+    with tempfile.TemporaryDirectory() as tmp:
+        config = os.path.join(tmp, "config.toml")
+        with open(config, "w") as f:
+            f.write(f'log_dir = "{tmp}"\nsound_enabled = false\n')
+        for _ in range(runs):
+            start = time.perf_counter()
+            proc = subprocess.Popen(
+                [sys.executable, "-X", "importtime", os.path.join(HERE, "alarm.py"),
+                 "--headless", "--config", config, "--exit-when-armed"],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                cwd=HERE
+            )
+            line = proc.stdout.readline()
+            elapsed = time.perf_counter() - start
+            _, stderr = proc.communicate()
+            if line.strip() != "armed":
+                print(f"échec du démarrage (code {proc.returncode}):\n{stderr}", file=sys.stderr)
+                return 1
+            timings.append(elapsed)
+
+            # Lignes « import time: self | cumulative | package »
+            for match in re.finditer(r"import time:\s+\d+\s+\|\s+(\d+)\s+\|\s?( *)(\S+)", stderr):
+                cumulative, indent, name = match.groups()
+                if not indent:
+                    imports[name] = max(imports.get(name, 0), int(cumulative))
+
+    print("Imports de premier niveau les plus coûteux (µs cumulées):")
+    for name, cumulative in sorted(imports.items(), key=lambda item: -item[1])[:10]:
+        print(f"  {cumulative:>8}  {name}")
+
+    best = min(timings)
+    print(f"Démarrage à froid -> armé : min {best * 1000:.0f} ms, "
+          f"max {max(timings) * 1000:.0f} ms (objectif {STARTUP_TARGET_SECONDS * 1000:.0f} ms)")
+    return check(best <= STARTUP_TARGET_SECONDS, f"démarrage en {best * 1000:.0f} ms")
+
+
+class CountingTk:
+    """Mandataire de l'interpréteur Tcl qui compte les appels émis"""
+
+    def __init__(self, tk):
+        self._tk = tk
+        self.calls = 0
+
+    def call(self, *args):
+        self.calls += 1
+        return self._tk.call(*args)
+
+    def __getattr__(self, name):
+        return getattr(self._tk, name)
+
+
+def bench_cards(ticks=100):
+    """Appels Tcl par tick de update_metrics : parcours grid_slaves vs cartes en cache"""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = None
+        try:
+            from config import Config
+            from engine import MonitorEngine
+            from gui import SecurityMonitorGUI
+            engine = MonitorEngine(Config(log_dir=tmp, sound_enabled=False), player=NullAlarmPlayer())
+            app = SecurityMonitorGUI(engine)
+        except Exception as e:
+            print(f"ignoré (interface indisponible : {e})")
+            if engine is not None:
+                engine.shutdown()
+            return 0
+
+        counter = CountingTk(app.root.tk)
+        pending = [app.root]
+        while pending:
+            widget = pending.pop()
+            widget.tk = counter
+            pending.extend(widget.winfo_children())
+
+        def legacy_update(index, value):
+            metrics_frame = app.root.grid_slaves(row=1, column=1)[0].grid_slaves(row=0, column=0)[0]
+            card = metrics_frame.grid_slaves(column=index)[0]
+            card.pack_slaves()[1].configure(text=value)
+
+        counter.calls = 0
+        for _ in range(ticks):
+            app.cpu_label.configure(text="CPU: 1.0%")
+            app.memory_label.configure(text="RAM: 1.0%")
+            for index in range(3):
+                legacy_update(index, "1.0%")
+        legacy = counter.calls / ticks
+
+        counter.calls = 0
+        for _ in range(ticks):
+            app.update_metrics()
+        cached = counter.calls / ticks
+
+        app.root.destroy()
+        engine.shutdown()
+
+    print(f"Appels Tcl par tick : parcours grid_slaves {legacy:.1f}, "
+          f"cartes en cache {cached:.1f} (after() et échantillonnage inclus)")
+    return check(cached < legacy, "les cartes en cache émettent autant d'appels Tcl que le parcours")
+
+
+def bench_audio(runs=20):
+    """Coût de l'appel de déclenchement dans le thread de surveillance, pilote SDL factice
+
+    Compare l'ancien chemin (mixer.music.load + play à chaque alerte) au
+    son préchargé d'AlarmPlayer. Le pilote factice ne produit aucun son :
+    le délai jusqu'au haut-parleur n'est pas mesurable ici, seule sa borne
+    due au tampon du mixer (taille / fréquence) est indiquée, calculée.
+    """
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    try:
+        from pygame import mixer
+        from audio import AlarmPlayer
+        player = AlarmPlayer()
+        player.load()
+    except Exception as e:
+        print(f"ignoré (audio indisponible : {e})")
+        return 0
+
+    def measure(trigger, stop):
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            trigger()
+            samples.append(time.perf_counter() - start)
+            stop()
+        samples.sort()
+        return samples[len(samples) // 2], samples[-1]
+
+    def legacy_trigger():
+        mixer.music.load(player.sound_path)
+        mixer.music.play(-1)
+
+    legacy = measure(legacy_trigger, mixer.music.stop)
+    preloaded = measure(player.play, player.stop)
+    frequency = mixer.get_init()[0]
+    player.quit()
+
+    print(f"Appel de déclenchement, mixer.music.load + play : médiane {legacy[0] * 1e6:.0f} µs, "
+          f"max {legacy[1] * 1e6:.0f} µs")
+    print(f"Appel de déclenchement, son préchargé (PCM)     : médiane {preloaded[0] * 1e6:.0f} µs, "
+          f"max {preloaded[1] * 1e6:.0f} µs")
+    print(f"Tampon du mixer : {player.buffer} trames à {frequency} Hz, "
+          f"soit {player.buffer / frequency * 1000:.1f} ms de latence ajoutée par ce tampon (calculée, non mesurée)")
+    return check(preloaded[0] <= legacy[0], "le son préchargé se déclenche plus lentement que mixer.music")
+
+
+def bench_scheduler(seconds=3600):
+    """Réveils par seconde : minuteries indépendantes vs ordonnanceur aligné (alarme en cours)"""
+    from scheduler import Scheduler
+
+    # Ancien modèle : chaque boucle root.after / sleep avec sa propre phase
+    legacy_timers = {
+        "update_metrics": (1.0, 0.13),
+        "flash_warning": (0.5, 0.31),
+        "check_security": (1.0, 0.77),
+        "process_ui_queue": (0.05, 0.02)
+    }
+    instants = set()
+    for interval, phase in legacy_timers.values():
+        t = phase
+        while t < seconds:
+            instants.add(round(t, 6))
+            t += interval
+    legacy = len(instants) / seconds
+
+    clock = VirtualClock()
+    scheduler = Scheduler(clock=clock)
+    scheduler.add("metrics", 1.0, lambda: None, backoff=True)
+    scheduler.add("flash", 0.5, lambda: None)
+    scheduler.add("elapsed", 1.0, lambda: None)
+    scheduler.add("ui", 0.05, lambda: 0.25)  # file UI vide : cadence ralentie (réveil immédiat sur alerte)
+    scheduler.started = clock.now
+    end = clock.now + seconds
+    while clock.now < end:
+        clock.now += scheduler.run_pending()
+    stats = scheduler.stats()
+
+    print(f"Minuteries indépendantes : {legacy:.1f} réveils/s")
+    print(f"Ordonnanceur aligné      : {stats['wakeups_per_second']:.1f} réveils/s "
+          f"({stats['runs_per_wakeup']:.2f} tâches par réveil)")
+    return check(stats["wakeups_per_second"] < legacy, "l'ordonnanceur aligné ne réduit pas les réveils")
+
+
+def bench_sampling(hours=1):
+    """Temps CPU par heure : relevé fixe chaque seconde vs cadence adaptative
+
+    Fenêtre réduite, surveillance désarmée, métriques stables : le cas
+    le plus courant sur un poste qui tourne toute la journée.
+    """
+    from metrics import AdaptiveSampler
+
+    try:
+        from metrics import collect_sample
+        collect_sample()
+        runs = 200
+        start = time.process_time()
+        for _ in range(runs):
+            collect_sample()
+        cost = (time.process_time() - start) / runs
+    except ImportError as e:
+        print(f"coût par relevé non mesuré ({e}), comptage seul")
+        cost = None
+
+    stable = {"cpu": 3.0, "memory": 41.0, "battery": 87.0, "plugged": True}
+    sampler = AdaptiveSampler()
+    elapsed = 0.0
+    adaptive = 0
+    while elapsed < hours * 3600:
+        elapsed += sampler.next_interval(stable, active=False)
+        adaptive += 1
+    fixed = int(hours * 3600 / sampler.min_interval)
+
+    for label, count in (("Cadence fixe (1 s)", fixed), ("Cadence adaptative", adaptive)):
+        line = f"{label:<20}: {count / hours:.0f} relevés/h"
+        if cost is not None:
+            line += f", {count * cost / hours * 1000:.1f} ms CPU/h"
+        print(line)
+    return check(adaptive < fixed, "la cadence adaptative ne réduit pas le nombre de relevés")
+
+
+def run_trace(trace, seconds, keep=True, wake_on_event=True, prepare=None):
+    """Rejeu d'une trace dans un moteur headless (son et notifications factices)"""
+    from config import Config
+    from engine import MonitorEngine
+
+    clock = VirtualClock()
+    source = TracePowerSource(trace, clock)
+    player = NullAlarmPlayer(clock)
+    recorder = EventRecorder(clock, keep=keep)
+    with tempfile.TemporaryDirectory() as log_dir:
+        engine = MonitorEngine(Config(log_dir=log_dir), clock=clock, player=player,
+                               power_source_factory=lambda: source)
+        engine.subscribe(recorder)
+        replay(engine, source, clock, seconds, wake_on_event, prepare)
+        engine.shutdown()
+    return engine, source, player, recorder
+
+
+def bench_latency(runs=20):
+    """Latence simulée débranchement -> alarme : réveil uevent vs polling à 1 s"""
+    results = {}
+    for label, wake in (("Réveil sur uevent", True), ("Polling 1 s", False)):
+        latencies = []
+        for run in range(runs):
+            at = 10.0 + run * 0.0537  # phases variées par rapport à la grille
+            _, source, player, _ = run_trace(unplug_trace(at=at), at + 10.0, wake_on_event=wake)
+            latencies.append(player.plays[0] - source.times[1])
+        latencies.sort()
+        results[wake] = latencies
+        print(f"{label:<18}: médiane {latencies[len(latencies) // 2] * 1000:.0f} ms, "
+              f"max {latencies[-1] * 1000:.0f} ms")
+    uevent, polling = results[True], results[False]
+    return (check(uevent[-1] <= LATENCY_TARGET_SECONDS, f"alarme uevent en {uevent[-1] * 1000:.0f} ms")
+            | check(uevent[-1] < polling[len(polling) // 2], "le réveil uevent n'est pas plus rapide que le polling"))
+
+
+def bench_throughput(seconds=3600):
+    """Événements d'alimentation traités par seconde réelle (trace instable d'une heure)"""
+    trace = flaky_trace(seconds, period=0.5)
+    start = time.perf_counter()
+    _, _, _, recorder = run_trace(trace, seconds, keep=False)
+    elapsed = time.perf_counter() - start
+    print(f"{len(trace)} changements, {sum(recorder.counts.values())} événements moteur "
+          f"en {elapsed:.2f} s : {len(trace) / elapsed:.0f} changements/s, "
+          f"accélération x{seconds / elapsed:.0f}")
+    return check(seconds / elapsed >= REPLAY_SPEEDUP_TARGET, f"rejeu accéléré x{seconds / elapsed:.0f} seulement")
+
+
+def bench_soak(days=7):
+    """Croissance mémoire sur une surveillance simulée de plusieurs jours
+
+    Le moteur tourne avec un historique de métriques de 6 h alimenté par
+    l'échantillonneur adaptatif, comme la GUI via update_metrics.
+    """
+    from metrics import AdaptiveSampler, MetricsHistory
+
+    seconds = days * 86400
+    trace = unplug_trace(at=3600.0, duration=600.0) + [
+        (t, state) for t, state in flaky_trace(seconds, period=600.0, seed=1) if t > 4200.0
+    ]
+    trace.sort(key=lambda item: item[0])
+    history = MetricsHistory()
+    sampler = AdaptiveSampler()
+    snapshots = []
+
+    def add_metrics(engine):
+        def update_metrics():
+            power = engine.readings.get("power")
+            battery = power.percent if power is not None else None
+            history.append(3.0, 41.0, battery, timestamp=engine.clock())
+            if int(engine.clock()) // 86400 > len(snapshots):
+                snapshots.append(tracemalloc.get_traced_memory()[0])
+            return sampler.next_interval({"cpu": 3.0, "memory": 41.0, "battery": battery}, False)
+        engine.scheduler.add("metrics", 1.0, update_metrics)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    engine, _, player, recorder = run_trace(trace, seconds, keep=False, prepare=add_metrics)
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+
+    growth = snapshots[-1] - snapshots[0] if len(snapshots) > 1 else 0
+    print(f"{days} jours simulés en {elapsed:.1f} s : {recorder.counts.get('elapsed', 0)} ticks, "
+          f"{engine.incident_count} incident(s), {len(player.plays)} alarme(s)")
+    print("Mémoire suivie par jour (Kio) : "
+          + ", ".join(f"{size / 1024:.0f}" for size in snapshots)
+          + f" ; croissance jour 1 -> {len(snapshots)} : {growth / 1024:+.1f} Kio")
+    return check(growth <= SOAK_GROWTH_TARGET, f"mémoire en hausse de {growth / 1024:.0f} Kio")
+
+
+def bench_flaky(seconds=86400):
+    """Taux de faux déclenchements sur un contact de chargeur instable (24 h)"""
+    trace = flaky_trace(seconds)
+    glitches = (len(trace) - 1) // 2
+    engine, _, player, _ = run_trace(trace, seconds, keep=False)
+    rate = engine.incident_count / glitches if glitches else 0.0
+    print(f"{glitches} micro-coupures : {engine.state_machine.glitches} filtrées, "
+          f"{engine.incident_count} incident(s), {len(player.plays)} alarme(s) "
+          f"-> faux déclenchements {rate:.2%}")
+    return check(engine.incident_count == 0, f"{engine.incident_count} faux déclenchement(s)")
+
+
+def bench_control(subscribers=200, events=2000):
+    """Coût côté moteur de la diffusion d'événements à de nombreux abonnés du socket de contrôle"""
+    import json
+    import socket
+    from config import Config
+    from control import ControlServer
+    from engine import MonitorEngine
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = MonitorEngine(Config(log_dir=tmp), player=NullAlarmPlayer())
+        server = ControlServer(engine, os.path.join(tmp, "control.sock"))
+        server.start()
+        clients = []
+        for _ in range(subscribers):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(server.path)
+            sock.sendall(b'{"jsonrpc": "2.0", "id": 1, "method": "subscribe"}\n')
+            stream = sock.makefile("r", encoding="utf-8")
+            json.loads(stream.readline())
+            clients.append((sock, stream))
+
+        start = time.perf_counter()
+        for i in range(events):
+            engine.emit("elapsed", text=str(i))
+        emitted = time.perf_counter() - start
+        engine.emit("stopped")
+        for _, stream in clients:
+            while json.loads(stream.readline())["params"]["event"] != "stopped":
+                pass
+        delivered = time.perf_counter() - start
+
+        for sock, stream in clients:
+            stream.close()
+            sock.close()
+        server.stop()
+        engine.shutdown()
+
+    print(f"{subscribers} abonnés, {events} événements : émission {emitted / events * 1e6:.1f} µs/événement "
+          f"côté moteur, diffusion complète en {delivered:.2f} s")
+    return check(emitted / events <= CONTROL_EMIT_TARGET, f"émission à {emitted / events * 1e6:.1f} µs/événement")
+
+
+def bench_incidents(rows=300000, days=365, runs=1000):
+    """Requêtes « incidents des N derniers jours » sur une base de plusieurs centaines de milliers de lignes
+
+    Le seuil porte sur le p99 du temps CPU de chaque requête (utilisateur et
+    système, base en cache) : sur une machine partagée, le temps écoulé
+    compte aussi les préemptions par d'autres processus. Il est affiché à côté.
+    """
+    import random
+    from incidents import IncidentStore
+
+    rng = random.Random(0)
+    now = time.time()
+    sensors = ("power", "lid", "usb", "network", "temperature")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = IncidentStore(os.path.join(tmp, "incidents.db"))
+        start = time.perf_counter()
+        with store._lock:
+            store._db.execute("BEGIN")
+            store._db.executemany(
+                "INSERT INTO incidents (started, ended, sensor, message, cleared_by, metrics) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (t, t + rng.uniform(1, 600), rng.choice(sensors), "Alimentation compromise!",
+                     "user", '{"readings": {"power": {"plugged": false, "percent": 80.0}}}')
+                    for t in sorted(now - rng.uniform(0, days * 86400) for _ in range(rows))
+                )
+            )
+            store._db.execute("COMMIT")
+        print(f"{rows} incidents insérés en {time.perf_counter() - start:.1f} s")
+
+        queries = (
+            ("recent(1)", lambda: store.recent(1, now=now)),
+            ("recent(7, limit=100)", lambda: store.recent(7, now=now)),
+            ("recent(30, 'lid')", lambda: store.recent(30, "lid", now=now)),
+            ("recent(7) + lectures", lambda: store.recent(7, now=now, with_metrics=True)),
+            ("count(7)", lambda: store.count(7, now=now)),
+            ("count(30, 'usb')", lambda: store.count(30, "usb", now=now))
+        )
+        status = 0
+        for label, query in queries:
+            # Premiers appels hors mesure : pages de la base pas encore en cache
+            for _ in range(runs // 10):
+                query()
+            samples = []
+            cpu_samples = []
+            for _ in range(runs):
+                start, cpu_start = time.perf_counter(), time.process_time()
+                query()
+                cpu_samples.append(time.process_time() - cpu_start)
+                samples.append(time.perf_counter() - start)
+            samples.sort()
+            cpu_samples.sort()
+            p99 = cpu_samples[int(runs * 0.99)]
+            print(f"  {label:<22}: médiane {samples[runs // 2] * 1000:.3f} ms, p99 {p99 * 1000:.3f} ms CPU "
+                  f"({samples[int(runs * 0.99)] * 1000:.3f} ms écoulées)")
+            status |= check(p99 <= INCIDENT_QUERY_TARGET, f"{label} : p99 {p99 * 1000:.1f} ms CPU")
+        store.close_db()
+    return status
+
+
+def bench_notifications(events=100):
+    """Fenêtres créées pour une rafale d'événements : un Toplevel par toast vs pool regroupé"""
+    from notifications import TOAST_POOL_SIZE, NotificationManager, NullBackend
+    from scheduler import Scheduler
+
+    clock = VirtualClock()
+    scheduler = Scheduler(clock=clock)
+    try:
+        import tkinter as tk
+        from gui import ToastPool
+        root = tk.Tk()
+        backend = ToastPool(root, scheduler)
+    except Exception as e:
+        print(f"affichage indisponible ({e}) : pool de fenêtres simulé")
+        root = None
+        backend = NullBackend()
+    manager = NotificationManager(backend, scheduler)
+
+    # Rafale : bascules armé / désarmé rapides, une toutes les 10 ms
+    for i in range(events):
+        manager.notify_event("started" if i % 2 == 0 else "stopped")
+        clock.now += 0.01
+        scheduler.run_pending()
+    while "notifications" in scheduler.tasks:
+        clock.now += scheduler.next_timeout()
+        scheduler.run_pending()
+
+    if root is not None:
+        windows = backend.created
+        root.destroy()
+    else:
+        windows = min(len(backend.shown), TOAST_POOL_SIZE)
+    print(f"{events} événements : ToastNotification {events} fenêtres créées ; "
+          f"gestionnaire {manager.shown} affichage(s), {windows} fenêtre(s) créée(s)")
+    return check(windows <= TOAST_POOL_SIZE, f"{windows} fenêtres créées pour un pool de {TOAST_POOL_SIZE}")
+
+
+def bench_flash(lines=2000, flashes=50):
+    """Coût de redessin Tk par image d'alerte : fond du journal reconfiguré vs bandeau superposé"""
+    try:
+        import tkinter as tk
+        from gui import AlertBanner
+        from scheduler import Scheduler
+        root = tk.Tk()
+    except Exception as e:
+        print(f"ignoré (affichage indisponible : {e})")
+        return 0
+
+    root.geometry("1024x768")
+    text = tk.Text(root, wrap=tk.WORD, bg="#2b3e50", fg="#ffffff", font=("Consolas", 10))
+    text.pack(fill="both", expand=True)
+    text.insert("end", "".join(f"[12:00:{i % 60:02d}] ℹ️ Entrée de journal numéro {i}\n" for i in range(lines)))
+    banner = AlertBanner(root, Scheduler())
+    root.update()
+
+    def measure(flash):
+        start = time.perf_counter()
+        for i in range(flashes):
+            flash(i)
+            root.update_idletasks()
+        return (time.perf_counter() - start) / flashes
+
+    legacy = measure(lambda i: text.configure(background="#3B1A1A" if i % 2 else "#2b3e50"))
+    text.configure(background="#2b3e50")
+    banner.show("Alimentation compromise!")
+    root.update()
+    overlay = measure(lambda i: banner.animate())
+    banner.hide()
+    root.destroy()
+
+    print(f"Journal de {lines} lignes : fond du Text {legacy * 1000:.2f} ms/image, "
+          f"bandeau {overlay * 1000:.2f} ms/image")
+    return check(overlay < legacy, "le bandeau coûte autant que le redessin du journal")
+
+
+def bench_charts(samples=2000):
+    """Rendu des mini-graphiques : décimation min / max (1 h, 24 h) et coût Canvas par échantillon"""
+    from charts import CHART_WIDTH
+    from metrics import MetricsHistory
+
+    now = 1_000_000.0
+    status = 0
+    for seconds in (3600, 86400):
+        history = MetricsHistory(hours=24)
+        for i in range(seconds):
+            history.append(50 + 40 * ((i * 7919) % 100) / 100, 40, 80, timestamp=now - seconds + i + 1)
+        start = time.perf_counter()
+        history.decimate("cpu", seconds, CHART_WIDTH, now)
+        elapsed = time.perf_counter() - start
+        print(f"Décimation de {seconds} échantillons en {CHART_WIDTH} colonnes : {elapsed * 1000:.1f} ms")
+        status |= check(elapsed <= CHART_DECIMATE_TARGET, f"décimation de {seconds} s en {elapsed * 1000:.0f} ms")
+
+    try:
+        import tkinter as tk
+        from charts import Sparkline
+        root = tk.Tk()
+    except Exception as e:
+        print(f"ignoré (affichage indisponible : {e})")
+        return status
+
+    history = MetricsHistory(hours=24)
+    for i in range(3600):
+        history.append(50, 40, 80, timestamp=now - 3600 + i + 1)
+    chart = Sparkline(root, history, "cpu")
+    chart.canvas.pack()
+    chart.rebuild(now)
+    root.update()
+
+    def measure(draw):
+        start = time.perf_counter()
+        for i in range(samples):
+            t = now + i + 1
+            value = 50 + 40 * ((i * 7919) % 100) / 100
+            history.append(value, 40, 80, timestamp=t)
+            draw(value, t)
+            root.update_idletasks()
+        return (time.perf_counter() - start) / samples
+
+    operations = chart.operations
+    incremental = measure(chart.add)
+    incremental_ops = (chart.operations - operations) / samples
+    now += samples
+    full = measure(lambda value, t: chart.rebuild(t))
+    root.destroy()
+
+    print(f"Incrémental {incremental * 1000:.3f} ms/échantillon ({incremental_ops:.2f} appels Canvas), "
+          f"redessin complet {full * 1000:.3f} ms/échantillon ({CHART_WIDTH} segments)")
+    return status | check(incremental < full, "l'ajout incrémental coûte autant qu'un redessin complet")
+
+
+def bench_openmetrics(scrapes=500, renders=200):
+    """Collectes OpenMetrics en rafale : rendu à chaque requête vs rendu en cache par intervalle"""
+    import urllib.request
+    from config import Config
+    from engine import MonitorEngine
+    from instrumentation import instruments, span
+    from openmetrics import MetricsExporter
+
+    # Rendu le plus coûteux : avec les histogrammes des sections critiques (comme sous --profile)
+    instruments.enable()
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = MonitorEngine(Config(log_dir=tmp), player=NullAlarmPlayer())
+        exporter = MetricsExporter(engine)
+        port = exporter.serve(0)
+
+        start = time.perf_counter()
+        for _ in range(renders):
+            exporter.render()
+        render = (time.perf_counter() - start) / renders
+
+        start = time.perf_counter()
+        for _ in range(renders * 10):
+            with span("check_security"):
+                pass
+        observe = (time.perf_counter() - start) / (renders * 10)
+
+        exporter.renders = 0
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{port}/metrics", headers={"Accept": "application/openmetrics-text"}
+        )
+        start = time.perf_counter()
+        for _ in range(scrapes):
+            with urllib.request.urlopen(request) as response:
+                body = response.read()
+        elapsed = time.perf_counter() - start
+        exporter.stop()
+        engine.shutdown()
+    instruments.enable(False)
+
+    print(f"Rendu complet {render * 1000:.2f} ms, section mesurée {observe * 1e6:.2f} µs "
+          f"(par itération de la boucle)")
+    print(f"{scrapes} collectes HTTP en {elapsed:.2f} s ({scrapes / elapsed:.0f}/s) : "
+          f"{exporter.renders} rendu(s) au lieu de {scrapes}, {len(body)} octets")
+    expected = 1 + int(elapsed / exporter.interval)
+    return (check(render <= OPENMETRICS_RENDER_TARGET, f"rendu en {render * 1000:.2f} ms")
+            | check(exporter.renders <= expected, f"{exporter.renders} rendus pour {expected} intervalles"))
+
+
+def bench_instrumentation(calls=200000, samples=100000):
+    """Surcoût d'une section mesurée (désactivée / activée) et précision des quantiles"""
+    import random
+    from instrumentation import Instrumentation, LatencyHistogram
+
+    instruments = Instrumentation()
+
+    def measure():
+        start = time.perf_counter()
+        for _ in range(calls):
+            with instruments.span("bench"):
+                pass
+        return (time.perf_counter() - start) / calls
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        pass
+    bare = (time.perf_counter() - start) / calls
+    disabled = measure()
+    instruments.enable()
+    enabled = measure()
+    print(f"Section vide : désactivée {(disabled - bare) * 1e9:.0f} ns, activée {(enabled - bare) * 1e9:.0f} ns")
+
+    rng = random.Random(0)
+    values = sorted(rng.lognormvariate(-7, 1) for _ in range(samples))
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.observe(value)
+    errors = {}
+    for q in (0.5, 0.9, 0.99, 0.999):
+        exact = values[min(samples - 1, int(q * samples))]
+        errors[f"p{q * 100:g}"] = abs(histogram.quantile(q) - exact) / exact
+    print(f"Erreur relative des quantiles ({samples} mesures log-normales) : "
+          + ", ".join(f"{name} {error:.1%}" for name, error in errors.items()))
+    return (check(disabled - bare <= SPAN_DISABLED_TARGET, f"section désactivée {(disabled - bare) * 1e9:.0f} ns")
+            | check(enabled - bare <= SPAN_ENABLED_TARGET, f"section activée {(enabled - bare) * 1e9:.0f} ns")
+            | check(max(errors.values()) <= QUANTILE_ERROR_TARGET, f"erreur de quantile {max(errors.values()):.1%}"))
+
+
+def bench_supervisor(runs=5, hang_timeout=1.5):
+    """Délai de relance jusqu'à l'état armé : moniteur tué (kill -9) puis figé (SIGSTOP)"""
+    import logging
+    import signal
+    import threading
+    from supervisor import HEARTBEAT_INTERVAL, Supervisor
+
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as tmp:
+        config = os.path.join(tmp, "config.toml")
+        with open(config, "w") as f:
+            f.write(f'log_dir = "{tmp}"\nsound_enabled = false\n')
+        supervisor = Supervisor(["--headless", "--config", config], hang_timeout=hang_timeout)
+        thread = threading.Thread(target=supervisor.run, daemon=True)
+        thread.start()
+
+        def rearmed(pid, timeout=30.0):
+            """Attente d'un nouveau moniteur armé (ou en alarme) ; durée depuis l'appel"""
+            start = time.perf_counter()
+            while (supervisor.child is None or supervisor.child.pid == pid
+                   or supervisor.state not in ("armed", "alarming")):
+                if time.perf_counter() - start > timeout:
+                    raise TimeoutError("moniteur non relancé")
+                time.sleep(0.001)
+            return time.perf_counter() - start
+
+        results = {}
+        try:
+            rearmed(None)
+            for label, sig in (("kill -9", signal.SIGKILL), ("SIGSTOP", signal.SIGSTOP)):
+                timings = []
+                for _ in range(runs):
+                    time.sleep(0.3)
+                    pid = supervisor.child.pid
+                    os.kill(pid, sig)
+                    timings.append(rearmed(pid))
+                timings.sort()
+                results[label] = timings
+        finally:
+            supervisor.stop()
+            thread.join(timeout=10)
+    logging.disable(logging.NOTSET)
+
+    for label, timings in results.items():
+        print(f"{label:<8}: relance armée en médiane {timings[len(timings) // 2] * 1000:.0f} ms, "
+              f"max {timings[-1] * 1000:.0f} ms ({runs} essais)")
+    print(f"(blocage détecté après {hang_timeout} s sans battement ; HANG_TIMEOUT par défaut plus long)")
+    killed, stopped = results["kill -9"], results["SIGSTOP"]
+    hang_target = hang_timeout + 2 * HEARTBEAT_INTERVAL
+    return (check(killed[len(killed) // 2] <= SUPERVISOR_RESTART_TARGET,
+                  f"relance après kill -9 en {killed[len(killed) // 2] * 1000:.0f} ms")
+            | check(stopped[-1] <= hang_target, f"blocage détecté en {stopped[-1]:.1f} s (seuil {hang_target:.1f} s)"))
+
+
+def make_power_supply_tree(root):
+    """Arborescence sysfs factice : deux batteries, secteur, USB-C, batterie de souris"""
+    supplies = {
+        "AC": {"type": "Mains", "online": "1"},
+        "BAT0": {"type": "Battery", "scope": "System", "capacity": "81", "status": "Charging",
+                 "energy_full": "57000000", "energy_now": "46170000", "power_now": "0",
+                 "voltage_now": "12400000", "manufacturer": "SMP", "model_name": "5B10W13930"},
+        "BAT1": {"type": "Battery", "scope": "System", "capacity": "64", "status": "Charging",
+                 "energy_full": "23000000", "energy_now": "14720000", "power_now": "0",
+                 "voltage_now": "11800000", "manufacturer": "SMP", "model_name": "01AV491"},
+        "ucsi-source-psy-USBC000:001": {"type": "USB", "online": "0", "usb_type": "C [PD] PD_PPS"},
+        "hidpp_battery_0": {"type": "Battery", "scope": "Device", "capacity": "40", "status": "Discharging"},
+    }
+    for name, attributes in supplies.items():
+        os.makedirs(os.path.join(root, name))
+        for attr, value in attributes.items():
+            with open(os.path.join(root, name, attr), "w") as f:
+                f.write(value + "\n")
+
+
+def bench_power(ticks=2000):
+    """Lecture de l'alimentation par tick : implémentation précédente vs descripteurs ouverts et pread
+
+    Avant le modèle partagé, chaque tick lisait l'alimentation deux fois sur
+    le même sysfs : UeventPowerSource.read() pour la détection (parcours du
+    dossier, type puis capacité ou état de chaque alimentation) et
+    psutil.sensors_battery() pour les métriques. Les deux passent ici sur la
+    même arborescence factice, psutil y étant redirigé.
+    """
+    from unittest import mock
+    from power import PowerState, PowerSupplies
+
+    try:
+        import psutil
+        from psutil import _pslinux
+    except ImportError:
+        print("psutil (Linux) absent : pas de référence à mesurer")
+        return 0
+
+    def read_attr(path, attr):
+        try:
+            with open(os.path.join(path, attr)) as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    def previous_read(root):
+        """UeventPowerSource.read() d'avant le modèle partagé (moyenne non pondérée)"""
+        plugged = None
+        capacities = []
+        for name in sorted(os.listdir(root)):
+            path = os.path.join(root, name)
+            if read_attr(path, "type") == "Battery":
+                capacity = read_attr(path, "capacity")
+                if capacity is not None:
+                    capacities.append(float(capacity))
+            else:
+                online = read_attr(path, "online")
+                if online is not None:
+                    plugged = bool(plugged) or online == "1"
+        return PowerState(plugged, sum(capacities) / len(capacities) if capacities else None)
+
+    with tempfile.TemporaryDirectory() as root:
+        make_power_supply_tree(root)
+
+        with mock.patch.object(_pslinux, "POWER_SUPPLY_PATH", root):
+            battery = psutil.sensors_battery()
+            start = time.perf_counter()
+            for _ in range(ticks):
+                previous_read(root)
+                psutil.sensors_battery()
+            legacy = (time.perf_counter() - start) / ticks
+        previous = previous_read(root)
+
+        clock = VirtualClock()
+        supplies = PowerSupplies(root, clock=clock)
+        start = time.perf_counter()
+        for _ in range(ticks):
+            supplies.snapshot()
+            supplies.snapshot()
+            clock.now += 1.0
+        shared = (time.perf_counter() - start) / ticks
+        state = supplies.snapshot()
+        reads = supplies.reads
+        supplies.close()
+
+    print(f"{len(state.supplies)} alimentations, secteur {state.plugged}, charge {state.percent:.1f}% "
+          f"(pondérée, batterie de souris exclue) ; avant : {previous.percent:.1f}% (moyenne simple), "
+          f"psutil : {battery.percent:.1f}% (première batterie seule)")
+    print(f"Implémentation précédente (read + sensors_battery) : {legacy * 1e6:.0f} µs/tick ; "
+          f"modèle partagé (pread) : {shared * 1e6:.0f} µs/tick, {reads} relectures pour {ticks} ticks")
+    return check(shared < legacy, "le modèle partagé n'est pas plus rapide que l'implémentation précédente")
+
+
+BENCHMARKS = {
+    "startup": bench_startup,
+    "cards": bench_cards,
+    "audio": bench_audio,
+    "scheduler": bench_scheduler,
+    "sampling": bench_sampling,
+    "latency": bench_latency,
+    "throughput": bench_throughput,
+    "soak": bench_soak,
+    "flaky": bench_flaky,
+    "control": bench_control,
+    "incidents": bench_incidents,
+    "notifications": bench_notifications,
+    "flash": bench_flash,
+    "charts": bench_charts,
+    "openmetrics": bench_openmetrics,
+    "instrumentation": bench_instrumentation,
+    "supervisor": bench_supervisor,
+    "power": bench_power,
+}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    names = argv or list(BENCHMARKS)
+    status = 0
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"benchmark inconnu : {name} ({', '.join(BENCHMARKS)})", file=sys.stderr)
+            return 2
+        print(f"== {name}")
+        status |= BENCHMARKS[name]() or 0
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""Mini-graphiques (sparklines) des métriques système sur un Canvas Tk
+
+Chaque colonne de pixels est un segment vertical min / max de sa tranche
+de temps (décimation min / max). Un nouvel échantillon ne touche que la
+colonne de droite ; quand le temps passe à la colonne suivante, toutes
+les colonnes sont décalées d'un seul canvas.move et la plus ancienne est
+supprimée : le coût par image ne dépend pas de la durée d'historique.
+"""
+import math
+import tkinter as tk
+from collections import deque
+
+CHART_HEIGHT = 36
+CHART_WIDTH = 160
+CHART_BACKGROUND = "#2b3e50"
+
+# Fenêtres proposées (un clic sur un graphique passe à la suivante)
+CHART_SPANS = (3600, 86400)
+
+# Redimensionnement : redessin unique une fois la largeur stable depuis ce délai (secondes)
+CHART_RESIZE_DELAY = 0.15
+
+
+class Sparkline:
+    """Historique d'une colonne de MetricsHistory, mis à jour incrémentalement
+
+    Avec un `scheduler` (TkScheduler), les redimensionnements sont regroupés :
+    le redessin complet n'a lieu qu'une fois la taille stabilisée.
+    """
+
+    def __init__(self, parent, history, field, low=0.0, high=100.0, color="#4CAF50",
+                 span=CHART_SPANS[0], width=CHART_WIDTH, height=CHART_HEIGHT, scheduler=None):
+        self.history = history
+        self.scheduler = scheduler
+        self.field = field
+        self.low = low
+        self.high = high
+        self.color = color
+        self.span = span
+        self.height = height
+        self.canvas = tk.Canvas(
+            parent,
+            width=width,
+            height=height,
+            bg=CHART_BACKGROUND,
+            highlightthickness=0
+        )
+        self.width = width
+        self.pending_width = None  # largeur reçue, appliquée au redessin différé
+        self.columns = deque()  # identifiant d'item par colonne (None si vide), de gauche à droite
+        self.column_end = None  # fin de la tranche de temps de la colonne de droite
+        self.current = (None, None)
+        self.operations = 0  # appels Canvas émis, pour les mesures
+        self.canvas.bind("<Configure>", self.on_resize)
+
+    @property
+    def step(self):
+        return self.span / self.width
+
+    def y(self, value):
+        ratio = (min(max(value, self.low), self.high) - self.low) / (self.high - self.low)
+        return (self.height - 2) * (1 - ratio) + 1
+
+    def _draw(self, x, low, high):
+        self.operations += 1
+        return self.canvas.create_line(
+            x, self.y(high), x, self.y(low) + 1,
+            fill=self.color,
+            tags="series"
+        )
+
+    def rebuild(self, now):
+        """Dessin complet à partir de l'historique décimé (redimensionnement, changement de fenêtre)"""
+        self.canvas.delete("series")
+        self.columns.clear()
+        lows, highs = self.history.decimate(self.field, self.span, self.width, now)
+        for x, (low, high) in enumerate(zip(lows, highs)):
+            self.columns.append(self._draw(x, low, high) if low is not None else None)
+        self.column_end = now
+        self.current = (lows[-1], highs[-1])
+        self.operations += 1
+
+    def add(self, value, now):
+        """Prise en compte d'un échantillon : une colonne modifiée, décalage si besoin"""
+        if self.column_end is None:
+            self.rebuild(now)
+            return
+        if now > self.column_end:
+            shift = math.ceil((now - self.column_end) / self.step)
+            if shift >= self.width:
+                self.rebuild(now)
+                return
+            self.canvas.move("series", -shift, 0)
+            self.operations += 1
+            for _ in range(shift):
+                item = self.columns.popleft()
+                if item is not None:
+                    self.canvas.delete(item)
+                    self.operations += 1
+                self.columns.append(None)
+            self.column_end += shift * self.step
+            self.current = (None, None)
+
+        if value is None or value != value:
+            return
+        low, high = self.current
+        if low is not None and low <= value <= high:
+            return
+        low = value if low is None else min(low, value)
+        high = value if high is None else max(high, value)
+        self.current = (low, high)
+
+        x = self.width - 1
+        item = self.columns[-1]
+        if item is None:
+            self.columns[-1] = self._draw(x, low, high)
+        else:
+            self.canvas.coords(item, x, self.y(high), x, self.y(low) + 1)
+            self.operations += 1
+
+    def set_span(self, span, now):
+        self.span = span
+        self.rebuild(now)
+
+    def on_resize(self, event):
+        """<Configure> : chaque événement repousse le redessin, fait une seule fois à la fin"""
+        if event.width == (self.pending_width or self.width) or event.width <= 1:
+            return
+        if self.scheduler is None:
+            self.resize(event.width)
+            return
+        if event.width == self.width:
+            # Retour à la largeur déjà dessinée : rien à refaire
+            self.pending_width = None
+            self.scheduler.cancel(f"resize-{self.field}")
+            return
+        # Les échantillons reçus d'ici là continuent sur l'ancienne largeur
+        self.pending_width = event.width
+        self.scheduler.add(f"resize-{self.field}", CHART_RESIZE_DELAY, self.apply_resize,
+                           delay=CHART_RESIZE_DELAY)
+
+    def apply_resize(self):
+        self.scheduler.cancel(f"resize-{self.field}")
+        width, self.pending_width = self.pending_width, None
+        if width is not None:
+            self.resize(width)
+
+    def resize(self, width):
+        self.width = width
+        if self.column_end is not None:
+            self.rebuild(self.column_end)
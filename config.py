@@ -0,0 +1,281 @@
+"""Configuration typée (TOML), instantané immuable rechargé à chaud
+
+Le fichier est lu au démarrage dans un Config figé ; ConfigWatcher le
+relit quand il change (inotify, sinon comparaison périodique de sa date)
+et le moteur remplace son instantané d'un bloc : le thread de
+surveillance ne lit que des valeurs Python, jamais l'état d'un widget.
+
+Exemple :
+
+    sensitivity = 7
+    sound_enabled = true
+    sensors = ["power", "lid"]
+    power_supplies = ["ADP1"]
+    trigger_debounce = 0.05
+
+    [intervals]
+    usb = 5.0
+"""
+import ctypes
+import ctypes.util
+import dataclasses
+import os
+import select
+import struct
+import threading
+from dataclasses import dataclass, field
+from types import MappingProxyType
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    import tomli as tomllib
+
+from audio import DEFAULT_ALARM_FILE, VOLUME_PROFILES
+from sensors import SENSORS
+from states import RECOVER_DEBOUNCE, TRIGGER_DEBOUNCE
+
+DEFAULT_LOG_DIR = os.path.join("~", ".security_logs")
+
+# Repli sans inotify : intervalle de vérification de la date du fichier
+POLL_INTERVAL = 2.0
+
+# Écritures successives d'un éditeur regroupées en un seul rechargement
+RELOAD_DELAY = 0.1
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_IGNORED = 0x00008000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+INOTIFY_EVENT = struct.Struct("iIII")
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF | IN_MOVE_SELF
+
+
+def default_config_path():
+    config_home = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(config_home, "computer-alarm", "config.toml")
+
+
+@dataclass(frozen=True)
+class Config:
+    """Instantané immuable de la configuration"""
+
+    sensitivity: float = 5.0
+    sound_enabled: bool = True
+    alarm_file: str = DEFAULT_ALARM_FILE
+    volume_profile: str = "constant"
+    sensors: tuple = ("power",)
+    power_supplies: tuple = ()
+    intervals: MappingProxyType = field(default_factory=lambda: MappingProxyType({}))
+    trigger_debounce: float = TRIGGER_DEBOUNCE
+    recover_debounce: float = RECOVER_DEBOUNCE
+    log_dir: str = DEFAULT_LOG_DIR
+
+    def __post_init__(self):
+        if not 1 <= self.sensitivity <= 10:
+            raise ValueError("sensitivity doit être comprise entre 1 et 10")
+        if self.volume_profile not in VOLUME_PROFILES:
+            raise ValueError(f"Profil de volume inconnu : {self.volume_profile}")
+        unknown = [name for name in self.sensors if name not in SENSORS]
+        if unknown:
+            raise ValueError(f"Capteur inconnu : {', '.join(unknown)} (disponibles : {', '.join(SENSORS)})")
+        if self.trigger_debounce < 0 or self.recover_debounce < 0:
+            raise ValueError("Les délais d'anti-rebond doivent être positifs")
+        if any(interval <= 0 for interval in self.intervals.values()):
+            raise ValueError("Les intervalles des capteurs doivent être positifs")
+
+    @property
+    def log_path(self):
+        return os.path.expanduser(self.log_dir)
+
+    def replace(self, **changes):
+        """Nouvel instantané avec quelques valeurs modifiées (self s'il n'y a rien de changé)"""
+        changes = {key: value for key, value in coerce(changes).items() if getattr(self, key) != value}
+        return dataclasses.replace(self, **changes) if changes else self
+
+    def as_dict(self):
+        return {item.name: getattr(self, item.name) for item in dataclasses.fields(self)}
+
+
+def coerce(values):
+    """Contrôle et conversion des types d'après les champs de Config"""
+    fields = {item.name: item for item in dataclasses.fields(Config)}
+    result = {}
+    for key, value in values.items():
+        if key not in fields:
+            raise ValueError(f"Option inconnue : {key}")
+        expected = fields[key].type
+        if expected is float and isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = float(value)
+        elif expected is tuple and isinstance(value, (list, tuple)):
+            value = tuple(str(item) for item in value)
+        elif expected is MappingProxyType and isinstance(value, dict):
+            value = MappingProxyType({str(name): float(interval) for name, interval in value.items()})
+        elif not isinstance(value, expected):
+            raise ValueError(f"{key} : type {type(value).__name__} invalide")
+        result[key] = value
+    return result
+
+
+def load_config(path=None, overrides=None):
+    """Lecture du fichier (valeurs par défaut s'il n'existe pas), puis options de la ligne de commande"""
+    path = path or default_config_path()
+    values = {}
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            try:
+                values = tomllib.load(f)
+            except tomllib.TOMLDecodeError as e:
+                raise ValueError(f"{path} : {e}") from None
+    values.update(overrides or {})
+    return Config(**coerce(values))
+
+
+class ConfigWatcher:
+    """Rechargement du fichier à chaque modification, dans un thread dédié
+
+    on_change(config) reçoit le nouvel instantané ; on_error(exception)
+    est appelé si le fichier est invalide (l'ancien instantané reste actif).
+
+    Si le dossier du fichier n'existe pas encore (premier lancement), c'est
+    son plus proche ancêtre existant qui est surveillé, et la surveillance
+    descend d'un cran à chaque dossier créé sur le chemin.
+    """
+
+    def __init__(self, path, on_change, on_error=None, overrides=None):
+        self.path = os.path.abspath(path)
+        self.on_change = on_change
+        self.on_error = on_error
+        self.overrides = overrides or {}
+        self.mode = None
+        self.watched = None  # dossier surveillé par inotify
+        self._stop_r, self._stop_w = os.pipe()
+        self._inotify = None
+        self._libc = None
+        self._wd = None
+        self.thread = None
+
+    def start(self):
+        try:
+            self._inotify = self._open_inotify()
+            self._watch()
+            self.mode = "inotify"
+        except OSError:
+            self.mode = "polling"
+        self.thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        try:
+            os.write(self._stop_w, b"\0")
+        except OSError:
+            pass
+        if self.thread is not None:
+            self.thread.join(timeout=1)
+        for fd in (self._stop_r, self._stop_w, self._inotify):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+
+    def _open_inotify(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        return fd
+
+    def _watch(self):
+        """Surveillance du dossier (les éditeurs remplacent souvent le fichier par renommage)
+        ou, tant qu'il n'existe pas, de son plus proche ancêtre existant"""
+        directory = os.path.dirname(self.path)
+        while not os.path.isdir(directory) and os.path.dirname(directory) != directory:
+            directory = os.path.dirname(directory)
+        if directory == self.watched:
+            return
+        if self._wd is not None:
+            self._libc.inotify_rm_watch(self._inotify, self._wd)
+        wd = self._libc.inotify_add_watch(self._inotify, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch {directory}")
+        self._wd = wd
+        self.watched = directory
+
+    def _events(self):
+        """Événements en attente : [(masque, nom)]"""
+        events = []
+        try:
+            data = os.read(self._inotify, 4096)
+        except BlockingIOError:
+            return events
+        offset = 0
+        while offset < len(data):
+            _, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            events.append((mask, os.fsdecode(data[offset:offset + length].rstrip(b"\0"))))
+            offset += length
+        return events
+
+    def _stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _changed(self, name, directory):
+        """Attente d'un événement inotify ; None si l'arrêt est demandé"""
+        ready, _, _ = select.select([self._inotify, self._stop_r], [], [])
+        if self._stop_r in ready:
+            return None
+        events = self._events()
+        if any(mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF) for mask, _ in events):
+            # Dossier surveillé supprimé ou déplacé : la surveillance remonte vers un ancêtre
+            self._wd = self.watched = None
+        if self.watched == directory:
+            return any(event_name == name for _, event_name in events)
+
+        # Un dossier du chemin est apparu (ou a disparu) : surveillance au plus près du fichier,
+        # qui peut avoir été écrit avant que son dossier ne soit surveillé
+        try:
+            self._watch()
+        except OSError:
+            self.mode = "polling"
+        return self.watched == directory
+
+    def _run(self):
+        name = os.path.basename(self.path)
+        directory = os.path.dirname(self.path)
+        stamp = self._stamp()
+        while True:
+            if self.mode == "inotify":
+                changed = self._changed(name, directory)
+                if changed is None:
+                    return
+                if not changed:
+                    continue
+                # Attente de la fin des écritures ; les événements suivants du même lot
+                # ne changent plus la date du fichier et sont ignorés
+                if select.select([self._stop_r], [], [], RELOAD_DELAY)[0]:
+                    return
+            elif select.select([self._stop_r], [], [], POLL_INTERVAL)[0]:
+                return
+            current = self._stamp()
+            if current == stamp:
+                continue
+            stamp = current
+            self.reload()
+
+    def reload(self):
+        try:
+            config = load_config(self.path, self.overrides)
+        except (OSError, ValueError, TypeError) as e:
+            if self.on_error is not None:
+                self.on_error(e)
+            return
+        self.on_change(config)
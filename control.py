@@ -0,0 +1,386 @@
+"""API de contrôle locale sur socket Unix (JSON-RPC 2.0, une requête par ligne)
+
+Méthodes : arm, disarm, stop_alert, status, incidents, subscribe, unsubscribe,
+et shutdown (désarmement puis arrêt du moniteur, mode headless).
+Après subscribe, le serveur pousse les événements du moteur sous forme de
+notifications {"jsonrpc": "2.0", "method": "event", "params": {"event", "data"}}.
+
+Usage du client : python control.py [--socket CHEMIN] status|arm|disarm|stop_alert|incidents|subscribe|shutdown
+"""
+import argparse
+import asyncio
+import errno
+import functools
+import json
+import logging
+import os
+import socket
+import stat
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from sensors import to_json
+
+# Événements en attente par abonné : au-delà, les plus anciens sont abandonnés
+SUBSCRIBER_QUEUE = 256
+
+# Codes d'erreur JSON-RPC
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+
+def default_socket_path():
+    """Socket dans XDG_RUNTIME_DIR (propre à l'utilisateur), sinon dans ~/.security_logs"""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, "computer-alarm.sock")
+    return os.path.join(os.path.expanduser("~"), ".security_logs", "control.sock")
+
+
+class Subscriber:
+    """Client abonné : file bornée vidée par sa propre tâche d'écriture"""
+
+    def __init__(self, writer, maxsize=SUBSCRIBER_QUEUE):
+        self.writer = writer
+        self.queue = deque(maxlen=maxsize)
+        self.ready = asyncio.Event()
+        self.dropped = 0
+
+    def push(self, line):
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append(line)
+        self.ready.set()
+
+    async def pump(self):
+        """Écriture des événements ; un client lent ne ralentit que lui-même"""
+        while True:
+            await self.ready.wait()
+            self.ready.clear()
+            while self.queue:
+                self.writer.write(self.queue.popleft())
+            await self.writer.drain()
+
+
+class ControlServer:
+    """Serveur asyncio dans un thread dédié, client du moteur comme la GUI
+
+    Le thread de surveillance ne fait que déposer les événements dans une
+    file ; la diffusion aux abonnés se fait dans la boucle asyncio. Les
+    commandes qui touchent au moteur passent par un unique thread ouvrier,
+    pour ne jamais bloquer la boucle ni s'exécuter en parallèle.
+    """
+
+    def __init__(self, engine, path=None, on_shutdown=None):
+        self.engine = engine
+        self.path = path or default_socket_path()
+        self.on_shutdown = on_shutdown
+        self.loop = None
+        self.thread = None
+        self.subscribers = {}
+        self.client_tasks = set()
+        self._inode = None
+        self._pending = deque()
+        self._flush_scheduled = False
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._error = None
+        self._shutdown_requested = False
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="control")
+        self.methods = {
+            "arm": self.arm,
+            "disarm": self.disarm,
+            "stop_alert": self.stop_alert,
+            "status": self.status,
+            "incidents": self.incidents
+        }
+        if on_shutdown is not None:
+            self.methods["shutdown"] = self.shutdown
+
+    def start(self):
+        """Ouverture du socket et démarrage du thread asyncio"""
+        self.thread = threading.Thread(target=self._run, name="control-server", daemon=True)
+        self.thread.start()
+        self._ready.wait()
+        if self.loop is None:
+            raise self._error
+        self.engine.subscribe(self.on_engine_event)
+
+    def stop(self):
+        if self.loop is not None and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self._shutdown.set)
+            self.thread.join(timeout=2)
+        self._executor.shutdown(wait=False)
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(self._serve(loop))
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+        finally:
+            loop.close()
+
+    async def _serve(self, loop):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        server = await asyncio.start_unix_server(self.handle_client, sock=self._bind())
+
+        self._shutdown = asyncio.Event()
+        self.loop = loop
+        self._ready.set()
+        try:
+            await self._shutdown.wait()
+        finally:
+            server.close()
+            for task in list(self.client_tasks):
+                task.cancel()
+            await asyncio.gather(*self.client_tasks, return_exceptions=True)
+            await server.wait_closed()
+            self._unlink()
+
+    def _bind(self):
+        """Socket réservé à l'utilisateur courant : droits fixés avant listen(), sans toucher à l'umask"""
+        self._remove_stale()
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.bind(self.path)
+            # Aucun client ne peut se connecter avant listen() : pas de fenêtre aux droits par défaut
+            os.chmod(self.path, 0o600)
+            self._inode = os.stat(self.path).st_ino
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def _remove_stale(self):
+        """Suppression d'un socket laissé par une instance arrêtée ; refus s'il est encore écouté"""
+        try:
+            mode = os.lstat(self.path).st_mode
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(mode):
+            raise OSError(errno.EEXIST, f"{self.path} existe et n'est pas un socket")
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.path)
+        except ConnectionRefusedError:
+            os.unlink(self.path)
+            return
+        except FileNotFoundError:
+            return
+        finally:
+            probe.close()
+        raise OSError(errno.EADDRINUSE, f"Une autre instance écoute déjà sur {self.path}")
+
+    def _unlink(self):
+        """Suppression du socket à l'arrêt, seulement s'il s'agit toujours du nôtre"""
+        try:
+            if os.stat(self.path).st_ino == self._inode:
+                os.unlink(self.path)
+        except OSError:
+            pass
+
+    def on_engine_event(self, event, data):
+        """Appelé dans le thread émetteur : dépôt en file, un seul réveil de la boucle par lot"""
+        if not self.subscribers:
+            return
+        with self._lock:
+            self._pending.append((event, data))
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        self.loop.call_soon_threadsafe(self._flush)
+
+    def _flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, deque()
+            self._flush_scheduled = False
+        for event, data in pending:
+            # Un événement non sérialisable est abandonné seul, sans emporter le reste du lot
+            try:
+                line = self._encode({"jsonrpc": "2.0", "method": "event",
+                                     "params": {"event": event, "data": to_json(data)}})
+            except (TypeError, ValueError) as e:
+                logging.warning("Événement %s non transmis aux abonnés : %s", event, e)
+                continue
+            for subscriber in self.subscribers.values():
+                subscriber.push(line)
+
+    @staticmethod
+    def _encode(message):
+        return (json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8")
+
+    def arm(self):
+        self.engine.start()
+        return self.status()
+
+    def disarm(self):
+        self.engine.stop()
+        return self.status()
+
+    def stop_alert(self):
+        self.engine.stop_alert()
+        return self.status()
+
+    def shutdown(self):
+        """Désarmement puis arrêt du moniteur, une fois la réponse envoyée
+
+        Le désarmement explicite fait de cet arrêt un arrêt normal pour le
+        superviseur, contrairement à un SIGTERM reçu alors que le moniteur est armé.
+        """
+        self.engine.stop()
+        self._shutdown_requested = True
+        return self.status()
+
+    def status(self):
+        """État courant du moteur et métriques système"""
+        engine = self.engine
+        status = {
+            "monitoring_active": engine.monitoring_active,
+            "alert_active": engine.alert_active,
+            "state": engine.state_machine.state,
+            "incident_count": engine.incident_count,
+            "sensors": list(engine.config.sensors),
+            "readings": to_json(engine.readings),
+            "triggered": [rule.message for rule in engine.triggered],
+            "incidents_24h": engine.incidents.count(days=1),
+            "config": engine.config.as_dict()
+        }
+        try:
+            from metrics import collect_sample
+            status["system_metrics"] = collect_sample()
+        except ImportError:
+            status["system_metrics"] = None
+        return status
+
+    def incidents(self, days=7, sensor=None, limit=100, with_metrics=False):
+        """Historique persistant des incidents récents"""
+        incidents = self.engine.incidents.recent(days, sensor, limit, with_metrics=with_metrics)
+        return [incident._asdict() for incident in incidents]
+
+    async def handle_client(self, reader, writer):
+        task = asyncio.current_task()
+        self.client_tasks.add(task)
+        pump = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self.dispatch(line, writer)
+                if response is not None:
+                    try:
+                        encoded = self._encode(response)
+                    except (TypeError, ValueError) as e:
+                        encoded = self._encode(self._error_response(response.get("id"), INTERNAL_ERROR, str(e)))
+                    writer.write(encoded)
+                    await writer.drain()
+                if self._shutdown_requested:
+                    self._shutdown_requested = False
+                    self.on_shutdown()
+                if writer in self.subscribers and pump is None:
+                    pump = asyncio.ensure_future(self.subscribers[writer].pump())
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.subscribers.pop(writer, None)
+            self.client_tasks.discard(task)
+            if pump is not None:
+                pump.cancel()
+            writer.close()
+
+    async def dispatch(self, line, writer):
+        """Exécution d'une requête JSON-RPC ; None pour une notification sans id"""
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return self._error_response(None, PARSE_ERROR, "JSON invalide")
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            return self._error_response(None, INVALID_REQUEST, "Requête invalide")
+
+        request_id = request.get("id")
+        method = request["method"]
+        params = request.get("params") or {}
+        if not isinstance(params, dict):
+            return self._error_response(request_id, INVALID_PARAMS, "Paramètres nommés attendus")
+        if method == "subscribe":
+            self.subscribers.setdefault(writer, Subscriber(writer))
+            result = True
+        elif method == "unsubscribe":
+            result = self.subscribers.pop(writer, None) is not None
+        elif method in self.methods:
+            try:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(
+                    self._executor, functools.partial(self.methods[method], **params)
+                )
+            except TypeError as e:
+                return self._error_response(request_id, INVALID_PARAMS, str(e))
+            except Exception as e:
+                return self._error_response(request_id, INTERNAL_ERROR, str(e))
+        else:
+            return self._error_response(request_id, METHOD_NOT_FOUND, f"Méthode inconnue : {method}")
+
+        if request_id is None:
+            return None
+        return {"jsonrpc": "2.0", "id": request_id, "result": to_json(result)}
+
+    @staticmethod
+    def _error_response(request_id, code, message):
+        return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+def call(path, method, params=None, subscribe_handler=None):
+    """Client minimal : envoi d'une requête et lecture de la réponse (puis des événements)"""
+    request = {"jsonrpc": "2.0", "id": 1, "method": method}
+    if params:
+        request["params"] = params
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        stream = sock.makefile("r", encoding="utf-8")
+        response = json.loads(stream.readline())
+        if subscribe_handler is not None and "result" in response:
+            for line in stream:
+                subscribe_handler(json.loads(line)["params"])
+        return response
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Contrôle de Computer-Alarm via socket Unix")
+    parser.add_argument("--socket", default=default_socket_path(), help="chemin du socket de contrôle")
+    parser.add_argument("method", choices=("status", "arm", "disarm", "stop_alert", "incidents", "subscribe",
+                                           "shutdown"))
+    parser.add_argument("--days", type=float, default=7, help="période de la requête incidents (jours)")
+    args = parser.parse_args(argv)
+
+    def print_event(params):
+        print(json.dumps(params, ensure_ascii=False), flush=True)
+
+    try:
+        response = call(
+            args.socket,
+            args.method,
+            {"days": args.days} if args.method == "incidents" else None,
+            print_event if args.method == "subscribe" else None
+        )
+    except OSError as e:
+        print(f"Connexion impossible à {args.socket} : {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 0
+    if "error" in response:
+        print(response["error"]["message"], file=sys.stderr)
+        return 1
+    print(json.dumps(response["result"], ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,424 @@
+"""Cœur de surveillance, sans dépendance à l'interface graphique"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from audio import AlarmPlayer, resolve_sound_path
+from config import Config
+from incidents import INCIDENTS_FILENAME, IncidentStore
+from instrumentation import instruments, span
+from journal import LOG_FILENAME, setup_logging, stop_logging
+from power import create_power_source
+from scheduler import Scheduler
+from sensors import create_detection, to_json
+from states import ALARMING, ARMED, RECOVERING, SUSPECT, AlarmStateMachine
+
+# Inactivité clavier / pavé tactile au-delà de laquelle les capteurs ralentissent
+IDLE_BACKOFF_SECONDS = 300
+
+# Pendant l'anti-rebond, relecture des capteurs en cause à ce pas : la compromission
+# doit être observée en continu, pas seulement au premier relevé et à l'échéance
+DEBOUNCE_RECHECK = 0.005
+
+LOG_STYLES = {
+    "info": {"icon": "ℹ️", "color": "#4CAF50", "level": logging.INFO},
+    "warning": {"icon": "⚠️", "color": "#FFC107", "level": logging.WARNING},
+    "alert": {"icon": "🚨", "color": "#F44336", "level": logging.CRITICAL}
+}
+
+
+class MonitorEngine:
+    """Surveillance de l'alimentation et déclenchement de l'alarme
+
+    Les clients (GUI, mode headless) s'abonnent via subscribe() et
+    reçoivent des événements (nom, données) :
+    log, started, stopped, state, incident, alert, alert_stopped, elapsed, power, config, shutdown.
+
+    La configuration est un instantané immuable (config.Config), remplacé
+    d'un bloc par apply_config() : le thread de surveillance n'en lit que
+    des valeurs simples.
+    """
+
+    def __init__(self, config=None, clock=time.monotonic, player=None,
+                 power_source_factory=create_power_source):
+        self.config = config = config or Config()
+        self.clock = clock
+        self.state_machine = AlarmStateMachine(config.trigger_debounce, config.recover_debounce, clock=clock)
+        self.custom_player = player is not None
+        self.player = player or AlarmPlayer(config.alarm_file, config.volume_profile)
+        self.power_source_factory = power_source_factory
+        self.listeners = []
+        self.config_lock = threading.Lock()
+        self.setup_system()
+
+    def setup_system(self):
+        """Initialisation du système"""
+        # Configuration des logs : écriture JSON lines en arrière-plan, avec rotation
+        log_dir = self.config.log_path
+        self.log_file = os.path.join(log_dir, LOG_FILENAME)
+        self.log_listener = setup_logging(log_dir)
+        self.incidents = IncidentStore(os.path.join(log_dir, INCIDENTS_FILENAME))
+
+        # Variables d'état
+        self.monitoring_active = False
+        self.alert_active = False
+        self.incident_count = 0
+        self.incident_id = None
+        self.power_source = None
+        self.monitor_thread = None
+        self.readings = {}
+        self.triggered = []
+        self.scheduler = None
+        self.loop_time = None  # dernière itération de la boucle (battements du superviseur)
+
+    def subscribe(self, callback):
+        """Abonnement d'un client aux événements du moteur"""
+        self.listeners.append(callback)
+
+    def emit(self, event, **data):
+        """Diffusion d'un événement à tous les clients"""
+        for callback in list(self.listeners):
+            callback(event, data)
+
+    def start(self, threaded=True):
+        """Démarrage de la surveillance
+
+        threaded=False prépare l'ordonnanceur sans lancer de thread : c'est
+        alors à l'appelant de le faire tourner (rejeu de traces, voir replay.py).
+        """
+        if self.monitoring_active:
+            return
+
+        # Capteurs et règles créés avant d'annoncer l'armement : une erreur laisse le moteur désarmé
+        power_source = self.power_source_factory()
+        config = self.config
+        try:
+            supplies = config.power_supplies
+            if supplies and "power" in config.sensors:
+                supplies = self.resolve_supplies(power_source, supplies)
+            self.sensors, self.rules = create_detection(
+                config.sensors, power_source, config.intervals, supplies
+            )
+        except Exception:
+            power_source.close()
+            raise
+        self.power_source = power_source
+
+        self.monitoring_active = True
+        self.log_event("🟢 Système de surveillance activé", "info", event="monitoring")
+        self.emit("started")
+        self.apply_transitions(self.state_machine.arm())
+        self.prepare_run()
+
+        # Démarrage du thread de surveillance
+        if threaded:
+            self.monitor_thread = threading.Thread(target=self.check_security)
+            self.monitor_thread.daemon = True
+            self.monitor_thread.start()
+
+    def resolve_supplies(self, power_source, names):
+        """Alimentations désignées effectivement présentes ; les autres sont signalées et ignorées"""
+        state = power_source.read()
+        available = [supply.name for supply in state.supplies] if state is not None else []
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            self.log_event(
+                f"Alimentation(s) introuvable(s), non surveillée(s) : {', '.join(unknown)} "
+                f"(disponibles : {', '.join(available) or 'aucune'})",
+                "warning",
+                event="config"
+            )
+        return tuple(name for name in names if name in available)
+
+    def stop(self):
+        """Arrêt contrôlé de la surveillance"""
+        if not self.monitoring_active:
+            return
+        self.monitoring_active = False
+        self.power_source.interrupt()
+        self.apply_transitions(self.state_machine.disarm())
+
+        # Arrêt des alertes actives
+        if self.alert_active:
+            self.stop_alert(cleared_by="disarm")
+
+        self.log_event("🔴 Système de surveillance désactivé", "info", event="monitoring")
+        self.emit("stopped")
+
+    def prepare_run(self):
+        """Remise à zéro des lectures et ordonnancement des capteurs"""
+        start_time = self.loop_time = self.clock()
+        self.readings = {}
+        self.triggered = []
+        for rule in self.rules:
+            rule.reset()
+
+        self.scheduler = scheduler = Scheduler(clock=self.clock, backoff_factor=self.backoff_factor)
+        for sensor in self.sensors:
+            scheduler.add(
+                sensor.name,
+                sensor.interval,
+                lambda sensor=sensor: self.poll_sensor(sensor),
+                backoff=not sensor.critical
+            )
+
+        # Mise à jour du temps de surveillance
+        scheduler.add(
+            "elapsed",
+            1.0,
+            lambda: self.emit("elapsed", text=str(timedelta(seconds=int(self.clock() - start_time))))
+        )
+
+    def check_security(self):
+        """Surveillance : tous les capteurs partagent un ordonnanceur et un seul réveil"""
+        power_source = self.power_source
+        sensors = self.sensors
+        scheduler = self.scheduler
+        this_thread = threading.current_thread()
+
+        # L'audio n'est ouvert et décodé qu'une fois armé, hors du chemin de démarrage
+        if self.config.sound_enabled:
+            try:
+                with span("audio_load"):
+                    self.player.load()
+            except Exception as e:
+                self.log_event(f"Erreur audio: {str(e)}", "warning", event="audio")
+
+        while self.monitoring_active and self.monitor_thread is this_thread:
+            self.loop_time = self.clock()
+            with span("check_security"):
+                timeout = scheduler.run_pending()
+
+            # Réveil immédiat sur événement d'alimentation, sinon à la prochaine échéance
+            if power_source.wait(timeout) and "power" in scheduler.tasks:
+                scheduler.reschedule("power")
+
+        for sensor in sensors:
+            sensor.close()
+        power_source.close()
+
+    def backoff_factor(self):
+        """Ralentissement des capteurs non critiques sur batterie ou machine inactive"""
+        factor = 1.0
+        power = self.readings.get("power")
+        if power is not None and power.plugged is False:
+            factor *= 2
+        idle = self.readings.get("input")
+        if idle is not None and idle > IDLE_BACKOFF_SECONDS:
+            factor *= 2
+        return factor
+
+    def poll_sensor(self, sensor):
+        """Lecture d'un capteur puis évaluation des règles"""
+        try:
+            self.store_reading(sensor, sensor.poll())
+            self.evaluate()
+        except Exception as e:
+            self.log_event(f"Erreur de surveillance ({sensor.name}): {str(e)}", "warning", event="error")
+            return 5.0
+
+    def store_reading(self, sensor, reading):
+        previous = self.readings.get(sensor.name)
+        self.readings[sensor.name] = reading
+        if sensor.name == "power" and reading != previous:
+            self.emit("power", plugged=reading.plugged, percent=reading.percent)
+
+    def evaluate(self):
+        """Combinaison des règles puis passage par la machine à états"""
+        config = self.config
+        self.triggered = [rule for rule in self.rules if rule.check(self.readings, config)]
+        self.apply_transitions(self.state_machine.update(bool(self.triggered)))
+
+    def apply_transitions(self, transitions):
+        """Effets des changements d'état : incident, alarme, retour à la normale"""
+        for old, new in transitions:
+            self.emit("state", state=new)
+
+            if old == SUSPECT and new == ALARMING:
+                # Le son d'abord : relevé système et insertion SQLite ne retardent pas l'alarme
+                self.incident_count += 1
+                self.trigger_alert(f"⚠️ ALERTE DE SÉCURITÉ: {self.triggered[0].message}")
+                self.record_incident()
+                self.emit("incident", count=self.incident_count)
+
+            elif old == RECOVERING and new == ARMED:
+                self.log_event("✅ Système sécurisé - Retour à la normale", "info", event="recovery")
+                if self.alert_active:
+                    self.stop_alert(cleared_by="recovery")
+
+        # Réévaluation à l'échéance de l'anti-rebond (et avant, si suspect), sans attendre le prochain relevé
+        if self.scheduler is None:
+            return
+        deadline = self.state_machine.next_deadline()
+        if deadline is None:
+            self.scheduler.cancel("debounce")
+        else:
+            delay = max(0.0, deadline - self.state_machine.clock())
+            if self.state_machine.state == SUSPECT:
+                delay = min(delay, DEBOUNCE_RECHECK)
+            self.scheduler.add("debounce", 1.0, self.debounce_elapsed, delay=delay, exact=True)
+
+    def debounce_elapsed(self):
+        """Relecture des capteurs en cause pendant l'anti-rebond, puis confirmation à l'échéance
+
+        Sans relecture, une micro-coupure terminée entre deux relevés serait
+        confirmée sur la lecture périmée. En retour à la normale (aucune
+        règle déclenchée), tous les capteurs des règles sont relus.
+        """
+        self.scheduler.cancel("debounce")
+        names = {rule.sensor for rule in self.triggered or self.rules}
+        for sensor in self.sensors:
+            if sensor.name not in names:
+                continue
+            try:
+                self.store_reading(sensor, sensor.refresh())
+            except Exception as e:
+                self.log_event(f"Erreur de surveillance ({sensor.name}): {str(e)}", "warning", event="error")
+        self.evaluate()
+
+    def report_incident(self, sensor, message):
+        """Incident signalé hors capteurs (superviseur : moniteur interrompu) ; alarme immédiate"""
+        self.incident_count += 1
+        self.trigger_alert(f"⚠️ ALERTE DE SÉCURITÉ: {message}")
+        try:
+            self.incident_id = self.incidents.open(sensor, message, {"readings": to_json(self.readings)})
+        except Exception as e:
+            self.log_event(f"Erreur d'enregistrement de l'incident: {str(e)}", "warning", event="error")
+        self.emit("incident", count=self.incident_count)
+
+    def record_incident(self):
+        """Enregistrement persistant de l'incident, avec les lectures du moment"""
+        rule = self.triggered[0]
+        metrics = {"readings": to_json(self.readings)}
+        try:
+            from metrics import collect_sample
+            metrics["system"] = collect_sample()
+        except ImportError:
+            pass
+        try:
+            self.incident_id = self.incidents.open(rule.sensor, rule.message, metrics)
+        except Exception as e:
+            self.log_event(f"Erreur d'enregistrement de l'incident: {str(e)}", "warning", event="error")
+
+    @instruments.timed("trigger_alert")
+    def trigger_alert(self, message):
+        """Déclenchement de l'alarme"""
+        self.alert_active = True
+        self.log_event(message, "alert", event="incident")
+
+        if self.config.sound_enabled:
+            try:
+                self.player.play()
+            except Exception as e:
+                self.log_event(f"Erreur audio: {str(e)}", "warning", event="audio")
+
+        self.emit("alert", message=message)
+
+    def stop_alert(self, cleared_by="user"):
+        """Arrêt de l'alarme ; cleared_by : user, recovery, disarm ou shutdown"""
+        if not self.alert_active:
+            return
+        self.alert_active = False
+        self.player.stop()
+        # Son modifié pendant l'alerte : le nouveau lecteur remplace l'ancien maintenant
+        self.refresh_player()
+        if self.incident_id is not None:
+            try:
+                self.incidents.close(self.incident_id, cleared_by)
+            except Exception as e:
+                self.log_event(f"Erreur d'enregistrement de l'incident: {str(e)}", "warning", event="error")
+            self.incident_id = None
+        self.log_event("🔕 Alerte désactivée", "info", event="alert_stop")
+        self.emit("alert_stopped")
+
+    def refresh_player(self):
+        """Nouveau lecteur si le son configuré diffère de celui du lecteur (jamais pendant une alerte)
+
+        La comparaison porte sur le lecteur lui-même et non sur l'instantané
+        précédent : un changement reçu pendant une alerte n'est pas perdu.
+        """
+        if self.custom_player or self.alert_active:
+            return
+        config = self.config
+        wanted = (resolve_sound_path(config.alarm_file), config.volume_profile)
+        if wanted != (self.player.sound_path, self.player.profile):
+            self.player.quit()
+            self.player = AlarmPlayer(config.alarm_file, config.volume_profile)
+
+    def update_config(self, **changes):
+        """Modification de quelques valeurs (interface, API) : nouvel instantané"""
+        with self.config_lock:
+            config = self.config.replace(**changes)
+        self.apply_config(config)
+
+    def apply_config(self, config):
+        """Remplacement atomique de l'instantané et prise en compte des changements"""
+        with self.config_lock:
+            old, self.config = self.config, config
+        if config is old:
+            return
+
+        # Anti-rebond : pris en compte dès la prochaine évaluation
+        self.state_machine.trigger_debounce = config.trigger_debounce
+        self.state_machine.recover_debounce = config.recover_debounce
+
+        # Son : nouveau lecteur, chargé au prochain armement ou à la prochaine alerte
+        self.refresh_player()
+
+        deferred = []
+        detection = (config.sensors, dict(config.intervals), config.power_supplies)
+        if detection != (old.sensors, dict(old.intervals), old.power_supplies) and self.monitoring_active:
+            deferred.append("capteurs")
+        if config.log_dir != old.log_dir:
+            deferred.append("dossier des journaux")
+        if deferred:
+            self.log_event(
+                f"Configuration : {', '.join(deferred)} pris en compte au prochain "
+                f"{'armement' if 'capteurs' in deferred else 'lancement'}",
+                "info",
+                event="config"
+            )
+        # Valeurs simples (dict) : l'événement part aussi vers les abonnés JSON du socket de contrôle
+        self.emit("config", config=config.as_dict())
+
+    @instruments.timed("log_event")
+    def log_event(self, message, level="info", event="general"):
+        """Journalisation d'un événement et diffusion aux clients"""
+        style = LOG_STYLES.get(level, LOG_STYLES["info"])
+        # Une entrée = une ligne, aussi bien à l'écran que dans le fichier
+        formatted_message = f"{style['icon']} {message}".replace("\n", " ")
+
+        self.emit(
+            "log",
+            timestamp=datetime.now().strftime("%H:%M:%S"),
+            message=formatted_message,
+            level=level
+        )
+
+        # Enregistrement dans le fichier
+        logging.log(style["level"], formatted_message, extra={"event": event})
+
+    def shutdown(self):
+        """Arrêt propre du moteur
+
+        L'événement shutdown indique si la surveillance était encore armée :
+        le superviseur traite un tel arrêt comme une interruption (voir
+        supervisor.Heartbeat), seul un arrêt après désarmement est normal.
+        """
+        armed = self.monitoring_active
+        self.monitoring_active = False
+        if self.power_source is not None:
+            self.power_source.interrupt()
+        if self.alert_active:
+            self.stop_alert(cleared_by="shutdown")
+
+        # Sauvegarde des logs finaux
+        self.log_event("💾 Sauvegarde et arrêt du système", "info", event="system")
+        self.player.quit()
+        self.incidents.close_db()
+        self.emit("shutdown", armed=armed)
+
+        # Vidage de la file d'écriture du journal
+        stop_logging(self.log_listener)
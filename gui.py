@@ -0,0 +1,1141 @@
+import tkinter as tk
+import os
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+import ttkbootstrap as ttk
+from ttkbootstrap.dialogs import Messagebox
+from charts import CHART_SPANS, Sparkline
+from engine import LOG_STYLES, MonitorEngine
+from instrumentation import instruments
+from journal import EXPORT_FORMATS, export_journal, parse_log_line, read_log_lines
+from metrics import AdaptiveSampler, MetricsHistory, collect_sample
+from notifications import TOAST_POOL_SIZE, NotificationBackend, NotificationManager
+from scheduler import TkScheduler
+
+# Intervalle de vidage de la file d'événements (une mise à jour par trame),
+# allongé jusqu'à UI_IDLE_MS tant que la file reste vide ; un événement
+# d'état ou d'alerte réveille la boucle Tk sans attendre cette échéance
+# (sans réveil possible, la cadence reste pleine tant que la surveillance est armée)
+UI_FRAME_MS = 50
+UI_IDLE_MS = 250
+
+# Journal affiché : lignes gardées dans le widget, taille des lots de purge et de pagination
+LOG_MAX_LINES = 2000
+LOG_TRIM_BATCH = 200
+LOG_PAGE_LINES = 200
+
+# Lignes perdues par la file UI : délai avant de recharger la vue depuis le journal sur disque
+LOG_RESYNC_MS = 500
+
+# Bandeau d'alerte : pulsation entre deux couleurs, animation plafonnée à FLASH_FPS images/s
+FLASH_COLORS = ("#F44336", "#3B1A1A")
+FLASH_FPS = 10
+FLASH_PERIOD = 1.0
+
+# Rafraîchissement du panneau Diagnostics (p50 / p99 des sections mesurées)
+DIAGNOSTICS_INTERVAL = 1.0
+
+# Fenêtres de notification empilées en bas à droite de l'écran
+TOAST_WIDTH = 320
+TOAST_MARGIN = 20
+
+# Filtres proposés à l'export : libellé -> période / niveaux logging (None : pas de filtre)
+EXPORT_PERIODS = {
+    "Dernière heure": timedelta(hours=1),
+    "24 dernières heures": timedelta(days=1),
+    "7 derniers jours": timedelta(days=7),
+    "Tout l'historique": None
+}
+EXPORT_LEVELS = {
+    "Tous les niveaux": None,
+    "Avertissements et alertes": {"WARNING", "ERROR", "CRITICAL"},
+    "Alertes uniquement": {"ERROR", "CRITICAL"}
+}
+
+
+class UiUpdateQueue:
+    """File bornée entre le thread de surveillance et la boucle Tk
+
+    Les événements d'état (durée, compteur d'incidents) sont coalescés :
+    seule la dernière valeur reçue entre deux trames est appliquée. Les
+    événements URGENT appellent wakeup() (une fois par trame au plus) pour
+    que l'alarme s'affiche sans attendre la cadence ralentie de la file.
+    Les lignes de journal sacrifiées quand la file déborde sont signalées
+    par un événement log_gap en tête du lot suivant.
+    """
+
+    COALESCED = ("incident", "elapsed", "export_progress", "config")
+    URGENT = ("alert", "alert_stopped", "state", "started", "stopped")
+
+    def __init__(self, maxsize=500, wakeup=None):
+        self.maxsize = maxsize
+        self.wakeup = wakeup
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._events = deque()
+        self._latest = {}
+        self._dropped_logs = 0
+        self._wake_pending = False
+
+    def put(self, event, data):
+        """Ajout d'un événement (appelable depuis n'importe quel thread)"""
+        with self._lock:
+            if event in self.COALESCED:
+                self._latest[event] = data
+                return
+
+            if len(self._events) >= self.maxsize:
+                # On sacrifie en priorité une ligne de journal (déjà écrite sur disque)
+                for i, (queued, _) in enumerate(self._events):
+                    if queued == "log":
+                        del self._events[i]
+                        self._dropped_logs += 1
+                        break
+                else:
+                    self._events.popleft()
+                self.dropped += 1
+            self._events.append((event, data))
+            wake = event in self.URGENT and self.wakeup is not None and not self._wake_pending
+            if wake:
+                self._wake_pending = True
+        if wake:
+            self.wakeup()
+
+    def drain(self):
+        """Récupération de tous les événements en attente, dans l'ordre"""
+        with self._lock:
+            events, self._events = self._events, deque()
+            latest, self._latest = self._latest, {}
+            dropped_logs, self._dropped_logs = self._dropped_logs, 0
+            self._wake_pending = False
+        # Les lignes perdues sont plus anciennes que toutes celles encore en file
+        gap = [("log_gap", {"count": dropped_logs})] if dropped_logs else []
+        return gap + list(events) + list(latest.items())
+
+
+class CachedLabel:
+    """Label dont le texte n'est reconfiguré que s'il a changé"""
+
+    def __init__(self, label, text=""):
+        self.label = label
+        self.text = text
+        self.updates = 0  # appels configure réellement émis vers Tcl
+
+    def set(self, text):
+        if text != self.text:
+            self.label.configure(text=text)
+            self.text = text
+            self.updates += 1
+
+
+class MetricCard:
+    """Carte de métrique avec accès direct à son label de valeur"""
+
+    def __init__(self, parent, column, title, value):
+        self.frame = ttk.Frame(parent, style='primary.TFrame')
+        self.frame.grid(row=0, column=column, padx=5, sticky="ew")
+
+        self.title_label = ttk.Label(
+            self.frame,
+            text=title,
+            style='primary.Inverse.TLabel',
+            font=("Helvetica", 10)
+        )
+        self.title_label.pack(pady=2)
+
+        value_label = ttk.Label(
+            self.frame,
+            text=value,
+            style='primary.Inverse.TLabel',
+            font=("Helvetica", 16, "bold")
+        )
+        value_label.pack(pady=2)
+        self.value = CachedLabel(value_label, value)
+
+    def set(self, text):
+        self.value.set(text)
+
+
+class LogView:
+    """Vue bornée du journal de sécurité
+
+    Le widget ne contient qu'une fenêtre de lignes contiguës du fichier de
+    log ; les entrées plus anciennes (ou plus récentes, si l'on a remonté
+    l'historique) sont relues depuis le disque au défilement.
+    """
+
+    def __init__(self, text, log_file, max_lines=LOG_MAX_LINES,
+                 trim_batch=LOG_TRIM_BATCH, page_lines=LOG_PAGE_LINES):
+        self.text = text
+        self.log_file = log_file
+        self.max_lines = max_lines
+        self.trim_batch = trim_batch
+        self.page_lines = page_lines
+
+        self.lines = 0  # lignes présentes dans le widget
+        self.hidden_after = 0  # lignes plus récentes restées sur disque
+        self.available = None  # lignes consultables depuis le dernier effacement
+        self.follow = False  # défilement vers la fin en attente
+
+        # Pagination uniquement sur action de l'utilisateur
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>", "<Prior>", "<Next>"):
+            text.bind(sequence, lambda e: text.after_idle(self.check_edges), add="+")
+
+    def insert_line(self, index, timestamp, message, level):
+        self.text.insert(index, f"[{timestamp}] ", "timestamp", f"{message}\n", level)
+
+    def append(self, timestamp, message, level):
+        """Ajout d'une nouvelle entrée (affichée seulement si la vue suit la fin)"""
+        if self.available is not None:
+            self.available += 1
+        if self.hidden_after:
+            self.hidden_after += 1
+            return
+        self.insert_line(tk.END, timestamp, message, level)
+        self.lines += 1
+        self.follow = True
+
+    def flush(self):
+        """Purge par lots des lignes les plus anciennes et défilement, une fois par trame"""
+        if not self.follow:
+            return
+        self.follow = False
+
+        excess = self.lines - self.max_lines
+        if excess >= self.trim_batch:
+            self.text.delete("1.0", f"{excess + 1}.0")
+            self.lines -= excess
+        self.text.see(tk.END)
+
+    def resync(self, dropped):
+        """Lignes jamais reçues (file UI saturée) : rétablissement de la correspondance avec le fichier
+
+        Si l'historique est remonté, ces lignes rejoignent celles restées sur
+        disque ; sinon la vue est vidée puis rechargée depuis le journal, une
+        fois que le thread d'écriture l'a rattrapé.
+        """
+        if self.available is not None:
+            self.available += dropped
+        if self.hidden_after:
+            self.hidden_after += dropped
+            return
+        self.text.delete("1.0", tk.END)
+        self.lines = 0
+        self.text.after(LOG_RESYNC_MS, self.reload)
+
+    def reload(self):
+        self.page_older()
+        self.text.see(tk.END)
+
+    def clear(self):
+        """Effacement de la vue : l'historique antérieur n'est plus consultable"""
+        self.text.delete("1.0", tk.END)
+        self.lines = 0
+        self.hidden_after = 0
+        self.available = 0
+
+    def yview(self, *args):
+        """Commande de la barre de défilement"""
+        self.text.yview(*args)
+        self.check_edges()
+
+    def check_edges(self):
+        first, last = self.text.yview()
+        if first <= 0.0:
+            self.page_older()
+        elif last >= 1.0 and self.hidden_after:
+            self.page_newer()
+
+    def read_entries(self, skip, count):
+        return [parse_log_line(line) for line in read_log_lines(self.log_file, skip, count)]
+
+    def page_older(self):
+        """Chargement de la page précédant la première ligne affichée"""
+        skip = self.hidden_after + self.lines
+        count = self.page_lines
+        if self.available is not None:
+            count = min(count, self.available - skip)
+        if count <= 0:
+            return
+
+        entries = self.read_entries(skip, count)
+        if not entries:
+            return
+        for i, entry in enumerate(entries):
+            self.insert_line(f"{i + 1}.0", *entry)
+        self.lines += len(entries)
+
+        # Conservation de la position de lecture
+        self.text.yview(f"{len(entries) + 1}.0")
+
+        # Les lignes les plus récentes repartent sur disque
+        excess = self.lines - self.max_lines
+        if excess > 0:
+            self.text.delete(f"{self.max_lines + 1}.0", tk.END)
+            self.lines = self.max_lines
+            self.hidden_after += excess
+
+    def page_newer(self):
+        """Rechargement des lignes plus récentes que la dernière affichée"""
+        count = min(self.page_lines, self.hidden_after)
+        self.hidden_after -= count
+
+        entries = self.read_entries(self.hidden_after, count)
+        for entry in entries:
+            self.insert_line(tk.END, *entry)
+        self.lines += len(entries)
+
+        excess = self.lines - self.max_lines
+        if excess > 0:
+            self.text.delete("1.0", f"{excess + 1}.0")
+            self.lines -= excess
+
+
+def blend(start, end, t):
+    """Couleur intermédiaire entre deux couleurs #rrggbb"""
+    a = [int(start[i:i + 2], 16) for i in (1, 3, 5)]
+    b = [int(end[i:i + 2], 16) for i in (1, 3, 5)]
+    return "#" + "".join(f"{round(x + (y - x) * t):02x}" for x, y in zip(a, b))
+
+
+class AlertBanner:
+    """Bandeau d'alerte superposé au journal, animé par un seul petit label
+
+    Les couleurs de la pulsation sont calculées une fois ; chaque image ne
+    reconfigure que le fond du bandeau, jamais le widget Text du journal
+    (dont le redessin complet croît avec le nombre de lignes).
+    """
+
+    def __init__(self, parent, scheduler, below=None, fps=FLASH_FPS, period=FLASH_PERIOD, colors=FLASH_COLORS):
+        self.scheduler = scheduler
+        self.below = below  # widget à ne pas recouvrir (barre d'outils du journal)
+        self.interval = 1.0 / fps
+        steps = max(2, int(fps * period))
+        # Aller-retour entre les deux couleurs (onde triangulaire)
+        self.colors = [blend(colors[0], colors[1], 1 - abs(1 - 2 * i / steps)) for i in range(steps)]
+        self.label = tk.Label(
+            parent,
+            bg=self.colors[0],
+            fg="#FFFFFF",
+            font=("Helvetica", 12, "bold"),
+            anchor="w",
+            padx=10,
+            pady=4
+        )
+        self.text = CachedLabel(self.label)
+        self.frame = 0
+        self.active = False
+        self.frames = 0  # images effectivement dessinées
+
+    def show(self, message):
+        self.text.set(f"🚨 {message}")
+        if self.below is not None:
+            # Juste sous ce widget, sur toute sa largeur, même après redimensionnement
+            self.label.place(in_=self.below, relx=0, rely=1, relwidth=1)
+        else:
+            self.label.place(relx=0, rely=0, relwidth=1)
+        self.label.lift()
+        self.active = True
+        self.resume()
+
+    def resume(self):
+        if self.active:
+            self.scheduler.add("flash", self.interval, self.animate)
+
+    def pause(self):
+        """Fenêtre masquée ou réduite : rien à dessiner"""
+        self.scheduler.cancel("flash")
+
+    def animate(self):
+        self.frame = (self.frame + 1) % len(self.colors)
+        self.label.configure(bg=self.colors[self.frame])
+        self.frames += 1
+
+    def hide(self):
+        self.active = False
+        self.pause()
+        self.label.place_forget()
+        self.frame = 0
+        self.label.configure(bg=self.colors[0])
+
+
+class Toast:
+    """Fenêtre de notification du pool, masquée entre deux affichages"""
+
+    def __init__(self, root, index):
+        self.index = index
+        self.window = tk.Toplevel(root)
+        self.window.withdraw()
+        self.window.overrideredirect(True)
+        self.window.attributes("-topmost", True)
+
+        self.frame = ttk.Frame(self.window, padding=10, style='dark.TFrame')
+        self.frame.pack(fill="both", expand=True)
+        title_label = ttk.Label(self.frame, style='dark.Inverse.TLabel', font=("Helvetica", 10, "bold"))
+        title_label.pack(anchor="w")
+        message_label = ttk.Label(
+            self.frame,
+            style='dark.Inverse.TLabel',
+            wraplength=TOAST_WIDTH - 20,
+            justify="left"
+        )
+        message_label.pack(anchor="w", pady=(4, 0))
+        self.title = CachedLabel(title_label)
+        self.message = CachedLabel(message_label)
+        self.labels = (title_label, message_label)
+        self.color = "dark"
+        self.visible = False
+        self.shown_at = 0
+
+
+class ToastPool(NotificationBackend):
+    """Backend Tk : quelques Toplevel créés à la demande puis réutilisés
+
+    Chaque ToastNotification de ttkbootstrap crée, dispose puis détruit
+    son propre Toplevel ; ici une notification ne coûte qu'une mise à
+    jour des labels et un deiconify.
+    """
+
+    def __init__(self, root, scheduler, size=TOAST_POOL_SIZE):
+        self.root = root
+        self.scheduler = scheduler
+        self.size = size
+        self.toasts = []
+        self.created = 0
+        self.shows = 0
+
+    def acquire(self):
+        """Fenêtre libre, nouvelle si le pool n'est pas plein, sinon la plus ancienne"""
+        for toast in self.toasts:
+            if not toast.visible:
+                return toast
+        if len(self.toasts) < self.size:
+            toast = Toast(self.root, len(self.toasts))
+            self.toasts.append(toast)
+            self.created += 1
+            return toast
+        return min(self.toasts, key=lambda toast: toast.shown_at)
+
+    def show(self, title, message, duration, alert=False):
+        toast = self.acquire()
+        self.shows += 1
+        toast.shown_at = self.shows
+        toast.title.set(title)
+        toast.message.set(message)
+
+        color = "danger" if alert else "dark"
+        if color != toast.color:
+            toast.frame.configure(style=f'{color}.TFrame')
+            for label in toast.labels:
+                label.configure(style=f'{color}.Inverse.TLabel')
+            toast.color = color
+
+        # Empilement par emplacement, depuis le coin inférieur droit
+        toast.window.update_idletasks()
+        height = toast.window.winfo_reqheight()
+        x = self.root.winfo_screenwidth() - TOAST_WIDTH - TOAST_MARGIN
+        y = self.root.winfo_screenheight() - (toast.index + 1) * (height + TOAST_MARGIN) - 40
+        toast.window.geometry(f"{TOAST_WIDTH}x{height}+{x}+{y}")
+        if not toast.visible:
+            toast.window.deiconify()
+            toast.visible = True
+
+        name = f"toast-{toast.index}"
+        self.scheduler.add(name, duration / 1000, lambda: self.hide(toast, name), delay=duration / 1000)
+
+    def hide(self, toast, name):
+        self.scheduler.cancel(name)
+        toast.window.withdraw()
+        toast.visible = False
+
+    def close(self):
+        for toast in self.toasts:
+            self.scheduler.cancel(f"toast-{toast.index}")
+            toast.window.destroy()
+        self.toasts = []
+
+
+class SecurityMonitorGUI:
+    def __init__(self, engine=None, history_hours=24):
+        self.engine = engine or MonitorEngine()
+        self.ui_queue = UiUpdateQueue()
+        self.engine.subscribe(self.ui_queue.put)
+        self._wake_r = self._wake_w = None
+        self.system_metrics = MetricsHistory(hours=history_hours)
+        self.metric_cards = {}
+        self.metric_sources = []
+        self.create_window()
+        self.setup_wakeup()
+        self.scheduler = TkScheduler(self.root)
+        self.create_gui()
+        self.notifier = NotificationManager(ToastPool(self.root, self.scheduler), self.scheduler)
+        self.setup_charts()
+        self.scheduler.add("ui", UI_FRAME_MS / 1000, self.process_ui_queue)
+
+    def setup_wakeup(self):
+        """Réveil de la boucle Tk par un tube (self-pipe)
+
+        Le thread émetteur n'écrit qu'un octet, sans aucun appel Tcl : il ne
+        dépend jamais de la disponibilité du thread Tk. Sans createfilehandler
+        (Windows), pas de réveil : process_ui_queue garde la cadence pleine
+        tant que la surveillance est armée.
+        """
+        if not hasattr(self.root.tk, "createfilehandler"):
+            return
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self.root.tk.createfilehandler(self._wake_r, tk.READABLE, self.on_wakeup)
+        self.ui_queue.wakeup = self.wake_ui
+
+    def wake_ui(self):
+        """Appelé depuis le thread émetteur : vidage de la file dès que Tk reprend la main"""
+        try:
+            os.write(self._wake_w, b"\0")
+        except OSError:
+            # Tube plein (réveil déjà en attente) ou fermé : la file sera vidée à sa prochaine échéance
+            pass
+
+    def on_wakeup(self, fd, mask):
+        """Dans le thread Tk : vidage du tube puis de la file d'événements"""
+        try:
+            while os.read(fd, 512):
+                pass
+        except OSError:
+            pass
+        self.scheduler.reschedule("ui")
+
+    def close_wakeup(self):
+        if self._wake_r is None:
+            return
+        self.ui_queue.wakeup = None
+        self.root.tk.deletefilehandler(self._wake_r)
+        for fd in (self._wake_r, self._wake_w):
+            os.close(fd)
+        self._wake_r = self._wake_w = None
+
+    def create_window(self):
+        """Création de la fenêtre principale avec thème moderne"""
+        self.root = ttk.Window(
+            title="Système de Surveillance Pro",
+            themename="darkly",
+            size=(1024, 768),
+            resizable=(True, True)
+        )
+        self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+
+        # Configuration de la grille principale
+        self.root.grid_columnconfigure(0, weight=1)
+        self.root.grid_columnconfigure(1, weight=3)
+        self.root.grid_rowconfigure(1, weight=1)
+
+    def create_gui(self):
+        """Interface utilisateur modernisée"""
+        self.create_header()
+        self.create_sidebar()
+        self.create_main_content()
+        self.create_status_bar()
+
+    def create_header(self):
+        """En-tête amélioré avec barre de navigation"""
+        header = ttk.Frame(self.root, style='primary.TFrame', padding=10)
+        header.grid(row=0, column=0, columnspan=2, sticky="ew")
+
+        # Logo et titre
+        title_frame = ttk.Frame(header)
+        title_frame.pack(side="left")
+
+        title = ttk.Label(
+            title_frame,
+            text="🛡️ Security Monitor Pro",
+            font=("Helvetica", 20, "bold"),
+            style='primary.Inverse.TLabel'
+        )
+        title.pack(side="left", padx=10)
+
+        # Indicateurs d'état
+        status_frame = ttk.Frame(header)
+        status_frame.pack(side="right")
+
+        self.cpu_label = ttk.Label(
+            status_frame,
+            text="CPU: 0%",
+            style='primary.Inverse.TLabel'
+        )
+        self.cpu_label.pack(side="left", padx=10)
+
+        self.memory_label = ttk.Label(
+            status_frame,
+            text="RAM: 0%",
+            style='primary.Inverse.TLabel'
+        )
+        self.memory_label.pack(side="left", padx=10)
+
+        self.status_label = ttk.Label(
+            status_frame,
+            text="■ Système Inactif",
+            style='primary.Inverse.TLabel'
+        )
+        self.status_label.pack(side="left", padx=10)
+
+    def create_sidebar(self):
+        """Panneau de contrôle latéral"""
+        sidebar = ttk.Frame(self.root, style='secondary.TFrame', padding=10)
+        sidebar.grid(row=1, column=0, sticky="nsew")
+
+        # Contrôles principaux
+        controls = ttk.LabelFrame(sidebar, text="Contrôles", padding=10)
+        controls.pack(fill="x", pady=5)
+
+        self.start_button = ttk.Button(
+            controls,
+            text="▶ Démarrer la surveillance",
+            command=self.toggle_monitoring,
+            style='success.TButton',
+            width=25
+        )
+        self.start_button.pack(pady=5, fill="x")
+
+        self.stop_alert_button = ttk.Button(
+            controls,
+            text="🔕 Désactiver l'alerte",
+            command=self.stop_alert,
+            style='danger.TButton',
+            state="disabled",
+            width=25
+        )
+        self.stop_alert_button.pack(pady=5, fill="x")
+
+        # Statistiques
+        stats = ttk.LabelFrame(sidebar, text="Statistiques", padding=10)
+        stats.pack(fill="x", pady=5)
+
+        self.incident_label = ttk.Label(
+            stats,
+            text="🚨 Incidents: 0",
+            style='primary.TLabel'
+        )
+        self.incident_label.pack(pady=5)
+
+        self.time_label = ttk.Label(
+            stats,
+            text="⏱️ Durée: 00:00:00",
+            style='primary.TLabel'
+        )
+        self.time_label.pack(pady=5)
+
+        # Paramètres
+        settings = ttk.LabelFrame(sidebar, text="Paramètres", padding=10)
+        settings.pack(fill="x", pady=5)
+
+        ttk.Label(settings, text="Sensibilité:").pack(pady=2)
+        self.sensitivity = ttk.Scale(
+            settings,
+            from_=1,
+            to=10,
+            value=self.engine.config.sensitivity,
+            command=lambda value: self.engine.update_config(sensitivity=float(value))
+        )
+        self.sensitivity.pack(fill="x", pady=5)
+
+        # Mode sonore
+        self.sound_var = tk.BooleanVar(value=self.engine.config.sound_enabled)
+        self.sound_var.trace_add(
+            "write",
+            lambda *args: self.engine.update_config(sound_enabled=self.sound_var.get())
+        )
+        sound_check = ttk.Checkbutton(
+            settings,
+            text="Alerte sonore",
+            variable=self.sound_var,
+            style='primary.TCheckbutton'
+        )
+        sound_check.pack(pady=5)
+
+        # Diagnostics : temps des chemins critiques, mesurés seulement si activé
+        diagnostics = ttk.LabelFrame(sidebar, text="Diagnostics", padding=10)
+        diagnostics.pack(fill="x", pady=5)
+
+        self.diagnostics_var = tk.BooleanVar(value=instruments.enabled)
+        ttk.Checkbutton(
+            diagnostics,
+            text="Mesurer les temps",
+            variable=self.diagnostics_var,
+            command=self.toggle_diagnostics,
+            style='primary.TCheckbutton'
+        ).pack(pady=5)
+
+        diagnostics_label = ttk.Label(diagnostics, font=("Consolas", 8), justify="left")
+        diagnostics_label.pack(fill="x")
+        self.diagnostics_label = CachedLabel(diagnostics_label)
+        if instruments.enabled:
+            self.scheduler.add("diagnostics", DIAGNOSTICS_INTERVAL, self.update_diagnostics)
+
+    def create_main_content(self):
+        """Contenu principal avec visualisations"""
+        main_frame = ttk.Frame(self.root, padding=10)
+        main_frame.grid(row=1, column=1, sticky="nsew")
+        main_frame.grid_columnconfigure(0, weight=1)
+        main_frame.grid_rowconfigure(1, weight=1)
+
+        # Métriques en temps réel
+        metrics_frame = ttk.Frame(main_frame)
+        metrics_frame.grid(row=0, column=0, sticky="ew", pady=(0, 10))
+
+        for i in range(4):
+            metrics_frame.grid_columnconfigure(i, weight=1)
+
+        # Cartes de métriques
+        self.metric_cards["battery"] = self.create_metric_card(metrics_frame, 0, "Batterie", "—")
+        self.metric_cards["cpu"] = self.create_metric_card(metrics_frame, 1, "Charge CPU", "—")
+        self.metric_cards["memory"] = self.create_metric_card(metrics_frame, 2, "Mémoire", "—")
+        self.metric_cards["temperature"] = self.create_metric_card(metrics_frame, 3, "Température", "—")
+
+        # Zone de logs améliorée
+        log_frame = ttk.LabelFrame(main_frame, text="Journal de Sécurité", padding=10)
+        log_frame.grid(row=1, column=0, sticky="nsew")
+
+        # Barre d'outils des logs
+        log_toolbar = ttk.Frame(log_frame)
+        log_toolbar.pack(fill="x", pady=(0, 5))
+
+        ttk.Button(
+            log_toolbar,
+            text="📁 Exporter",
+            style='primary.Outline.TButton',
+            command=self.export_logs
+        ).pack(side="left", padx=5)
+
+        ttk.Button(
+            log_toolbar,
+            text="🗑️ Effacer",
+            style='danger.Outline.TButton',
+            command=self.clear_logs
+        ).pack(side="left", padx=5)
+
+        # Zone de texte des logs
+        self.log_text = tk.Text(
+            log_frame,
+            height=20,
+            wrap=tk.WORD,
+            bg='#2b3e50',
+            fg='#ffffff',
+            font=("Consolas", 10)
+        )
+        self.log_text.pack(side="left", fill="both", expand=True)
+
+        self.log_view = LogView(self.log_text, self.engine.log_file)
+
+        scrollbar = ttk.Scrollbar(log_frame, orient="vertical", command=self.log_view.yview)
+        scrollbar.pack(side="right", fill="y")
+        self.log_text.configure(yscrollcommand=scrollbar.set)
+
+        # Configuration des tags pour le formatage
+        self.log_text.tag_configure("timestamp", foreground="#888888")
+        for level, style in LOG_STYLES.items():
+            self.log_text.tag_configure(level, foreground=style['color'])
+
+        # Bandeau d'alerte, superposé au haut du journal (sous sa barre d'outils) pendant une alarme
+        self.alert_banner = AlertBanner(log_frame, self.scheduler, below=log_toolbar)
+        self.root.bind("<Unmap>", lambda e: self.alert_banner.pause() if e.widget is self.root else None, add="+")
+        self.root.bind("<Map>", lambda e: self.alert_banner.resume() if e.widget is self.root else None, add="+")
+
+    def create_metric_card(self, parent, column, title, value):
+        """Création d'une carte de métrique"""
+        return MetricCard(parent, column, title, value)
+
+    def create_status_bar(self):
+        """Barre d'état avec progression"""
+        status_bar = ttk.Frame(self.root, style='primary.TFrame', padding=5)
+        status_bar.grid(row=2, column=0, columnspan=2, sticky="ew")
+
+        self.progress = ttk.Progressbar(
+            status_bar,
+            mode='indeterminate',
+            style='success.Horizontal.TProgressbar'
+        )
+        self.progress.pack(fill="x", padx=5)
+
+    def setup_charts(self):
+        """Configuration des graphiques"""
+        # Registre des sources : (cible, fonction échantillon -> texte ou None)
+        self.register_metric(CachedLabel(self.cpu_label, "CPU: 0%"), lambda m: f"CPU: {m['cpu']}%")
+        self.register_metric(CachedLabel(self.memory_label, "RAM: 0%"), lambda m: f"RAM: {m['memory']}%")
+        self.register_metric(
+            self.metric_cards["battery"],
+            lambda m: f"{m['battery']:.0f}%" if m["battery"] is not None else None
+        )
+        self.register_metric(self.metric_cards["cpu"], lambda m: f"{m['cpu']}%")
+        self.register_metric(self.metric_cards["memory"], lambda m: f"{m['memory']}%")
+        self.register_metric(
+            self.metric_cards["temperature"],
+            lambda m: f"{m['temperature']:.0f}°C" if m["temperature"] is not None else None
+        )
+
+        # Mini-graphiques sous chaque carte : (colonne d'historique, bornes, couleur)
+        self.charts = {}
+        for name, low, high, color in (
+            ("battery", 0, 100, "#4CAF50"),
+            ("cpu", 0, 100, "#2196F3"),
+            ("memory", 0, 100, "#9C27B0"),
+            ("temperature", 20, 100, "#FF9800")
+        ):
+            chart = Sparkline(self.metric_cards[name].frame, self.system_metrics, name, low, high, color,
+                              scheduler=self.scheduler)
+            chart.canvas.pack(fill="x", padx=5, pady=(0, 5))
+            chart.canvas.bind("<Button-1>", lambda e: self.toggle_chart_span())
+            self.charts[name] = chart
+
+        # Démarrage de la mise à jour des métriques, à cadence adaptative
+        self.sampler = AdaptiveSampler()
+        self.scheduler.add("metrics", self.sampler.min_interval, self.update_metrics)
+
+        # Nouveau relevé immédiat quand la fenêtre réapparaît
+        self.root.bind("<Map>", lambda e: self.resample() if e.widget is self.root else None, add="+")
+
+    def register_metric(self, target, source):
+        """Association d'une source de métrique à un label ou une carte"""
+        self.metric_sources.append((target, source))
+
+    def toggle_diagnostics(self):
+        """Activation des mesures (moteur et interface) et de leur affichage"""
+        enabled = self.diagnostics_var.get()
+        instruments.enable(enabled)
+        if enabled:
+            self.scheduler.add("diagnostics", DIAGNOSTICS_INTERVAL, self.update_diagnostics)
+        else:
+            self.scheduler.cancel("diagnostics")
+            self.diagnostics_label.set("")
+
+    def update_diagnostics(self):
+        """p50 / p99 de chaque section mesurée, en millisecondes"""
+        self.diagnostics_label.set("\n".join(
+            f"{name[:16]:<16} {p50 * 1000:6.2f} / {p99 * 1000:6.2f}"
+            for name, (count, p50, p99, _) in instruments.summary().items()
+            if count
+        ) or "Aucune mesure")
+
+    @instruments.timed("update_metrics")
+    def update_metrics(self):
+        """Mise à jour des métriques système ; renvoie le délai avant le prochain relevé"""
+        sample = collect_sample()
+
+        # Seuls les textes modifiés génèrent un appel Tcl
+        for target, source in self.metric_sources:
+            text = source(sample)
+            if text is not None:
+                target.set(text)
+
+        # Ajout des données pour les graphiques (tampon circulaire, O(1))
+        now = time.time()
+        self.system_metrics.append(
+            sample["cpu"], sample["memory"], sample["battery"], now, sample["temperature"]
+        )
+
+        # Une seule colonne redessinée par graphique
+        for name, chart in self.charts.items():
+            chart.add(sample[name], now)
+
+        # Cadence rapide si la surveillance est armée ou la fenêtre visible
+        visible = self.root.state() not in ("iconic", "withdrawn")
+        return self.sampler.next_interval(sample, self.engine.monitoring_active or visible)
+
+    def toggle_chart_span(self):
+        """Passage des graphiques de la dernière heure aux dernières 24 h, et retour"""
+        charts = list(self.charts.values())
+        span = CHART_SPANS[(CHART_SPANS.index(charts[0].span) + 1) % len(CHART_SPANS)]
+        now = time.time()
+        for chart in charts:
+            chart.set_span(span, now)
+
+    def resample(self):
+        """Relevé immédiat suite à un événement (alimentation, fenêtre, armement)"""
+        self.sampler.reset()
+        self.scheduler.reschedule("metrics")
+
+    def export_logs(self):
+        """Exportation des logs depuis les fichiers du journal, avec filtres"""
+        dialog = ttk.Toplevel(self.root)
+        dialog.title("Exporter le journal")
+        dialog.transient(self.root)
+        frame = ttk.Frame(dialog, padding=10)
+        frame.pack(fill="both", expand=True)
+
+        choices = {}
+        for row, (label, values) in enumerate((
+            ("Période", list(EXPORT_PERIODS)),
+            ("Niveau", list(EXPORT_LEVELS)),
+            ("Format", list(EXPORT_FORMATS))
+        )):
+            ttk.Label(frame, text=f"{label}:").grid(row=row, column=0, sticky="w", pady=2)
+            combo = ttk.Combobox(frame, values=values, state="readonly")
+            combo.current(0)
+            combo.grid(row=row, column=1, sticky="ew", pady=2)
+            choices[label] = combo
+
+        progress = ttk.Progressbar(frame, mode='determinate', maximum=1.0)
+        progress.grid(row=3, column=0, columnspan=2, sticky="ew", pady=5)
+
+        def start():
+            period = EXPORT_PERIODS[choices["Période"].get()]
+            fmt = choices["Format"].get()
+            self.export_progress = progress
+            button.configure(state="disabled")
+            threading.Thread(
+                target=self.run_export,
+                args=(
+                    f"security_logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}",
+                    fmt,
+                    datetime.now() - period if period else None,
+                    EXPORT_LEVELS[choices["Niveau"].get()]
+                ),
+                daemon=True
+            ).start()
+
+        button = ttk.Button(frame, text="📁 Exporter", style='primary.TButton', command=start)
+        button.grid(row=4, column=0, columnspan=2, sticky="ew")
+        self.export_dialog = dialog
+
+    def run_export(self, filename, fmt, since, levels):
+        """Export en flux dans un thread dédié ; avancement transmis via la file UI"""
+        try:
+            count = export_journal(
+                self.engine.log_file,
+                filename,
+                fmt,
+                since=since,
+                levels=levels,
+                progress=lambda fraction: self.ui_queue.put("export_progress", {"fraction": fraction})
+            )
+        except Exception as e:
+            self.ui_queue.put("export_done", {"error": str(e)})
+        else:
+            self.ui_queue.put("export_done", {"filename": filename, "count": count})
+
+    def finish_export(self, data):
+        """Fin de l'export : fermeture du dialogue et notification"""
+        if self.export_dialog.winfo_exists():
+            self.export_dialog.destroy()
+
+        if "error" in data:
+            self.log_event(f"Erreur d'export: {data['error']}", "warning")
+            return
+
+        self.notifier.notify(
+            "Export réussi",
+            f"{data['count']} entrées exportées vers {data['filename']}"
+        )
+
+    def clear_logs(self):
+        """Effacement des logs"""
+        if Messagebox.show_question(
+            "Confirmation",
+            "Voulez-vous vraiment effacer tous les logs ?",
+            parent=self.root
+        ):
+            self.log_view.clear()
+            self.log_event("Journal effacé", "info")
+
+    @instruments.timed("ui_frame")
+    def process_ui_queue(self):
+        """Application groupée des événements du moteur, dans le thread Tk"""
+        events = self.ui_queue.drain()
+        for event, data in events:
+            self.on_engine_event(event, data)
+
+        # Une seule purge et un seul défilement par trame, quel que soit le nombre de lignes
+        self.log_view.flush()
+
+        # Cadence pleine tant que des événements arrivent, ralentie sinon ; sans réveil
+        # par tube, une alerte ne doit pas attendre UI_IDLE_MS
+        busy = events or (self.ui_queue.wakeup is None and self.engine.monitoring_active)
+        return (UI_FRAME_MS if busy else UI_IDLE_MS) / 1000
+
+    def on_engine_event(self, event, data):
+        """Réception des événements du moteur de surveillance"""
+        if event == "log":
+            self.append_log(data["timestamp"], data["message"], data["level"])
+        elif event == "log_gap":
+            self.log_view.resync(data["count"])
+        elif event == "incident":
+            self.incident_label.configure(text=f"🚨 Incidents: {data['count']}")
+        elif event == "elapsed":
+            self.time_label.configure(text=f"⏱️ Durée: {data['text']}")
+        elif event == "alert":
+            self.show_alert(data["message"])
+        elif event == "alert_stopped":
+            self.clear_alert()
+        elif event == "started":
+            self.show_monitoring_started()
+            self.resample()
+        elif event == "stopped":
+            self.show_monitoring_stopped()
+            self.resample()
+        elif event == "power":
+            self.resample()
+        elif event == "export_progress":
+            if self.export_dialog.winfo_exists():
+                self.export_progress.configure(value=data["fraction"])
+        elif event == "export_done":
+            self.finish_export(data)
+        elif event == "config":
+            self.show_config(data["config"])
+
+    def show_config(self, config):
+        """Paramètres rechargés (fichier ou API) : alignement des contrôles, sans boucle de retour"""
+        if float(self.sensitivity.get()) != config["sensitivity"]:
+            self.sensitivity.set(config["sensitivity"])
+        if self.sound_var.get() != config["sound_enabled"]:
+            self.sound_var.set(config["sound_enabled"])
+
+    @instruments.timed("show_alert")
+    def show_alert(self, message):
+        """Système d'alerte amélioré"""
+        self.stop_alert_button.configure(state="normal")
+        self.status_label.configure(foreground="#F44336")
+        self.alert_banner.show(message)
+
+        # Notification système
+        self.notifier.notify_event("alert", message)
+
+    def stop_alert(self):
+        """Arrêt de l'alerte depuis l'interface"""
+        self.engine.stop_alert()
+
+    def clear_alert(self):
+        """Retour à la normale des éléments visuels"""
+        self.stop_alert_button.configure(state="disabled")
+        self.alert_banner.hide()
+
+        # Réinitialisation des éléments visuels
+        self.status_label.configure(foreground="#FFFFFF")
+
+        # Notification de fin d'alerte
+        self.notifier.notify_event("alert_stopped")
+
+    def toggle_monitoring(self):
+        """Activation/désactivation de la surveillance avec animation"""
+        if not self.engine.monitoring_active:
+            self.start_monitoring()
+        else:
+            self.stop_monitoring()
+
+    def start_monitoring(self):
+        """Démarrage amélioré de la surveillance"""
+        self.engine.start()
+        # Affichage dès la trame suivante, sans attendre la cadence ralentie de la file
+        self.scheduler.reschedule("ui")
+
+    def show_monitoring_started(self):
+        """Mise à jour de l'interface, que l'armement vienne du bouton ou de l'API de contrôle"""
+        self.progress.start(10)
+
+        # Mise à jour des éléments visuels
+        self.start_button.configure(
+            text="⏹️ Arrêter la surveillance",
+            style='warning.TButton'
+        )
+        self.status_label.configure(
+            text="■ Système Actif",
+            foreground="#4CAF50"
+        )
+
+        # Animation de démarrage
+        self.animate_startup()
+
+        # Notification
+        self.notifier.notify_event("started")
+
+    def animate_startup(self):
+        """Animation de démarrage du système"""
+        steps = iter(range(0, 100, 2))
+
+        def animate_progress():
+            step = next(steps, None)
+            if step is not None and self.engine.monitoring_active:
+                self.progress.configure(value=step)
+            else:
+                self.scheduler.cancel("startup_animation")
+                self.progress.configure(mode='indeterminate')
+                self.progress.start(10)
+
+        self.progress.configure(mode='determinate', value=0)
+        self.scheduler.add("startup_animation", 0.02, animate_progress)
+
+    def stop_monitoring(self):
+        """Arrêt contrôlé du système"""
+        self.engine.stop()
+        self.scheduler.reschedule("ui")
+
+    def show_monitoring_stopped(self):
+        """Retour de l'interface à l'état inactif"""
+        self.progress.stop()
+
+        # Mise à jour des éléments visuels
+        self.start_button.configure(
+            text="▶ Démarrer la surveillance",
+            style='success.TButton'
+        )
+        self.status_label.configure(
+            text="■ Système Inactif",
+            foreground="#FFFFFF"
+        )
+
+        # Notification
+        self.notifier.notify_event("stopped")
+
+    def log_event(self, message, level="info", event="ui"):
+        """Journalisation via le moteur (fichier + interface)"""
+        self.engine.log_event(message, level, event)
+
+    def append_log(self, timestamp, message, level):
+        """Insertion d'une ligne formatée dans le journal affiché"""
+        self.log_view.append(timestamp, message, level)
+
+    def on_closing(self):
+        """Gestion améliorée de la fermeture"""
+        if self.engine.monitoring_active:
+            response = Messagebox.show_question(
+                "Confirmation",
+                "Le système de surveillance est actif.\nVoulez-vous vraiment quitter ?",
+                buttons=['Oui:primary', 'Non:secondary']
+            )
+
+            if response != "Oui":
+                return
+
+            # Fermeture confirmée : désarmement explicite, le superviseur ne la prendra pas
+            # pour une interruption
+            self.engine.stop()
+
+        # Arrêt propre du système
+        self.engine.shutdown()
+        self.notifier.close()
+
+        # Nettoyage
+        self.close_wakeup()
+        self.root.destroy()
+        sys.exit(0)
+
+    def run(self, arm=False):
+        """Lancement de l'application, sans attente d'écran de démarrage"""
+        # Finalisation dès que la boucle principale est disponible
+        self.root.after_idle(lambda: self.finish_startup(arm))
+
+        # Démarrage de la boucle principale
+        self.root.mainloop()
+
+    def finish_startup(self, arm=False):
+        """Finalisation du démarrage"""
+        # Log initial
+        self.log_event("🚀 Système initialisé et prêt", "info", event="system")
+
+        if arm:
+            self.start_monitoring()
+            return
+
+        # Notification de démarrage
+        self.notifier.notify_event("ready")
@@ -0,0 +1,120 @@
+"""Historique persistant des incidents (SQLite en mode WAL)
+
+Chaque incident garde le capteur déclencheur, la règle, l'instant de
+début et de fin, un instantané des lectures et la façon dont il a été
+clos (user, recovery, disarm, shutdown, interrupted).
+"""
+import json
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+INCIDENTS_FILENAME = "incidents.db"
+
+Incident = namedtuple(
+    "Incident",
+    ["id", "started", "ended", "sensor", "message", "cleared_by", "metrics"]
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS incidents (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    ended REAL,
+    sensor TEXT NOT NULL,
+    message TEXT NOT NULL,
+    cleared_by TEXT,
+    metrics TEXT
+);
+-- Index couvrants : la liste des incidents (sans l'instantané des lectures) se lit dans
+-- l'index seul, sans aller chercher chaque ligne dans la table
+DROP INDEX IF EXISTS incidents_started;
+DROP INDEX IF EXISTS incidents_sensor_started;
+CREATE INDEX IF NOT EXISTS incidents_started_listing
+    ON incidents (started, ended, sensor, message, cleared_by);
+CREATE INDEX IF NOT EXISTS incidents_sensor_listing
+    ON incidents (sensor, started, ended, message, cleared_by);
+"""
+
+
+class IncidentStore:
+    """Base SQLite partagée entre le thread de surveillance et les clients (GUI, API)
+
+    Les écritures sont rares (une par incident) et courtes : une seule
+    connexion protégée par un verrou suffit. Le mode WAL laisse les
+    lectures se faire sans bloquer l'écriture.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+        # Incidents restés ouverts lors d'un arrêt brutal
+        self._db.execute("UPDATE incidents SET cleared_by = 'interrupted' WHERE cleared_by IS NULL")
+
+    def open(self, sensor, message, metrics=None, started=None):
+        """Enregistrement d'un nouvel incident ; renvoie son identifiant"""
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO incidents (started, sensor, message, metrics) VALUES (?, ?, ?, ?)",
+                (
+                    time.time() if started is None else started,
+                    sensor,
+                    message,
+                    json.dumps(metrics, ensure_ascii=False) if metrics is not None else None
+                )
+            )
+            return cursor.lastrowid
+
+    def close(self, incident_id, cleared_by, ended=None):
+        """Clôture d'un incident : instant de fin et origine (user, recovery, ...)"""
+        with self._lock:
+            self._db.execute(
+                "UPDATE incidents SET ended = ?, cleared_by = ? WHERE id = ?",
+                (time.time() if ended is None else ended, cleared_by, incident_id)
+            )
+
+    def recent(self, days=7, sensor=None, limit=100, now=None, with_metrics=False):
+        """Incidents des `days` derniers jours, du plus récent au plus ancien
+
+        L'instantané des lectures (JSON) n'est relu que si with_metrics :
+        son décodage coûte plus cher que la requête elle-même. Les
+        instantanés sont alors décodés d'un bloc, en un seul appel à json.loads.
+        """
+        since = (time.time() if now is None else now) - days * 86400
+        columns = "*" if with_metrics else "id, started, ended, sensor, message, cleared_by, NULL"
+        query = f"SELECT {columns} FROM incidents WHERE started >= ?"
+        params = [since]
+        if sensor is not None:
+            query += " AND sensor = ?"
+            params.append(sensor)
+        query += " ORDER BY started DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        if not with_metrics:
+            return list(map(Incident._make, rows))
+        metrics = json.loads("[" + ",".join(row[6] or "null" for row in rows) + "]")
+        return [Incident._make(row[:6] + (snapshot,)) for row, snapshot in zip(rows, metrics)]
+
+    def count(self, days=None, sensor=None, now=None):
+        """Nombre d'incidents (sur les `days` derniers jours si précisé)"""
+        query = "SELECT COUNT(*) FROM incidents WHERE 1"
+        params = []
+        if days is not None:
+            query += " AND started >= ?"
+            params.append((time.time() if now is None else now) - days * 86400)
+        if sensor is not None:
+            query += " AND sensor = ?"
+            params.append(sensor)
+        with self._lock:
+            return self._db.execute(query, params).fetchone()[0]
+
+    def close_db(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,245 @@
+"""Instrumentation des chemins critiques : durées par section et profilage
+
+    with span("check_security"):
+        ...
+
+Désactivée par défaut : span() renvoie alors un contexte vide partagé, sans
+lecture d'horloge ni allocation. Activée (--profile, panneau Diagnostics
+de la GUI), chaque section alimente un histogramme de latence à précision
+relative constante, façon HdrHistogram.
+"""
+import cProfile
+import functools
+import pstats
+import sys
+import threading
+import time
+
+# Histogramme : 2**SUB_BUCKET_BITS sous-intervalles par puissance de deux (~3 % de précision),
+# valeurs en nanosecondes jusqu'à 2**MAX_VALUE_BITS (~18 min)
+SUB_BUCKET_BITS = 6
+MAX_VALUE_BITS = 40
+
+# Quantiles affichés par le rapport et le panneau Diagnostics
+REPORT_QUANTILES = (0.5, 0.99)
+
+
+class LatencyHistogram:
+    """Histogramme log-linéaire : enregistrement en O(1), quantiles à ~3 % près
+
+    Les valeurs de moins de 2**SUB_BUCKET_BITS ns ont chacune leur case ;
+    au-delà, chaque puissance de deux est découpée en 2**(SUB_BUCKET_BITS - 1)
+    cases de même largeur.
+    """
+
+    HALF = 1 << (SUB_BUCKET_BITS - 1)
+    MAX_VALUE = (1 << MAX_VALUE_BITS) - 1
+
+    def __init__(self):
+        self.counts = [0] * (self.index(self.MAX_VALUE) + 1)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def index(cls, value):
+        shift = max(0, value.bit_length() - SUB_BUCKET_BITS)
+        return shift * cls.HALF + (value >> shift)
+
+    @classmethod
+    def lowest(cls, index):
+        """Plus petite valeur (ns) de la case `index`"""
+        shift = max(0, index // cls.HALF - 1)
+        return (index - shift * cls.HALF) << shift
+
+    def record_ns(self, value):
+        if value > self.MAX_VALUE:
+            value = self.MAX_VALUE
+        shift = value.bit_length() - SUB_BUCKET_BITS
+        i = shift * self.HALF + (value >> shift) if shift > 0 else value
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.total += value
+            if value > self.max:
+                self.max = value
+
+    def observe(self, seconds):
+        self.record_ns(max(0, int(seconds * 1e9)))
+
+    def quantile(self, q):
+        """Valeur (s) sous laquelle se trouve la fraction q des mesures (borne haute de sa case)"""
+        with self._lock:
+            counts, count, largest = list(self.counts), self.count, self.max
+        if not count:
+            return 0.0
+        target = max(1, int(q * count + 0.5))
+        running = 0
+        for i, n in enumerate(counts):
+            running += n
+            if running >= target:
+                return min(self.lowest(i + 1) - 1, largest) / 1e9
+        return largest / 1e9
+
+    def cumulative(self, bounds):
+        """Effectifs cumulés sous chaque borne (s), au grain des cases, puis total et somme (s)"""
+        with self._lock:
+            counts, count, total = list(self.counts), self.count, self.total
+        result = []
+        for bound in bounds:
+            limit = min(self.index(min(int(bound * 1e9), self.MAX_VALUE)), len(counts) - 1)
+            result.append(sum(counts[:limit + 1]))
+        return result, count, total / 1e9
+
+    def reset(self):
+        with self._lock:
+            self.counts = [0] * len(self.counts)
+            self.count = self.total = self.max = 0
+
+
+class Span:
+    """Mesure d'une section : deux lectures d'horloge monotone"""
+
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.record_ns(time.perf_counter_ns() - self.start)
+        return False
+
+
+class NullSpan:
+    """Section non mesurée (instrumentation désactivée)"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+
+class Instrumentation:
+    """Registre des histogrammes par section, partagé par le moteur et la GUI"""
+
+    def __init__(self):
+        self.enabled = False
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, LatencyHistogram())
+        return histogram
+
+    def span(self, name):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self.histogram(name))
+
+    def timed(self, name):
+        """Décorateur : chaque appel de la fonction est une section"""
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def summary(self):
+        """{section: (nombre, p50, p99, max)} en secondes"""
+        return {
+            name: (histogram.count, *(histogram.quantile(q) for q in REPORT_QUANTILES), histogram.max / 1e9)
+            for name, histogram in sorted(self.histograms.items())
+        }
+
+    def report(self):
+        lines = [f"{'section':<20} {'n':>8} {'p50':>10} {'p99':>10} {'max':>10}"]
+        for name, (count, p50, p99, largest) in self.summary().items():
+            lines.append(f"{name:<20} {count:>8} {p50 * 1000:>8.3f}ms {p99 * 1000:>8.3f}ms {largest * 1000:>8.3f}ms")
+        return "\n".join(lines)
+
+    def reset(self):
+        for histogram in list(self.histograms.values()):
+            histogram.reset()
+
+
+instruments = Instrumentation()
+span = instruments.span
+
+
+class Profiler:
+    """cProfile sur le thread principal et sur chaque thread démarré ensuite
+
+    Jusqu'à Python 3.11, un profileur ne voit que le thread qui l'a activé :
+    chaque nouveau thread reçoit le sien. Depuis 3.12, cProfile s'appuie sur
+    sys.monitoring, commun à tous les threads, et refuse un second profileur
+    actif : le profileur du thread principal couvre alors tout le processus.
+
+    Le rapport est un fichier pstats (.prof), lisible par `python -m pstats`,
+    snakeviz ou flameprof (flamegraph).
+    """
+
+    PER_THREAD = sys.version_info < (3, 12)
+
+    def __init__(self):
+        self.profiles = []
+        self._lock = threading.Lock()
+
+    def _new_profile(self):
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Un autre outil de profilage est déjà actif (débogueur, coverage...)
+            return
+        with self._lock:
+            self.profiles.append(profile)
+
+    def _start_thread(self, frame, event, arg):
+        # Premier événement du nouveau thread : remplacement de ce crochet par cProfile
+        sys.setprofile(None)
+        self._new_profile()
+
+    def start(self):
+        if self.PER_THREAD:
+            threading.setprofile(self._start_thread)
+        self._new_profile()
+
+    def stop(self, path):
+        """Écriture du profil cumulé ; None si aucun thread n'a produit de mesure"""
+        if self.PER_THREAD:
+            threading.setprofile(None)
+            sys.setprofile(None)
+        with self._lock:
+            profiles = list(self.profiles)
+        measured = []
+        for profile in profiles:
+            profile.create_stats()
+            # Thread terminé avant son premier appel profilé : rien à fusionner
+            if profile.stats:
+                measured.append(profile)
+        if not measured:
+            return None
+        stats = pstats.Stats(measured[0])
+        for profile in measured[1:]:
+            stats.add(profile)
+        stats.dump_stats(path)
+        return stats
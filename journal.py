@@ -0,0 +1,358 @@
+"""Écriture et lecture du journal de sécurité sur disque
+
+Le journal est écrit au format JSON lines par un thread dédié
+(QueueHandler / QueueListener) : l'appelant, y compris le thread Tk,
+ne fait jamais d'entrée/sortie fichier.
+"""
+import csv
+import glob
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import time
+from datetime import datetime, timedelta
+
+LOG_FILENAME = "security.log"
+
+# Formats d'export disponibles et colonnes du CSV
+EXPORT_FORMATS = ("txt", "jsonl", "csv")
+EXPORT_FIELDS = ("time", "level", "event", "message")
+
+# Niveau logging -> niveau d'affichage du journal
+LEVEL_TAGS = {
+    "DEBUG": "info",
+    "INFO": "info",
+    "WARNING": "warning",
+    "ERROR": "alert",
+    "CRITICAL": "alert"
+}
+
+
+class MonotonicFilter(logging.Filter):
+    """Horodatage monotone pris dans le thread appelant, avant la mise en file"""
+
+    def filter(self, record):
+        if not hasattr(record, "mono"):
+            record.mono = time.monotonic()
+        return True
+
+
+class JsonLineFormatter(logging.Formatter):
+    """Une entrée JSON par ligne : time, mono, level, event, message"""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "mono": round(getattr(record, "mono", record.created), 6),
+            "level": record.levelname,
+            "event": getattr(record, "event", "general"),
+            "message": record.getMessage()
+        }
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class JournalFileHandler(logging.handlers.BaseRotatingHandler):
+    """Fichier de log avec rotation à minuit et au-delà d'une taille maximale
+
+    Les fichiers tournés sont nommés security.log.AAAAMMJJ-HHMMSS-ffffff
+    (suffixés .gz si la compression est active) ; seuls les `backup_count`
+    plus récents sont conservés.
+    """
+
+    def __init__(self, filename, max_bytes=10 * 1024 * 1024, backup_count=30, compress=True):
+        super().__init__(filename, "a", encoding="utf-8")
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        if compress:
+            self.namer = lambda name: name + ".gz"
+            self.rotator = gzip_rotator
+        self.next_rollover = next_midnight(time.time())
+
+    def shouldRollover(self, record):
+        if time.time() >= self.next_rollover:
+            return True
+        if self.max_bytes and self.stream is not None:
+            size = self.stream.tell() + len(self.format(record)) + 1
+            return size >= self.max_bytes
+        return False
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        self.rotate(self.baseFilename, self.rotation_filename(f"{self.baseFilename}.{stamp}"))
+
+        # Suppression des fichiers tournés les plus anciens
+        for old in rotated_files(self.baseFilename)[self.backup_count:]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+        self.stream = self._open()
+        self.next_rollover = next_midnight(time.time())
+
+
+def gzip_rotator(source, dest):
+    """Compression du fichier tourné (exécutée dans le thread d'écriture)"""
+    if not os.path.exists(source):
+        return
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+def next_midnight(now):
+    tomorrow = datetime.fromtimestamp(now).date() + timedelta(days=1)
+    return datetime.combine(tomorrow, datetime.min.time()).timestamp()
+
+
+def rotated_files(log_file):
+    """Fichiers tournés, du plus récent au plus ancien"""
+    return sorted(glob.glob(glob.escape(log_file) + ".*"), reverse=True)
+
+
+def journal_files(log_file):
+    """Fichier courant puis fichiers tournés, du plus récent au plus ancien"""
+    return [log_file] + rotated_files(log_file)
+
+
+def setup_logging(log_dir, max_bytes=10 * 1024 * 1024, backup_count=30, compress=True):
+    """Installation de l'écriture asynchrone du journal sur le logger racine
+
+    Renvoie le QueueListener, à arrêter (stop) pour vider la file à la fermeture.
+    """
+    os.makedirs(log_dir, exist_ok=True)
+    file_handler = JournalFileHandler(
+        os.path.join(log_dir, LOG_FILENAME),
+        max_bytes=max_bytes,
+        backup_count=backup_count,
+        compress=compress
+    )
+    file_handler.setFormatter(JsonLineFormatter())
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(MonotonicFilter())
+
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(queue_handler)
+
+    listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def stop_logging(listener):
+    """Vidage de la file d'écriture et retrait du handler installé par setup_logging"""
+    listener.stop()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler) and handler.queue is listener.queue:
+            root.removeHandler(handler)
+
+
+def _open_journal(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def _read_backwards(path, skip, count, block_size):
+    """Lecture à rebours d'un fichier non compressé
+
+    Renvoie (lignes de la plus récente à la plus ancienne, nombre de lignes parcourues).
+    """
+    lines = []
+    index = 0  # rang de la ligne en partant de la fin
+    with open(path, "rb") as f:
+        end = f.seek(0, os.SEEK_END)
+        if end:
+            f.seek(end - 1)
+            if f.read(1) == b"\n":
+                end -= 1
+
+        pos = end
+        tail = b""
+        while pos > 0 and len(lines) < count:
+            size = min(block_size, pos)
+            pos -= size
+            f.seek(pos)
+            parts = (f.read(size) + tail).split(b"\n")
+            tail = parts.pop(0)
+            for part in reversed(parts):
+                if index >= skip:
+                    lines.append(part)
+                    if len(lines) >= count:
+                        break
+                index += 1
+
+        # Première ligne du fichier, sans saut de ligne devant elle
+        if pos == 0 and end > 0 and len(lines) < count:
+            if index >= skip:
+                lines.append(tail)
+            index += 1
+    return lines, index
+
+
+def _read_compressed(path, skip, count):
+    """Lecture d'un fichier .gz (deux passes en flux : comptage puis extraction)"""
+    with _open_journal(path) as f:
+        total = sum(1 for _ in f)
+    first = max(0, total - skip - count)
+    last = total - skip
+    lines = []
+    if last > first:
+        with _open_journal(path) as f:
+            for i, line in enumerate(f):
+                if i >= last:
+                    break
+                if i >= first:
+                    lines.append(line.rstrip(b"\n"))
+    lines.reverse()
+    return lines, total
+
+
+def read_log_lines(log_file, skip, count, block_size=65536):
+    """Lecture de `count` lignes situées avant les `skip` dernières lignes du journal
+
+    Le fichier courant puis les fichiers tournés sont parcourus à rebours :
+    la mémoire utilisée ne dépend que de `count`, pas de la taille du
+    journal ni de `skip`. Les lignes sont renvoyées de la plus ancienne à
+    la plus récente.
+    """
+    lines = []
+    for path in journal_files(log_file):
+        try:
+            if path.endswith(".gz"):
+                found, seen = _read_compressed(path, skip, count - len(lines))
+            else:
+                found, seen = _read_backwards(path, skip, count - len(lines), block_size)
+        except (OSError, EOFError):
+            continue
+        lines.extend(found)
+        if len(lines) >= count:
+            break
+        skip = max(0, skip - seen)
+
+    lines.reverse()
+    return [line.decode("utf-8", errors="replace") for line in lines]
+
+
+def parse_record(line):
+    """Décodage d'une ligne du journal en dictionnaire (None si illisible)
+
+    Les anciennes lignes texte « asctime - LEVEL - message » sont converties.
+    """
+    try:
+        record = json.loads(line)
+        if isinstance(record, dict):
+            return record
+    except ValueError:
+        pass
+
+    parts = line.split(" - ", 2)
+    if len(parts) != 3:
+        return None
+    asctime, levelname, message = parts
+    return {
+        "time": asctime.replace(" ", "T").replace(",", "."),
+        "level": levelname,
+        "event": "general",
+        "message": message
+    }
+
+
+def parse_log_line(line):
+    """Découpage d'une ligne du journal en (heure, message, niveau d'affichage)"""
+    record = parse_record(line)
+    if record is None:
+        return "", line, "info"
+    return (
+        record.get("time", "")[11:19],
+        record.get("message", ""),
+        LEVEL_TAGS.get(record.get("level"), "info")
+    )
+
+
+def _record_time(record):
+    try:
+        return datetime.fromisoformat(record.get("time", ""))
+    except ValueError:
+        return None
+
+
+def iter_records(log_file, since=None, until=None, levels=None, progress=None):
+    """Parcours en flux des entrées du journal, de la plus ancienne à la plus récente
+
+    since / until : bornes datetime (incluses), levels : ensemble de niveaux
+    logging (« WARNING », ...). progress(fraction) reçoit l'avancement en
+    octets lus sur l'ensemble des fichiers.
+    """
+    paths = [path for path in reversed(journal_files(log_file)) if os.path.exists(path)]
+    total = sum(os.path.getsize(path) for path in paths) or 1
+    done = 0
+    reported = 0.0
+
+    for path in paths:
+        with open(path, "rb") as raw:
+            f = gzip.GzipFile(fileobj=raw) if path.endswith(".gz") else raw
+            for line in f:
+                record = parse_record(line.decode("utf-8", errors="replace").rstrip("\n"))
+                if record is None:
+                    continue
+                if levels is not None and record.get("level") not in levels:
+                    continue
+                if since is not None or until is not None:
+                    moment = _record_time(record)
+                    if moment is None:
+                        continue
+                    if since is not None and moment < since:
+                        continue
+                    if until is not None and moment > until:
+                        continue
+                yield record
+
+                if progress is not None:
+                    fraction = (done + raw.tell()) / total
+                    if fraction - reported >= 0.01:
+                        reported = fraction
+                        progress(min(fraction, 1.0))
+        done += os.path.getsize(path)
+
+    if progress is not None:
+        progress(1.0)
+
+
+def export_journal(log_file, dest, fmt="txt", since=None, until=None, levels=None,
+                   progress=None):
+    """Export filtré du journal vers `dest` (txt, jsonl ou csv), à mémoire constante
+
+    Renvoie le nombre d'entrées exportées.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Format d'export inconnu : {fmt}")
+
+    records = iter_records(log_file, since, until, levels, progress)
+    count = 0
+    with open(dest, "w", encoding="utf-8", newline="") as out:
+        if fmt == "csv":
+            writer = csv.DictWriter(out, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+        for record in records:
+            if fmt == "jsonl":
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            elif fmt == "csv":
+                writer.writerow(record)
+            else:
+                moment = record.get("time", "").replace("T", " ")[:19]
+                out.write(f"[{moment}] {record.get('level', '')} {record.get('message', '')}\n")
+            count += 1
+    return count
@@ -0,0 +1,235 @@
+"""Échantillonnage adaptatif et historique des métriques système"""
+import math
+import time
+from array import array
+from bisect import bisect_left
+
+from power import PowerState, read_power_state
+
+FIELDS = ("timestamp", "cpu", "memory", "battery", "temperature")
+
+# Échantillonnage adaptatif : bornes de l'intervalle et variation jugée significative
+SAMPLE_MIN_INTERVAL = 1.0
+SAMPLE_MAX_INTERVAL = 60.0
+SAMPLE_CHANGE_THRESHOLD = 2.0
+
+
+class MetricsHistory:
+    """Tampon circulaire de capacité fixe (horodatage, CPU, mémoire, batterie, température)
+
+    Chaque colonne est un array('d') préalloué : l'ajout est en O(1), sans
+    allocation, et les valeurs absentes (pas de batterie) valent NaN.
+    """
+
+    def __init__(self, hours=6, interval=1.0, capacity=None):
+        self.capacity = capacity or max(1, int(hours * 3600 / interval))
+        self.columns = {field: array("d", bytes(8 * self.capacity)) for field in FIELDS}
+        self.head = 0  # prochain emplacement à écrire
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def append(self, cpu, memory, battery=None, timestamp=None, temperature=None):
+        """Ajout d'un échantillon, en écrasant le plus ancien si plein"""
+        i = self.head
+        columns = self.columns
+        columns["timestamp"][i] = time.time() if timestamp is None else timestamp
+        columns["cpu"][i] = cpu
+        columns["memory"][i] = memory
+        columns["battery"][i] = math.nan if battery is None else battery
+        columns["temperature"][i] = math.nan if temperature is None else temperature
+
+        self.head = (i + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+
+    def values(self, field, count=None):
+        """Les `count` dernières valeurs d'une colonne, de la plus ancienne à la plus récente"""
+        count = self.size if count is None else min(count, self.size)
+        if count <= 0:
+            return array("d")
+        column = self.columns[field]
+        start = self.head - count
+        if start >= 0:
+            return column[start:self.head]
+        # Fenêtre à cheval sur la fin du tampon : deux tranches contiguës
+        return column[start:] + column[:self.head]
+
+    def window_size(self, seconds, now=None):
+        """Nombre d'échantillons couvrant les `seconds` dernières secondes"""
+        if not self.size:
+            return 0
+        cutoff = (time.time() if now is None else now) - seconds
+        timestamps = self.columns["timestamp"]
+
+        # Recherche dichotomique sur l'ordre logique (horodatages croissants)
+        lo, hi = 0, self.size
+        oldest = self.head - self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if timestamps[(oldest + mid) % self.capacity] < cutoff:
+                lo = mid + 1
+            else:
+                hi = mid
+        return self.size - lo
+
+    def window(self, field, seconds, now=None):
+        """Valeurs d'une colonne sur les `seconds` dernières secondes"""
+        return self.values(field, self.window_size(seconds, now))
+
+    def decimate(self, field, seconds, buckets, now=None):
+        """Min / max par colonne de pixels sur une fenêtre (None si colonne vide)
+
+        La colonne i couvre [now - seconds + i * pas, now - seconds + (i + 1) * pas[ :
+        une fenêtre de 24 h se dessine avec `buckets` segments au lieu d'un
+        point par échantillon, sans perdre les pics. Les bornes des colonnes
+        sont trouvées par dichotomie sur les horodatages ; chaque colonne est
+        ensuite réduite d'un bloc (min et max en C sur une tranche d'array).
+        """
+        now = time.time() if now is None else now
+        count = self.window_size(seconds, now)
+        timestamps = self.values("timestamp", count)
+        values = self.values(field, count)
+        start = now - seconds
+        step = seconds / buckets
+        lows = [None] * buckets
+        highs = [None] * buckets
+        low = 0
+        for i in range(buckets):
+            high = count if i == buckets - 1 else bisect_left(timestamps, start + (i + 1) * step, low)
+            if high > low:
+                present = _present(values[low:high])
+                if present:
+                    lows[i], highs[i] = min(present), max(present)
+            low = high
+        return lows, highs
+
+    def latest(self, field):
+        """Dernière valeur d'une colonne (None si vide ou absente)"""
+        if not self.size:
+            return None
+        value = self.columns[field][self.head - 1]
+        return None if value != value else value
+
+    def stats(self, field, seconds, now=None):
+        """Min / max / moyenne d'une colonne sur les `seconds` dernières secondes (NaN ignorés)
+
+        None si la fenêtre ne contient aucune valeur.
+        """
+        values = _present(self.window(field, seconds, now))
+        if not values:
+            return None
+        return {"min": min(values), "max": max(values), "mean": math.fsum(values) / len(values)}
+
+
+def _present(values):
+    """Valeurs non absentes d'une tranche d'array('d') (la tranche elle-même si elle n'a pas de NaN)
+
+    sum() en C propage NaN : la passe en Python qui retire les valeurs absentes
+    (qui fausseraient min et max) n'a lieu que si la tranche en contient.
+    """
+    total = sum(values)
+    if total == total:
+        return values
+    return array("d", (value for value in values if value == value))
+
+
+class CpuMeter:
+    """Utilisation CPU depuis le relevé précédent de ce compteur
+
+    psutil.cpu_percent() mesure depuis son dernier appel, quel que soit
+    l'appelant : deux lecteurs à des cadences différentes (interface,
+    export OpenMetrics) se voleraient mutuellement leur référence. Chaque
+    CpuMeter garde la sienne.
+    """
+
+    def __init__(self):
+        import psutil
+
+        self._cpu_times = psutil.cpu_times
+        self._last = self._read()
+
+    def _read(self):
+        times = self._cpu_times()
+        idle = times.idle + getattr(times, "iowait", 0.0)
+        return sum(times) - getattr(times, "guest", 0.0) - getattr(times, "guest_nice", 0.0), idle
+
+    def percent(self):
+        total, idle = self._read()
+        last_total, last_idle = self._last
+        self._last = total, idle
+        elapsed = total - last_total
+        if elapsed <= 0:
+            return 0.0
+        return round(min(100.0, max(0.0, 100.0 * (1 - (idle - last_idle) / elapsed))), 1)
+
+
+def collect_sample(cpu=None):
+    """Relevé groupé des métriques système
+
+    Un seul passage par tick pour CPU, mémoire, batterie et température. La
+    batterie vient de l'instantané sysfs partagé avec la détection
+    (power.read_power_state), psutil ne servant que de repli. `cpu` (un
+    CpuMeter) mesure l'utilisation CPU avec sa propre référence plutôt
+    qu'avec celle, globale, de psutil.cpu_percent().
+    """
+    import psutil
+
+    battery = read_power_state()
+    if battery is None or (battery.plugged, battery.percent) == (None, None):
+        battery = psutil.sensors_battery()
+        battery = PowerState(battery.power_plugged, battery.percent) if battery else None
+    temperatures = [
+        entry.current
+        for entries in (psutil.sensors_temperatures() if hasattr(psutil, "sensors_temperatures") else {}).values()
+        for entry in entries
+    ]
+    sample = {
+        "cpu": psutil.cpu_percent() if cpu is None else cpu.percent(),
+        "memory": psutil.virtual_memory().percent,
+        "battery": battery.percent if battery else None,
+        "plugged": battery.plugged if battery else None,
+        "temperature": max(temperatures) if temperatures else None
+    }
+    return sample
+
+
+class AdaptiveSampler:
+    """Cadence d'échantillonnage : rapide si actif, recul exponentiel si stable"""
+
+    KEYS = ("cpu", "memory", "battery", "plugged", "temperature")
+
+    def __init__(self, min_interval=SAMPLE_MIN_INTERVAL, max_interval=SAMPLE_MAX_INTERVAL,
+                 threshold=SAMPLE_CHANGE_THRESHOLD):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.threshold = threshold
+        self.interval = min_interval
+        self.last = None
+
+    def changed(self, sample):
+        if self.last is None:
+            return True
+        for key in self.KEYS:
+            old, new = self.last.get(key), sample.get(key)
+            if old is None or new is None or isinstance(new, bool):
+                if old != new:
+                    return True
+            elif abs(new - old) >= self.threshold:
+                return True
+        return False
+
+    def next_interval(self, sample, active):
+        """Délai avant le prochain relevé, d'après le relevé qui vient d'être fait"""
+        if active or self.changed(sample):
+            self.interval = self.min_interval
+            self.last = sample
+        else:
+            # La référence n'est pas mise à jour : une dérive lente finit par compter
+            self.interval = min(self.interval * 2, self.max_interval)
+        return self.interval
+
+    def reset(self):
+        """Retour immédiat à la cadence rapide (événement extérieur)"""
+        self.interval = self.min_interval
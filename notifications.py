@@ -0,0 +1,144 @@
+"""Notifications regroupées et limitées en débit
+
+Les notifications ordinaires arrivant en rafale sont regroupées pendant
+AGGREGATE_WINDOW secondes puis affichées en une seule, dans la limite
+d'un seau de jetons (RATE_BURST affichages, un jeton de plus toutes les
+RATE_PERIOD secondes). Les alertes sont affichées immédiatement.
+
+L'affichage est délégué à un backend : ToastPool (gui.py) pour
+l'interface Tk, DesktopBackend (notify-send) en mode headless.
+"""
+import shutil
+import subprocess
+
+AGGREGATE_WINDOW = 0.25
+RATE_BURST = 3
+RATE_PERIOD = 2.0
+
+# Fenêtres de notification affichables simultanément (pool de ToastPool)
+TOAST_POOL_SIZE = 3
+
+# Lignes reprises dans une notification regroupée
+AGGREGATE_LINES = 4
+
+# Notifications associées aux événements du moteur : titre, message, durée (ms), alerte
+NOTIFICATIONS = {
+    "ready": ("Système Prêt", "Security Monitor Pro est prêt à l'emploi", 3000, False),
+    "started": ("Surveillance active", "Le système commence la surveillance", 3000, False),
+    "stopped": ("Surveillance arrêtée", "Le système est maintenant inactif", 3000, False),
+    "alert": ("Alerte de Sécurité", None, 5000, True),
+    "alert_stopped": ("Alerte désactivée", "Le système est revenu à la normale", 3000, False)
+}
+
+
+class NotificationBackend:
+    """Affichage effectif d'une notification"""
+
+    def show(self, title, message, duration, alert=False):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class NullBackend(NotificationBackend):
+    """Aucun affichage : compte les notifications (mesures, mode headless sans bureau)"""
+
+    def __init__(self):
+        self.shown = []
+
+    def show(self, title, message, duration, alert=False):
+        self.shown.append((title, message, alert))
+
+
+class DesktopBackend(NotificationBackend):
+    """Notifications du bureau via notify-send (D-Bus), sans attendre le processus"""
+
+    def __init__(self, command="notify-send", app_name="Computer-Alarm"):
+        self.command = shutil.which(command)
+        self.app_name = app_name
+
+    def show(self, title, message, duration, alert=False):
+        if self.command is None:
+            return
+        args = [self.command, "-a", self.app_name, "-t", str(duration)]
+        if alert:
+            args += ["-u", "critical"]
+        try:
+            subprocess.Popen(args + [title, message], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except OSError:
+            self.command = None
+
+
+class NotificationManager:
+    """Regroupement des rafales et limitation du débit, piloté par un Scheduler
+
+    Doit être appelé depuis le thread propriétaire de l'ordonnanceur
+    (thread Tk pour la GUI, thread principal en mode headless).
+    """
+
+    def __init__(self, backend, scheduler, window=AGGREGATE_WINDOW, burst=RATE_BURST, period=RATE_PERIOD):
+        self.backend = backend
+        self.scheduler = scheduler
+        self.window = window
+        self.burst = burst
+        self.period = period
+        self.tokens = float(burst)
+        self.refilled = scheduler.clock()
+        self.pending = []
+        self.received = 0
+        self.shown = 0
+
+    def notify(self, title, message, duration=3000, alert=False):
+        self.received += 1
+        if alert:
+            # Une alerte n'est jamais retardée ni fusionnée
+            self.shown += 1
+            self.backend.show(title, message, duration, alert=True)
+            return
+        self.pending.append((title, message, duration))
+        if "notifications" not in self.scheduler.tasks:
+            self.scheduler.add("notifications", self.window, self.flush, delay=self.window)
+
+    def notify_event(self, event, message=None):
+        """Notification prédéfinie pour un événement du moteur (NOTIFICATIONS)"""
+        title, default_message, duration, alert = NOTIFICATIONS[event]
+        self.notify(title, message or default_message, duration, alert)
+
+    def _refill(self):
+        now = self.scheduler.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.refilled) / self.period)
+        self.refilled = now
+
+    def flush(self):
+        """Affichage des notifications en attente, regroupées si plusieurs"""
+        self._refill()
+        if not self.pending:
+            self.scheduler.cancel("notifications")
+            return None
+        if self.tokens < 1:
+            # Nouvel essai quand un jeton sera disponible ; la rafale continue de s'accumuler
+            return (1 - self.tokens) * self.period
+
+        self.tokens -= 1
+        pending, self.pending = self.pending, []
+        self.scheduler.cancel("notifications")
+        self.shown += 1
+        if len(pending) == 1:
+            self.backend.show(*pending[0])
+            return None
+
+        # Derniers titres en tête, les plus anciens résumés par un compteur
+        lines = [title for title, _, _ in pending[-AGGREGATE_LINES:]]
+        if len(pending) > AGGREGATE_LINES:
+            lines.append(f"… et {len(pending) - AGGREGATE_LINES} autre(s)")
+        self.backend.show(
+            f"{len(pending)} notifications",
+            "\n".join(lines),
+            max(duration for _, _, duration in pending)
+        )
+        return None
+
+    def close(self):
+        self.scheduler.cancel("notifications")
+        self.backend.close()
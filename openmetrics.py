@@ -0,0 +1,227 @@
+"""Export des métriques au format OpenMetrics (Prometheus)
+
+Deux sorties, au choix : un point d'accès HTTP local (/metrics, sur
+127.0.0.1) ou un fichier pour le « textfile collector » de node_exporter.
+
+Le texte est rendu au plus une fois par SCRAPE_INTERVAL et gardé en
+cache : des collectes fréquentes ne font que renvoyer les mêmes octets,
+sans toucher au moteur ni relever les métriques système à chaque fois.
+"""
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from instrumentation import LatencyHistogram, instruments
+from states import ALARMING, ARMED, DISARMED, RECOVERING, SUSPECT
+
+# Durée de validité du rendu en cache (et période d'écriture du fichier)
+SCRAPE_INTERVAL = 5.0
+
+# Bornes des histogrammes exportés (secondes)
+DETECTION_BUCKETS = (0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SPAN_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+
+OPENMETRICS_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PROMETHEUS_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+PREFIX = "computer_alarm_"
+STATES = (DISARMED, ARMED, SUSPECT, ALARMING, RECOVERING)
+
+
+def _number(value):
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, float):
+        return repr(value) if value == value else "NaN"
+    return str(value)
+
+
+class MetricsExporter:
+    """Collecte de l'état du moteur et rendu OpenMetrics mis en cache
+
+    S'abonne aux événements du moteur pour mesurer la latence de détection
+    (première lecture compromise -> alarme déclenchée). La durée des
+    sections critiques (itérations de la boucle de surveillance,
+    journalisation, alerte) n'est exportée que si l'instrumentation est
+    active (--profile, panneau Diagnostics) : l'exporteur ne l'active pas.
+    """
+
+    def __init__(self, engine, interval=SCRAPE_INTERVAL, clock=time.monotonic):
+        self.engine = engine
+        self.interval = interval
+        self.clock = clock
+        self.detection_latency = LatencyHistogram()
+        self.renders = 0
+        self._suspect_since = None
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._threads = []
+        self._stop = threading.Event()
+        try:
+            # Référence CPU propre à l'exporteur, amorcée dès maintenant (voir metrics.CpuMeter)
+            from metrics import CpuMeter
+            self._cpu = CpuMeter()
+        except Exception:
+            self._cpu = None
+
+        engine.subscribe(self.on_engine_event)
+
+    def on_engine_event(self, event, data):
+        """Appelé dans le thread de surveillance : deux lectures d'horloge au plus par incident"""
+        if event == "state" and data["state"] == SUSPECT:
+            self._suspect_since = self.clock()
+        elif event == "alert" and self._suspect_since is not None:
+            self.detection_latency.observe(self.clock() - self._suspect_since)
+            self._suspect_since = None
+
+    def render(self, openmetrics=True):
+        """Texte complet de l'exposition (sans cache)"""
+        engine = self.engine
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            name = PREFIX + name
+            # Prometheus 0.0.4 nomme la famille d'un compteur avec son suffixe _total
+            family = name if openmetrics or kind != "counter" else name + "_total"
+            lines.append(f"# HELP {family} {help_text}")
+            lines.append(f"# TYPE {family} {kind}")
+            for suffix, labels, value in samples:
+                label_text = ",".join(f'{key}="{val}"' for key, val in labels.items())
+                lines.append(f"{name}{suffix}{{{label_text}}} {_number(value)}" if label_text
+                             else f"{name}{suffix} {_number(value)}")
+
+        def histogram_samples(source, buckets, labels=None):
+            labels = labels or {}
+            cumulative, count, total = source.cumulative(buckets)
+            samples = [("_bucket", {**labels, "le": _number(float(bound))}, below)
+                       for bound, below in zip(buckets, cumulative)]
+            samples.append(("_bucket", {**labels, "le": "+Inf"}, count))
+            samples.append(("_count", labels, count))
+            samples.append(("_sum", labels, total))
+            return samples
+
+        state = engine.state_machine.state
+        metric("monitoring_active", "gauge", "Surveillance armée (1) ou non (0).",
+               [("", {}, engine.monitoring_active)])
+        metric("alert_active", "gauge", "Alarme en cours.", [("", {}, engine.alert_active)])
+        metric("state", "gauge", "État de la machine à états d'alarme.",
+               [("", {"state": name}, name == state) for name in STATES])
+        metric("incidents", "counter", "Incidents depuis le lancement.",
+               [("_total", {}, engine.incident_count)])
+        try:
+            metric("incidents_24h", "gauge", "Incidents enregistrés sur les dernières 24 heures.",
+                   [("", {}, engine.incidents.count(days=1))])
+        except Exception:
+            pass
+
+        scheduler = engine.scheduler
+        if scheduler is not None:
+            metric("scheduler_wakeups", "counter", "Réveils de la boucle de surveillance.",
+                   [("_total", {}, scheduler.wakeups)])
+            metric("scheduler_runs", "counter", "Exécutions de tâches de surveillance.",
+                   [("_total", {}, scheduler.runs)])
+        metric("detection_latency_seconds", "histogram",
+               "Délai entre la première lecture compromise et le déclenchement de l'alarme.",
+               histogram_samples(self.detection_latency, DETECTION_BUCKETS))
+        metric("instrumentation_enabled", "gauge", "Mesure des sections critiques active.",
+               [("", {}, instruments.enabled)])
+        if instruments.enabled:
+            metric("span_seconds", "histogram",
+                   "Durée des sections critiques (check_security : une itération de la boucle).",
+                   [sample for name, source in sorted(instruments.histograms.items())
+                    for sample in histogram_samples(source, SPAN_BUCKETS, {"span": name})])
+
+        try:
+            from metrics import collect_sample
+            sample = collect_sample(cpu=self._cpu)
+        except Exception:
+            sample = None
+        if sample is not None:
+            metric("cpu_percent", "gauge", "Utilisation CPU (%).", [("", {}, float(sample["cpu"]))])
+            metric("memory_percent", "gauge", "Utilisation mémoire (%).", [("", {}, float(sample["memory"]))])
+            if sample["battery"] is not None:
+                metric("battery_percent", "gauge", "Charge de la batterie (%).",
+                       [("", {}, float(sample["battery"]))])
+                metric("power_plugged", "gauge", "Secteur branché.", [("", {}, bool(sample["plugged"]))])
+            if sample.get("temperature") is not None:
+                metric("temperature_celsius", "gauge", "Température la plus élevée des capteurs.",
+                       [("", {}, float(sample["temperature"]))])
+
+        power = engine.readings.get("power")
+        if power is not None and power.supplies:
+            metric("supply_online", "gauge", "Alimentation en ligne (secteur, USB-C, dock, onduleur).",
+                   [("", {"supply": supply.name}, supply.online)
+                    for supply in power.supplies if supply.online is not None])
+            metric("supply_capacity_percent", "gauge", "Charge de chaque batterie (%).",
+                   [("", {"supply": supply.name}, supply.capacity)
+                    for supply in power.supplies if supply.capacity is not None])
+
+        if openmetrics:
+            lines.append("# EOF")
+        self.renders += 1
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+    def exposition(self, openmetrics=True):
+        """Rendu en cache, renouvelé au plus une fois par intervalle"""
+        now = self.clock()
+        with self._lock:
+            cached = self._cache.get(openmetrics)
+            if cached is None or now - cached[0] >= self.interval:
+                cached = self._cache[openmetrics] = (now, self.render(openmetrics))
+            return cached[1]
+
+    def serve(self, port, host="127.0.0.1"):
+        """Point d'accès HTTP /metrics dans un thread dédié"""
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+                body = exporter.exposition(openmetrics)
+                self.send_response(200)
+                self.send_header("Content-Type", OPENMETRICS_TYPE if openmetrics else PROMETHEUS_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._start_thread(self._server.serve_forever, "metrics-http")
+        return self._server.server_address[1]
+
+    def write_textfile(self, path):
+        """Écriture périodique pour node_exporter (remplacement atomique du fichier)"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        def run():
+            while True:
+                temporary = f"{path}.{os.getpid()}.tmp"
+                with open(temporary, "wb") as f:
+                    f.write(self.exposition(openmetrics=False))
+                os.replace(temporary, path)
+                if self._stop.wait(self.interval):
+                    return
+
+        self._start_thread(run, "metrics-textfile")
+
+    def _start_thread(self, target, name):
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        for thread in self._threads:
+            thread.join(timeout=2)
@@ -0,0 +1,304 @@
+"""Sources d'événements d'alimentation (secteur branché / débranché)
+
+Sous Linux, toutes les alimentations de /sys/class/power_supply
+(batteries, secteur, USB-C PD, station d'accueil, onduleur) sont
+découvertes une fois ; leurs attributs variables sont relus par pread()
+sur des descripteurs gardés ouverts, et l'instantané obtenu est partagé
+entre la détection et les métriques pendant SNAPSHOT_MAX_AGE secondes.
+"""
+import os
+import select
+import socket
+import sys
+import threading
+import time
+from collections import namedtuple
+
+POWER_SUPPLY_DIR = "/sys/class/power_supply"
+NETLINK_KOBJECT_UEVENT = 15
+
+# Attributs relus à chaque instantané ; les autres (type, scope, capacité nominale) le sont à la découverte
+VOLATILE_ATTRIBUTES = ("online", "capacity", "status")
+
+# Durée de validité d'un instantané partagé (un uevent l'invalide aussitôt)
+SNAPSHOT_MAX_AGE = 0.5
+
+# État d'une alimentation : online / capacity / status valent None si l'attribut est absent
+SupplyState = namedtuple("SupplyState", ["name", "type", "online", "capacity", "status"])
+
+# État de l'alimentation : plugged / percent valent None si inconnus,
+# supplies détaille chaque alimentation (vide hors sysfs)
+PowerState = namedtuple("PowerState", ["plugged", "percent", "supplies"], defaults=((),))
+
+
+class PowerSupply:
+    """Alimentation découverte : attributs fixes lus une fois, descripteurs ouverts pour les autres"""
+
+    def __init__(self, path):
+        self.name = os.path.basename(path)
+        self.type = _read_attr(path, "type")
+        # Batteries de périphériques (souris, clavier...) : hors agrégat du poste
+        self.device = _read_attr(path, "scope") == "Device"
+        full = float(_read_attr(path, "energy_full") or _read_attr(path, "charge_full") or 0)
+        self.weight = full if full > 0 else 1.0
+        self.fds = {}
+        for attr in VOLATILE_ATTRIBUTES:
+            try:
+                self.fds[attr] = os.open(os.path.join(path, attr), os.O_RDONLY | os.O_CLOEXEC)
+            except OSError:
+                pass
+
+    def read(self):
+        """Relecture des attributs variables ; None si l'alimentation a disparu"""
+        values = {}
+        try:
+            for attr, fd in self.fds.items():
+                values[attr] = os.pread(fd, 64, 0).decode().strip()
+        except OSError:
+            return None
+        online = values.get("online")
+        capacity = values.get("capacity")
+        return SupplyState(
+            self.name,
+            self.type,
+            None if online is None else online == "1",
+            None if capacity is None else float(capacity),
+            values.get("status")
+        )
+
+    def close(self):
+        for fd in self.fds.values():
+            os.close(fd)
+        self.fds = {}
+
+
+class PowerSupplies:
+    """Modèle de toutes les alimentations du poste, avec instantané partagé
+
+    snapshot() ne relit sysfs que si le dernier instantané a plus de
+    max_age secondes ou a été invalidé (uevent) ; la découverte n'est
+    refaite que si une alimentation apparaît ou disparaît.
+    """
+
+    def __init__(self, supply_dir=POWER_SUPPLY_DIR, max_age=SNAPSHOT_MAX_AGE, clock=time.monotonic):
+        self.supply_dir = supply_dir
+        self.max_age = max_age
+        self.clock = clock
+        self.supplies = []
+        self.reads = 0  # instantanés réellement relus, pour les mesures
+        self._snapshot = None
+        self._taken = 0.0
+        self._rediscover = True
+        self._lock = threading.Lock()
+
+    def discover(self):
+        for supply in self.supplies:
+            supply.close()
+        self.supplies = [
+            PowerSupply(os.path.join(self.supply_dir, name))
+            for name in sorted(os.listdir(self.supply_dir))
+        ]
+        self._rediscover = False
+
+    def invalidate(self, rediscover=False):
+        """Instantané périmé (uevent) ; rediscover si une alimentation a été ajoutée ou retirée"""
+        with self._lock:
+            self._snapshot = None
+            self._rediscover = self._rediscover or rediscover
+
+    def snapshot(self):
+        with self._lock:
+            now = self.clock()
+            if self._snapshot is not None and now - self._taken < self.max_age:
+                return self._snapshot
+            if self._rediscover:
+                self.discover()
+            states = []
+            for supply in self.supplies:
+                state = supply.read()
+                if state is None:
+                    self._rediscover = True
+                    continue
+                states.append(state)
+            self._snapshot = self.aggregate(states)
+            self._taken = now
+            self.reads += 1
+            return self._snapshot
+
+    def aggregate(self, states):
+        """Secteur : une alimentation non batterie en ligne ; charge : moyenne pondérée par capacité nominale"""
+        weights = {supply.name: supply.weight for supply in self.supplies if not supply.device}
+        plugged = None
+        energy = total = 0.0
+        for state in states:
+            if state.name not in weights:
+                continue
+            if state.type == "Battery":
+                if state.capacity is not None:
+                    energy += state.capacity * weights[state.name]
+                    total += weights[state.name]
+            elif state.online is not None:
+                plugged = bool(plugged) or state.online
+        return PowerState(plugged, energy / total if total else None, tuple(states))
+
+    def close(self):
+        with self._lock:
+            for supply in self.supplies:
+                supply.close()
+            self.supplies = []
+            self._snapshot = None
+            self._rediscover = True
+
+
+_shared_supplies = None
+_shared_lock = threading.Lock()
+
+
+def shared_supplies():
+    """Modèle commun au processus (détection et métriques) ; None hors Linux / sans sysfs"""
+    global _shared_supplies
+    with _shared_lock:
+        if _shared_supplies is None and sys.platform.startswith("linux") and os.path.isdir(POWER_SUPPLY_DIR):
+            _shared_supplies = PowerSupplies()
+        return _shared_supplies
+
+
+def read_power_state():
+    """Instantané partagé de l'alimentation (None si sysfs est indisponible)"""
+    supplies = shared_supplies()
+    if supplies is None:
+        return None
+    try:
+        return supplies.snapshot()
+    except OSError:
+        return None
+
+
+class PowerEventSource:
+    """Source d'état d'alimentation avec attente d'événement"""
+
+    name = "base"
+
+    def __init__(self):
+        self._wakeup = threading.Event()
+
+    def read(self):
+        """Lecture de l'état courant de l'alimentation"""
+        raise NotImplementedError
+
+    def refresh(self):
+        """Lecture de l'état réel, sans instantané en cache"""
+        return self.read()
+
+    def wait(self, timeout):
+        """Attente d'un changement d'alimentation (True) ou du délai (False)"""
+        woken = self._wakeup.wait(timeout)
+        self._wakeup.clear()
+        return woken
+
+    def interrupt(self):
+        """Réveil immédiat d'un thread bloqué dans wait()"""
+        self._wakeup.set()
+
+    def close(self):
+        """Libération des ressources"""
+        self.interrupt()
+
+
+class PollingPowerSource(PowerEventSource):
+    """Repli : interrogation périodique de psutil.sensors_battery()"""
+
+    name = "polling"
+
+    def read(self):
+        import psutil
+
+        battery = psutil.sensors_battery()
+        if battery is None:
+            return PowerState(None, None)
+        return PowerState(battery.power_plugged, battery.percent)
+
+
+class UeventPowerSource(PowerEventSource):
+    """Linux : réveil sur les uevents noyau du sous-système power_supply"""
+
+    name = "uevent"
+
+    def __init__(self, supplies=None):
+        super().__init__()
+        self.supplies = supplies or shared_supplies() or PowerSupplies()
+        self._sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+        try:
+            self._sock.bind((0, 1))
+            self._sock.setblocking(False)
+            self._pipe_r, self._pipe_w = os.pipe()
+        except OSError:
+            self._sock.close()
+            raise
+
+    def read(self):
+        return self.supplies.snapshot()
+
+    def refresh(self):
+        self.supplies.invalidate()
+        return self.supplies.snapshot()
+
+    def wait(self, timeout):
+        try:
+            ready, _, _ = select.select([self._sock, self._pipe_r], [], [], timeout)
+        except (OSError, ValueError):
+            # Source fermée pendant l'attente
+            return False
+
+        if self._pipe_r in ready:
+            os.read(self._pipe_r, 64)
+            return True
+
+        changed = False
+        while True:
+            try:
+                message = self._sock.recv(8192)
+            except BlockingIOError:
+                break
+            if b"SUBSYSTEM=power_supply" in message:
+                changed = True
+                # Dock, onduleur USB... branché ou retiré : nouvelle découverte
+                self.supplies.invalidate(rediscover=message.startswith((b"add@", b"remove@")))
+        return changed
+
+    def interrupt(self):
+        try:
+            os.write(self._pipe_w, b"\0")
+        except OSError:
+            pass
+
+    def close(self):
+        self.interrupt()
+        self._sock.close()
+        for fd in (self._pipe_r, self._pipe_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+def _read_attr(path, attr):
+    """Lecture d'un attribut sysfs (None s'il est absent)"""
+    try:
+        with open(os.path.join(path, attr)) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def create_power_source():
+    """Sélection de la meilleure source disponible, avec repli sur le polling"""
+    if sys.platform.startswith("linux") and os.path.isdir(POWER_SUPPLY_DIR):
+        try:
+            source = UeventPowerSource()
+            if source.read().plugged is not None:
+                return source
+            source.close()
+        except OSError:
+            pass
+    return PollingPowerSource()
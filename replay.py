@@ -0,0 +1,215 @@
+"""Enregistrement et rejeu de traces d'alimentation, sans matériel ni écran
+
+Une trace est un fichier JSON lines de changements d'état :
+{"t": secondes depuis le début, "plugged": bool|null, "percent": float|null}
+
+Usage :
+  python replay.py record trace.jsonl [--seconds 600]
+  python replay.py play trace.jsonl
+"""
+import argparse
+import bisect
+import json
+import random
+import sys
+import tempfile
+import time
+
+from power import PowerEventSource, PowerState, create_power_source
+
+
+class VirtualClock:
+    """Horloge simulée pour rejouer des heures d'ordonnancement en quelques millisecondes"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TracePowerSource(PowerEventSource):
+    """Source d'alimentation rejouant une trace sur une horloge (virtuelle ou non)"""
+
+    name = "trace"
+
+    def __init__(self, trace, clock=time.monotonic):
+        super().__init__()
+        self.clock = clock
+        self.start = clock()
+        self.times = [self.start + t for t, _ in trace]
+        self.states = [state for _, state in trace]
+
+    def read(self):
+        index = bisect.bisect_right(self.times, self.clock())
+        if not index:
+            return PowerState(None, None)
+        return self.states[index - 1]
+
+    def next_event(self, now):
+        """Instant du prochain changement d'état après `now` (None si la trace est finie)"""
+        index = bisect.bisect_right(self.times, now)
+        return self.times[index] if index < len(self.times) else None
+
+
+class NullAlarmPlayer:
+    """Remplaçant silencieux d'AlarmPlayer : compte et date les déclenchements"""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.plays = []
+        self.stops = 0
+
+    def load(self):
+        pass
+
+    def play(self):
+        self.plays.append(self.clock())
+
+    def stop(self):
+        self.stops += 1
+
+    def quit(self):
+        pass
+
+
+class EventRecorder:
+    """Client du moteur tenant lieu de notifications : compte (et garde) les événements"""
+
+    def __init__(self, clock=time.monotonic, keep=True):
+        self.clock = clock
+        self.keep = keep
+        self.events = []
+        self.counts = {}
+
+    def __call__(self, event, data):
+        self.counts[event] = self.counts.get(event, 0) + 1
+        if self.keep:
+            self.events.append((self.clock(), event, data))
+
+    def times(self, event):
+        return [at for at, name, _ in self.events if name == event]
+
+
+# Traces synthétiques
+
+def unplug_trace(at=10.0, duration=30.0, percent=80.0):
+    """Secteur débranché à `at` secondes pendant `duration` secondes"""
+    return [
+        (0.0, PowerState(True, percent)),
+        (at, PowerState(False, percent)),
+        (at + duration, PowerState(True, percent))
+    ]
+
+
+def flaky_trace(seconds=3600.0, period=2.0, glitch=(0.005, 0.04), percent=80.0, seed=0):
+    """Contact de chargeur instable : micro-coupures plus courtes que l'anti-rebond"""
+    rng = random.Random(seed)
+    trace = [(0.0, PowerState(True, percent))]
+    t = 0.0
+    while True:
+        t += rng.expovariate(1.0 / period)
+        end = t + rng.uniform(*glitch)
+        if end >= seconds:
+            return trace
+        trace.append((t, PowerState(False, percent)))
+        trace.append((end, PowerState(True, percent)))
+        t = end
+
+
+def load_trace(path):
+    with open(path, encoding="utf-8") as f:
+        return [
+            (entry["t"], PowerState(entry["plugged"], entry["percent"]))
+            for entry in map(json.loads, f)
+        ]
+
+
+def save_trace(trace, path):
+    with open(path, "w", encoding="utf-8") as f:
+        for t, state in trace:
+            f.write(json.dumps({"t": round(t, 6), "plugged": state.plugged, "percent": state.percent}) + "\n")
+
+
+def record_trace(path, seconds=600.0, source=None):
+    """Enregistrement des changements d'alimentation réels pendant `seconds` secondes"""
+    source = source or create_power_source()
+    start = time.monotonic()
+    trace = []
+    try:
+        while True:
+            now = time.monotonic() - start
+            state = source.read()
+            if not trace or trace[-1][1] != state:
+                trace.append((now, state))
+            if now >= seconds:
+                break
+            source.wait(min(1.0, seconds - now))
+    finally:
+        source.close()
+    save_trace(trace, path)
+    return trace
+
+
+def replay(engine, source, clock, seconds, wake_on_event=True, prepare=None):
+    """Rejeu accéléré : l'horloge virtuelle saute d'échéance en échéance
+
+    Le moteur doit avoir été créé avec `clock` et une fabrique renvoyant
+    `source`. wake_on_event reproduit le réveil par uevent ; sans lui, le
+    capteur n'est lu qu'à sa cadence (comme PollingPowerSource).
+    prepare(engine) est appelé une fois armé, pour ajouter des tâches.
+    """
+    engine.start(threaded=False)
+    scheduler = engine.scheduler
+    if prepare is not None:
+        prepare(engine)
+    end = clock.now + seconds
+    while clock.now < end:
+        scheduler.run_pending()
+        deadline = scheduler.next_deadline()
+        target = end if deadline is None else min(deadline, end)
+        event_at = source.next_event(clock.now) if wake_on_event else None
+        if event_at is not None and event_at <= target:
+            clock.now = event_at
+            scheduler.reschedule("power")
+        else:
+            clock.now = target
+    engine.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Traces d'alimentation pour Computer-Alarm")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="enregistrer l'alimentation réelle")
+    record.add_argument("path")
+    record.add_argument("--seconds", type=float, default=600.0)
+    play = commands.add_parser("play", help="rejouer une trace en accéléré")
+    play.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        trace = record_trace(args.path, args.seconds)
+        print(f"{len(trace)} changements enregistrés dans {args.path}")
+        return 0
+
+    from config import Config
+    from engine import MonitorEngine
+
+    trace = load_trace(args.path)
+    clock = VirtualClock()
+    source = TracePowerSource(trace, clock)
+    player = NullAlarmPlayer(clock)
+    with tempfile.TemporaryDirectory() as log_dir:
+        engine = MonitorEngine(Config(log_dir=log_dir), clock=clock, player=player,
+                               power_source_factory=lambda: source)
+        recorder = EventRecorder(clock)
+        engine.subscribe(recorder)
+        replay(engine, source, clock, trace[-1][0] + 5.0 if trace else 5.0)
+        engine.shutdown()
+    print(f"{len(trace)} changements rejoués : {engine.incident_count} incidents, "
+          f"{engine.state_machine.glitches} micro-coupures filtrées, {len(player.plays)} alarmes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""Ordonnanceur de tâches périodiques partagé
+
+Toutes les tâches périodiques d'un thread (capteurs du moteur, ou
+métriques / animations / file UI côté Tk) passent par un seul
+ordonnanceur : les échéances sont alignées sur une grille commune et les
+tâches proches sont regroupées dans le même réveil.
+"""
+import heapq
+import itertools
+import math
+import random
+import time
+
+# Tâches échues à moins de SLACK secondes près exécutées dans le même réveil
+SLACK = 0.02
+
+
+class Task:
+    """Tâche périodique : callback() peut renvoyer un délai pour le prochain passage"""
+
+    def __init__(self, name, interval, callback, due, jitter=0.0, backoff=False, exact=False):
+        self.name = name
+        self.interval = interval
+        self.callback = callback
+        self.due = due
+        self.jitter = jitter
+        self.backoff = backoff
+        self.exact = exact
+        self.cancelled = False
+        self.runs = 0
+
+
+class Scheduler:
+    """Tas de tâches à échéance : un seul réveil pour toutes les tâches d'un thread
+
+    - les échéances sont alignées sur des multiples de l'intervalle, pour que
+      des tâches à 0,5 s et 1 s tombent sur le même réveil ;
+    - `jitter` décale une tâche d'une valeur aléatoire (désynchronisation
+      d'une flotte de machines) ;
+    - les tâches `backoff=True` voient leur intervalle multiplié par
+      backoff_factor() (par exemple sur batterie ou en veille) ;
+    - les tâches `exact=True` (échéances d'anti-rebond) ne sont jamais
+      exécutées en avance au titre du regroupement.
+
+    Le propriétaire appelle run_pending() puis attend le délai renvoyé
+    (par exemple via PowerEventSource.wait) ; TkScheduler le fait avec
+    root.after.
+    """
+
+    def __init__(self, clock=time.monotonic, slack=SLACK, backoff_factor=None):
+        self.clock = clock
+        self.slack = slack
+        self.backoff_factor = backoff_factor or (lambda: 1.0)
+        self.tasks = {}
+        self._heap = []
+        self._seq = itertools.count()
+        self.started = clock()
+        self.wakeups = 0
+        self.runs = 0
+
+    def add(self, name, interval, callback, delay=0.0, jitter=0.0, backoff=False, exact=False):
+        """Ajout (ou remplacement) d'une tâche exécutée toutes les `interval` secondes"""
+        self.cancel(name)
+        due = self.clock() + delay + (random.uniform(0, jitter) if jitter else 0.0)
+        task = Task(name, interval, callback, due, jitter, backoff, exact)
+        self.tasks[name] = task
+        self._push(task)
+        return task
+
+    def cancel(self, name):
+        task = self.tasks.pop(name, None)
+        if task is not None:
+            task.cancelled = True
+
+    def reschedule(self, name, delay=0.0):
+        """Avancement (ou report) du prochain passage d'une tâche"""
+        old = self.tasks.get(name)
+        if old is not None:
+            self.add(name, old.interval, old.callback, delay, old.jitter, old.backoff, old.exact)
+
+    def _push(self, task):
+        heapq.heappush(self._heap, (task.due, next(self._seq), task))
+
+    def next_due(self, task, now):
+        """Prochaine échéance alignée sur la grille de l'intervalle (hors jitter)"""
+        interval = task.interval
+        if task.backoff:
+            interval *= max(1.0, self.backoff_factor())
+        # Une tâche exécutée un peu en avance (slack) ne repasse pas sur la même échéance
+        due = (math.floor(max(now, task.due) / interval) + 1) * interval
+        if task.jitter:
+            due += random.uniform(0, task.jitter)
+        return due
+
+    def run_pending(self):
+        """Exécution des tâches échues ; renvoie le délai jusqu'à la prochaine"""
+        now = self.clock()
+        ran = False
+        early = []
+        while self._heap and self._heap[0][0] <= now + self.slack:
+            entry = heapq.heappop(self._heap)
+            task = entry[2]
+            if task.cancelled:
+                continue
+            if task.exact and task.due > now:
+                early.append(entry)
+                continue
+            ran = True
+            self.runs += 1
+            task.runs += 1
+            delay = task.callback()
+            if task.cancelled:
+                continue
+            now = self.clock()
+            task.due = self.next_due(task, now) if delay is None else now + delay
+            self._push(task)
+        for entry in early:
+            heapq.heappush(self._heap, entry)
+        if ran:
+            self.wakeups += 1
+        return self.next_timeout(now)
+
+    def next_deadline(self):
+        """Échéance de la prochaine tâche, sur l'horloge de l'ordonnanceur (None si aucune)"""
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def next_timeout(self, now=None):
+        deadline = self.next_deadline()
+        if deadline is None:
+            return None
+        now = self.clock() if now is None else now
+        return max(0.0, deadline - now)
+
+    def stats(self):
+        """Réveils et exécutions par seconde depuis la création"""
+        elapsed = max(self.clock() - self.started, 1e-9)
+        return {
+            "wakeups_per_second": self.wakeups / elapsed,
+            "runs_per_second": self.runs / elapsed,
+            "runs_per_wakeup": self.runs / self.wakeups if self.wakeups else 0.0,
+            "tasks": {name: task.runs for name, task in self.tasks.items()}
+        }
+
+
+class TkScheduler(Scheduler):
+    """Ordonnanceur piloté par une seule chaîne root.after dans le thread Tk"""
+
+    def __init__(self, root, **kwargs):
+        super().__init__(**kwargs)
+        self.root = root
+        self._after_id = None
+        self._armed_for = None
+
+    def add(self, *args, **kwargs):
+        task = super().add(*args, **kwargs)
+        self._arm()
+        return task
+
+    def _arm(self):
+        timeout = self.next_timeout()
+        if timeout is None:
+            return
+        due = self.clock() + timeout
+        if self._after_id is not None:
+            if self._armed_for <= due:
+                return
+            self.root.after_cancel(self._after_id)
+        self._armed_for = due
+        self._after_id = self.root.after(max(1, int(timeout * 1000)), self._tick)
+
+    def _tick(self):
+        self._after_id = None
+        self.run_pending()
+        self._arm()
@@ -0,0 +1,423 @@
+"""Capteurs de détection et règles de déclenchement
+
+Chaque capteur est interrogé à sa propre cadence par l'ordonnanceur
+partagé du moteur ; les règles combinent les dernières lectures de tous
+les capteurs pour décider si le poste est en sécurité.
+"""
+import glob
+import os
+import time
+from collections.abc import Mapping
+
+NET_DIR = "/sys/class/net"
+USB_DIR = "/sys/bus/usb/devices"
+LID_GLOB = "/proc/acpi/button/lid/*/state"
+INPUT_DEVICES = "/proc/bus/input/devices"
+INPUT_DIR = "/dev/input"
+INTERRUPTS = "/proc/interrupts"
+
+# Interruptions comptées à défaut d'accès à /dev/input : clavier PS/2, bus i2c (pavés
+# tactiles i2c-hid) et contrôleurs USB (claviers et souris USB, au prix d'un peu de bruit)
+INPUT_IRQ_PATTERNS = ("i8042", "i2c", "hid", "xhci_hcd", "ehci_hcd", "ohci_hcd", "uhci_hcd")
+
+
+class Sensor:
+    """Capteur interrogé toutes les `interval` secondes"""
+
+    name = "base"
+    interval = 1.0
+    critical = False  # True : jamais ralenti par l'ordonnanceur (batterie, veille)
+
+    def poll(self):
+        """Lecture courante (None si indisponible)"""
+        raise NotImplementedError
+
+    def refresh(self):
+        """Lecture sans cache, pour confirmer une compromission (anti-rebond)"""
+        return self.poll()
+
+    def close(self):
+        pass
+
+
+class AcPowerSensor(Sensor):
+    """Secteur et niveau de batterie, via la source d'événements d'alimentation"""
+
+    name = "power"
+    interval = 1.0
+    critical = True
+
+    def __init__(self, power_source):
+        self.power_source = power_source
+
+    def poll(self):
+        return self.power_source.read()
+
+    def refresh(self):
+        return self.power_source.refresh()
+
+
+class LidSensor(Sensor):
+    """Capot de l'ordinateur : « open » / « closed »"""
+
+    name = "lid"
+    interval = 1.0
+    critical = True
+
+    def poll(self):
+        for path in glob.glob(LID_GLOB):
+            try:
+                with open(path) as f:
+                    return f.read().split()[-1]
+            except (OSError, IndexError):
+                continue
+        return None
+
+
+class UsbSensor(Sensor):
+    """Ensemble des périphériques USB branchés"""
+
+    name = "usb"
+    interval = 2.0
+
+    def poll(self):
+        try:
+            # Les entrées « 1-2:1.0 » sont des interfaces, pas des périphériques
+            return frozenset(name for name in os.listdir(USB_DIR) if ":" not in name)
+        except OSError:
+            return None
+
+
+class NetworkLinkSensor(Sensor):
+    """État du lien de chaque interface réseau (hors loopback)"""
+
+    name = "network"
+    interval = 2.0
+
+    def poll(self):
+        links = {}
+        try:
+            names = os.listdir(NET_DIR)
+        except OSError:
+            return None
+        for name in names:
+            if name == "lo":
+                continue
+            try:
+                with open(os.path.join(NET_DIR, name, "operstate")) as f:
+                    links[name] = f.read().strip() == "up"
+            except OSError:
+                continue
+        return links
+
+
+class InputIdleSensor(Sensor):
+    """Secondes écoulées depuis la dernière action au clavier ou au pointeur
+
+    Les périphériques d'entrée (claviers, souris, pavés tactiles, quel que
+    soit leur bus) sont lus en non bloquant dans /dev/input quand c'est
+    permis (groupe input) : chaque lecteur reçoit sa propre copie des
+    événements, rien n'est pris à la session graphique. Sinon, l'activité
+    est déduite des interruptions des contrôleurs d'entrée. None si aucune
+    des deux sources n'existe : l'inactivité n'est alors jamais supposée.
+    """
+
+    name = "input"
+    interval = 2.0
+
+    def __init__(self, patterns=INPUT_IRQ_PATTERNS):
+        self.patterns = patterns
+        self.devices = None  # descripteurs ouverts sur /dev/input/event*, ouverts au premier relevé
+        self.last_count = None
+        self.last_activity = time.monotonic()
+
+    def poll(self):
+        if self.devices is None:
+            self.devices = self._open_devices()
+        active = self._read_devices() if self.devices else self._count_interrupts()
+        if active is None:
+            return None
+        now = time.monotonic()
+        if active:
+            self.last_activity = now
+        return now - self.last_activity
+
+    def _open_devices(self):
+        """Claviers et pointeurs déclarés par le noyau (gestionnaire kbd ou mouse)"""
+        try:
+            with open(INPUT_DEVICES) as f:
+                blocks = f.read().split("\n\n")
+        except OSError:
+            return []
+        devices = []
+        for block in blocks:
+            handlers = next((line.split("=", 1)[1].split() for line in block.splitlines()
+                             if line.startswith("H: Handlers=")), [])
+            if not {"kbd", "mouse"} & {handler.rstrip("0123456789") for handler in handlers}:
+                continue
+            for handler in handlers:
+                if handler.startswith("event"):
+                    try:
+                        devices.append(os.open(os.path.join(INPUT_DIR, handler),
+                                               os.O_RDONLY | os.O_NONBLOCK | os.O_CLOEXEC))
+                    except OSError:
+                        # Accès réservé (hors groupe input) : repli sur les interruptions
+                        pass
+        return devices
+
+    def _read_devices(self):
+        """True si un événement est arrivé depuis le relevé précédent (file vidée au passage)"""
+        active = False
+        for fd in list(self.devices):
+            try:
+                while os.read(fd, 4096):
+                    active = True
+            except BlockingIOError:
+                continue
+            except OSError:
+                # Périphérique retiré
+                os.close(fd)
+                self.devices.remove(fd)
+        return active
+
+    def _count_interrupts(self):
+        """True si le total des interruptions d'entrée a changé ; None si aucune ligne ne correspond"""
+        count = None
+        try:
+            with open(INTERRUPTS) as f:
+                for line in f:
+                    if any(pattern in line for pattern in self.patterns):
+                        count = (count or 0) + sum(int(field) for field in line.split()[1:] if field.isdigit())
+        except OSError:
+            return None
+        if count is None:
+            return None
+        changed = self.last_count is not None and count != self.last_count
+        self.last_count = count
+        return changed
+
+    def close(self):
+        for fd in self.devices or ():
+            os.close(fd)
+        self.devices = None
+
+
+class TemperatureSensor(Sensor):
+    """Température maximale relevée par psutil.sensors_temperatures()"""
+
+    name = "temperature"
+    interval = 10.0
+
+    def poll(self):
+        import psutil
+
+        if not hasattr(psutil, "sensors_temperatures"):
+            return None
+        readings = [
+            entry.current
+            for entries in psutil.sensors_temperatures().values()
+            for entry in entries
+        ]
+        return max(readings) if readings else None
+
+
+class Rule:
+    """Règle de déclenchement évaluée sur les lectures de tous les capteurs"""
+
+    sensor = None
+    message = ""
+
+    def reset(self):
+        """Réinitialisation à l'armement (références de départ)"""
+
+    def check(self, readings, settings):
+        """True si la règle considère le poste compromis"""
+        raise NotImplementedError
+
+
+class PowerRule(Rule):
+    sensor = "power"
+    message = "Alimentation compromise!"
+
+    def check(self, readings, settings):
+        state = readings.get("power")
+        return state is not None and state.plugged is False
+
+
+class BatteryRule(Rule):
+    """Batterie sous le seuil dérivé de la sensibilité, avec hystérésis
+
+    Une fois déclenchée, la règle ne se rétablit qu'au-dessus du seuil plus
+    `hysteresis` points : une lecture qui oscille autour du seuil ne
+    produit pas d'alertes en rafale.
+    """
+
+    sensor = "power"
+    message = "Alimentation compromise!"
+
+    def __init__(self, hysteresis=5.0):
+        self.hysteresis = hysteresis
+        self.active = False
+
+    def reset(self):
+        self.active = False
+
+    def check(self, readings, settings):
+        state = readings.get("power")
+        if state is None or state.percent is None:
+            return False
+        threshold = (11 - settings.sensitivity) * 10
+        if self.active:
+            threshold += self.hysteresis
+        self.active = state.percent < threshold
+        return self.active
+
+
+class SupplyOfflineRule(Rule):
+    """Alimentation désignée (config power_supplies) hors ligne ou retirée
+
+    Par exemple le bloc secteur de la station d'accueil, alors que la
+    batterie ou l'USB-C garde le poste « branché » pour PowerRule. Seule
+    une alimentation présente et en ligne à l'armement est surveillée :
+    un dock absent ou débranché à ce moment-là ne déclenche rien.
+    """
+
+    sensor = "power"
+
+    def __init__(self, supply):
+        self.supply = supply
+        self.message = f"Alimentation {supply} débranchée!"
+        self.baseline = None
+
+    def reset(self):
+        self.baseline = None
+
+    def check(self, readings, settings):
+        state = readings.get("power")
+        if state is None or not state.supplies:
+            return False
+        current = next((supply for supply in state.supplies if supply.name == self.supply), None)
+        if self.baseline is None:
+            self.baseline = current is not None and current.online is not False
+        return self.baseline and (current is None or current.online is False)
+
+
+class LidRule(Rule):
+    sensor = "lid"
+    message = "Capot fermé!"
+
+    def check(self, readings, settings):
+        return readings.get("lid") == "closed"
+
+
+class UsbRemovalRule(Rule):
+    """Retrait d'un périphérique présent au moment de l'armement"""
+
+    sensor = "usb"
+    message = "Périphérique USB retiré!"
+
+    def reset(self):
+        self.baseline = None
+
+    def check(self, readings, settings):
+        devices = readings.get("usb")
+        if devices is None:
+            return False
+        if self.baseline is None:
+            self.baseline = devices
+        return not self.baseline <= devices
+
+
+class NetworkDropRule(Rule):
+    """Perte de lien d'une interface active au moment de l'armement"""
+
+    sensor = "network"
+    message = "Lien réseau perdu!"
+
+    def reset(self):
+        self.baseline = None
+
+    def check(self, readings, settings):
+        links = readings.get("network")
+        if links is None:
+            return False
+        if self.baseline is None:
+            self.baseline = {name for name, up in links.items() if up}
+        return any(not links.get(name, False) for name in self.baseline)
+
+
+class TemperatureRule(Rule):
+    """Température critique, rétablie `hysteresis` degrés sous le seuil"""
+
+    sensor = "temperature"
+    message = "Température critique!"
+
+    def __init__(self, threshold=95.0, hysteresis=5.0):
+        self.threshold = threshold
+        self.hysteresis = hysteresis
+        self.active = False
+
+    def reset(self):
+        self.active = False
+
+    def check(self, readings, settings):
+        temperature = readings.get("temperature")
+        if temperature is None:
+            return False
+        threshold = self.threshold - self.hysteresis if self.active else self.threshold
+        self.active = temperature >= threshold
+        return self.active
+
+
+def to_json(value):
+    """Conversion des lectures de capteurs (namedtuple, ensembles) en types JSON"""
+    if hasattr(value, "_asdict"):
+        return {key: to_json(item) for key, item in value._asdict().items()}
+    if isinstance(value, Mapping):
+        return {str(key): to_json(item) for key, item in value.items()}
+    if isinstance(value, (set, frozenset)):
+        return sorted(to_json(item) for item in value)
+    if isinstance(value, (list, tuple)):
+        return [to_json(item) for item in value]
+    return value
+
+
+# Capteurs disponibles et règles associées par défaut
+SENSORS = {
+    "power": AcPowerSensor,
+    "lid": LidSensor,
+    "usb": UsbSensor,
+    "network": NetworkLinkSensor,
+    "input": InputIdleSensor,
+    "temperature": TemperatureSensor
+}
+DEFAULT_RULES = {
+    "power": (PowerRule, BatteryRule),
+    "lid": (LidRule,),
+    "usb": (UsbRemovalRule,),
+    "network": (NetworkDropRule,),
+    "input": (),
+    "temperature": (TemperatureRule,)
+}
+
+
+def create_detection(names, power_source, intervals=None, supplies=()):
+    """Instanciation des capteurs demandés et de leurs règles
+
+    `intervals` remplace la cadence par défaut de certains capteurs ;
+    `supplies` ajoute au capteur power une règle par alimentation désignée.
+    """
+    sensors = []
+    rules = []
+    for name in names:
+        if name not in SENSORS:
+            raise ValueError(f"Capteur inconnu : {name}")
+        sensor_class = SENSORS[name]
+        sensor = sensor_class(power_source) if name == "power" else sensor_class()
+        if intervals and name in intervals:
+            sensor.interval = intervals[name]
+        sensors.append(sensor)
+        rules.extend(rule_class() for rule_class in DEFAULT_RULES[name])
+        if name == "power":
+            rules.extend(SupplyOfflineRule(supply) for supply in supplies)
+    return sensors, rules
@@ -0,0 +1,79 @@
+"""Machine à états du déclenchement de l'alarme (anti-rebond)"""
+import time
+
+DISARMED = "disarmed"
+ARMED = "armed"
+SUSPECT = "suspect"
+ALARMING = "alarming"
+RECOVERING = "recovering"
+
+# Délais par défaut : confirmation d'une compromission / d'un retour à la normale
+TRIGGER_DEBOUNCE = 0.05
+RECOVER_DEBOUNCE = 3.0
+
+
+class AlarmStateMachine:
+    """disarmed -> armed -> suspect -> alarming -> recovering -> armed
+
+    Une compromission doit durer `trigger_debounce` secondes pour passer de
+    suspect à alarming, et un retour à la normale `recover_debounce`
+    secondes pour passer de recovering à armed. Un contact de chargeur
+    instable ne produit donc ni incidents en rafale ni rechargements audio :
+    une rechute pendant recovering revient à alarming sans nouvel incident.
+    """
+
+    def __init__(self, trigger_debounce=TRIGGER_DEBOUNCE, recover_debounce=RECOVER_DEBOUNCE,
+                 clock=time.monotonic):
+        self.trigger_debounce = trigger_debounce
+        self.recover_debounce = recover_debounce
+        self.clock = clock
+        self.state = DISARMED
+        self.since = clock()
+        self.glitches = 0  # compromissions trop brèves, filtrées
+
+    def _enter(self, state, now, transitions):
+        transitions.append((self.state, state))
+        self.state = state
+        self.since = now
+
+    def arm(self):
+        transitions = []
+        if self.state == DISARMED:
+            self._enter(ARMED, self.clock(), transitions)
+        return transitions
+
+    def disarm(self):
+        transitions = []
+        if self.state != DISARMED:
+            self._enter(DISARMED, self.clock(), transitions)
+        return transitions
+
+    def update(self, compromised, now=None):
+        """Prise en compte d'une évaluation des règles ; renvoie les transitions (ancien, nouveau)"""
+        now = self.clock() if now is None else now
+        transitions = []
+
+        if self.state == ARMED and compromised:
+            self._enter(SUSPECT, now, transitions)
+        elif self.state == SUSPECT and not compromised:
+            self.glitches += 1
+            self._enter(ARMED, now, transitions)
+        elif self.state == ALARMING and not compromised:
+            self._enter(RECOVERING, now, transitions)
+        elif self.state == RECOVERING and compromised:
+            self._enter(ALARMING, now, transitions)
+
+        # Confirmation une fois le délai d'anti-rebond écoulé (éventuellement nul) ;
+        # comparaison à next_deadline() pour qu'une mise à jour à l'échéance exacte confirme
+        deadline = self.next_deadline()
+        if deadline is not None and now >= deadline:
+            self._enter(ALARMING if self.state == SUSPECT else ARMED, now, transitions)
+        return transitions
+
+    def next_deadline(self):
+        """Instant où l'état courant doit être réévalué (None si stable)"""
+        if self.state == SUSPECT:
+            return self.since + self.trigger_debounce
+        if self.state == RECOVERING:
+            return self.since + self.recover_debounce
+        return None
@@ -0,0 +1,245 @@
+"""Superviseur : relance du moniteur en cas de plantage ou de blocage
+
+    python supervisor.py [options de alarm.py]
+
+Le superviseur lance alarm.py avec un tube de battements de cœur
+(--heartbeat-fd). Le moniteur y écrit une ligne par seconde depuis sa
+boucle principale (thread Tk ou boucle headless) : son état et l'âge de
+la dernière itération de la boucle de surveillance. Sans battement
+pendant HANG_TIMEOUT secondes, ou si la boucle de surveillance d'un
+moniteur armé ne tourne plus, le moniteur est tué puis relancé.
+
+Si le moniteur disparaît alors qu'il était armé (plantage, kill -9, ou
+même SIGTERM et fermeture propre sans désarmement), le superviseur donne
+lui-même l'alerte (notification, son si un lecteur est disponible) et
+relance le moniteur armé, qui déclenche aussitôt son alarme (--tamper) et
+prend le relais. Seul un arrêt après désarmement explicite (interface,
+`control.py disarm` ou `control.py shutdown`, réservés à l'utilisateur)
+envoie « exit » et termine le superviseur.
+"""
+import logging
+import os
+import select
+import shutil
+import signal
+import subprocess
+import sys
+import time
+
+from audio import DEFAULT_ALARM_FILE, resolve_sound_path
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ALARM_SCRIPT = os.path.join(HERE, "alarm.py")
+
+# Battements de cœur : période côté moniteur, délais de détection côté superviseur
+HEARTBEAT_INTERVAL = 1.0
+HANG_TIMEOUT = 5.0
+STARTUP_TIMEOUT = 20.0
+
+# Relance : immédiate si le moniteur avait démarré, attente doublée s'il meurt avant son
+# premier battement (plantage en boucle au démarrage)
+RESTART_DELAY = 0.05
+RESTART_DELAY_MAX = 5.0
+
+# Lecteurs en ligne de commande essayés pour le son d'alarme du superviseur (en boucle)
+SOUND_COMMANDS = (
+    ("mpg123", "-q", "--loop", "-1"),
+    ("ffplay", "-nodisp", "-loglevel", "quiet", "-loop", "0"),
+)
+
+# "interrupted" : arrêt propre du moteur alors qu'il était encore armé
+ARMED_STATES = ("armed", "alarming", "interrupted")
+
+
+class Heartbeat:
+    """Côté moniteur : écriture des battements dans le tube du superviseur
+
+    beat() est appelé périodiquement par l'ordonnanceur du thread principal ;
+    les changements d'état du moteur sont signalés immédiatement (une
+    écriture de moins de PIPE_BUF octets est atomique, quel que soit le thread).
+    """
+
+    def __init__(self, engine, fd):
+        self.engine = engine
+        self.fd = fd
+        os.set_blocking(fd, False)
+        engine.subscribe(self.on_engine_event)
+
+    def state(self):
+        engine = self.engine
+        if engine.alert_active:
+            return "alarming"
+        return "armed" if engine.monitoring_active else "disarmed"
+
+    def beat(self):
+        engine = self.engine
+        loop_age = 0.0
+        if engine.monitoring_active and engine.loop_time is not None:
+            loop_age = max(0.0, engine.clock() - engine.loop_time)
+        self._write(f"{self.state()} {loop_age:.3f}\n")
+
+    def on_engine_event(self, event, data):
+        if event in ("started", "stopped", "alert", "alert_stopped"):
+            self.beat()
+        elif event == "shutdown":
+            # Les battements envoyés pendant l'arrêt disent déjà « disarmed » : l'état armé
+            # est celui d'avant l'arrêt
+            self._write("interrupted\n" if data.get("armed") else "exit\n")
+
+    def _write(self, line):
+        if self.fd is None:
+            return
+        try:
+            os.write(self.fd, line.encode())
+        except BlockingIOError:
+            pass
+        except OSError:
+            # Superviseur disparu : le moniteur continue seul
+            self.fd = None
+
+
+class Supervisor:
+    """Lancement, surveillance et relance du moniteur"""
+
+    def __init__(self, args, command=None, hang_timeout=HANG_TIMEOUT, startup_timeout=STARTUP_TIMEOUT):
+        self.args = [arg for arg in args if arg not in ("--arm", "--tamper")]
+        self.command = command or [sys.executable, ALARM_SCRIPT]
+        self.hang_timeout = hang_timeout
+        self.startup_timeout = startup_timeout
+        self.headless = "--headless" in args
+        self.child = None
+        self.state = "armed" if "--arm" in args else None
+        self.restarts = 0
+        self.sound = None
+        self.stopping = False
+        self._reader = None
+
+    def spawn(self, armed=False, tamper=False):
+        read_fd, write_fd = os.pipe()
+        args = list(self.args)
+        if armed and not self.headless:
+            args.append("--arm")
+        if tamper:
+            args.append("--tamper")
+        self.child = subprocess.Popen(
+            self.command + args + ["--heartbeat-fd", str(write_fd)],
+            pass_fds=(write_fd,)
+        )
+        os.close(write_fd)
+        self._reader = read_fd
+        self.spawned = time.monotonic()
+        self.beats = 0
+        self.state = None
+        self.spawned_armed = armed or self.headless
+
+    def watch(self):
+        """Lecture des battements jusqu'à l'arrêt du moniteur : "exit", "crash" ou "hang" """
+        buffer = b""
+        last_beat = self.spawned
+        try:
+            while True:
+                timeout = self.hang_timeout if self.beats else self.startup_timeout
+                remaining = last_beat + timeout - time.monotonic()
+                if remaining <= 0:
+                    return "hang"
+                if not select.select([self._reader], [], [], remaining)[0]:
+                    continue
+                try:
+                    data = os.read(self._reader, 4096)
+                except InterruptedError:
+                    continue
+                if not data:
+                    return "exit" if self.state == "exit" else "crash"
+                buffer += data
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    state, _, loop_age = line.decode().partition(" ")
+                    last_beat = time.monotonic()
+                    self.beats += 1
+                    self.on_state(state)
+                    if state in ARMED_STATES and loop_age and float(loop_age) > self.hang_timeout:
+                        logging.error("Boucle de surveillance bloquée depuis %s s", loop_age)
+                        return "hang"
+        finally:
+            os.close(self._reader)
+
+    def on_state(self, state):
+        if state != self.state:
+            logging.info("Moniteur %d : %s", self.child.pid, state)
+        self.state = state
+        # Le moniteur relancé a pris le relais de l'alarme (ou a été arrêté normalement)
+        if state in ("alarming", "exit"):
+            self.stop_sound()
+
+    def run(self):
+        """Boucle de supervision ; renvoie le code de sortie du dernier moniteur"""
+        self.spawn(armed=self.state == "armed")
+        delay = RESTART_DELAY
+        while True:
+            outcome = self.watch()
+            if outcome == "hang":
+                logging.error("Moniteur %d bloqué : arrêt forcé", self.child.pid)
+                self.child.kill()
+            code = self.child.wait()
+            if outcome == "exit" or self.stopping:
+                if outcome != "exit" and self.state in ARMED_STATES:
+                    logging.critical("Superviseur arrêté alors que le moniteur %d était armé", self.child.pid)
+                self.stop_sound()
+                return code
+
+            # Moniteur tué avant son premier battement : il devait être armé s'il a été lancé armé
+            armed = self.state in ARMED_STATES if self.state is not None else self.spawned_armed
+            if not self.beats and self.restarts == 0 and code >= 0:
+                # Échec au démarrage (configuration invalide...) : inutile de relancer
+                logging.error("Le moniteur n'a pas démarré (code %s)", code)
+                return code or 1
+            if armed:
+                self.raise_alarm(f"Moniteur interrompu alors qu'il était armé ({outcome}, code {code})")
+
+            if self.beats:
+                delay = RESTART_DELAY
+            time.sleep(delay)
+            delay = min(delay * 2, RESTART_DELAY_MAX)
+            self.restarts += 1
+            logging.warning("Relance du moniteur (%s, %s)", outcome, "armé" if armed else "désarmé")
+            self.spawn(armed=armed, tamper=armed)
+
+    def raise_alarm(self, message):
+        """Alerte donnée par le superviseur lui-même, en attendant le moniteur relancé"""
+        logging.critical(message)
+        from notifications import DesktopBackend
+
+        DesktopBackend().show("Alerte de Sécurité", message, 10000, alert=True)
+        if self.sound is None:
+            sound_path = resolve_sound_path(DEFAULT_ALARM_FILE)
+            for command in SOUND_COMMANDS:
+                if shutil.which(command[0]):
+                    self.sound = subprocess.Popen(
+                        [*command, sound_path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                    )
+                    break
+
+    def stop_sound(self):
+        if self.sound is not None:
+            self.sound.terminate()
+            self.sound.wait()
+            self.sound = None
+
+    def stop(self):
+        """Arrêt demandé (signal) : le moniteur est arrêté proprement, sans relance"""
+        self.stopping = True
+        if self.child is not None and self.child.poll() is None:
+            self.child.terminate()
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else argv
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - superviseur - %(levelname)s - %(message)s")
+    supervisor = Supervisor(args)
+    signal.signal(signal.SIGTERM, lambda *_: supervisor.stop())
+    signal.signal(signal.SIGINT, lambda *_: supervisor.stop())
+    return supervisor.run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+import os
+import sys
+
+import pytest
+
+# Modules de l'application à la racine du dépôt
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from replay import EventRecorder, NullAlarmPlayer, TracePowerSource, VirtualClock, replay  # noqa: E402
+
+
+@pytest.fixture
+def supply_tree(tmp_path):
+    """Dossier power_supply factice (voir bench.make_power_supply_tree) : AC, BAT0, BAT1, USB-C, souris"""
+    from bench import make_power_supply_tree
+
+    root = tmp_path / "power_supply"
+    make_power_supply_tree(str(root))
+    return root
+
+
+@pytest.fixture
+def run_trace(tmp_path):
+    """Rejeu d'une trace dans un moteur headless (son factice, journaux dans tmp_path)"""
+    from config import Config
+    from engine import MonitorEngine
+
+    def run(trace, seconds, wake_on_event=True, **config):
+        clock = VirtualClock()
+        source = TracePowerSource(trace, clock)
+        player = NullAlarmPlayer(clock)
+        recorder = EventRecorder(clock)
+        engine = MonitorEngine(Config(log_dir=str(tmp_path), **config), clock=clock, player=player,
+                               power_source_factory=lambda: source)
+        engine.subscribe(recorder)
+        try:
+            replay(engine, source, clock, seconds, wake_on_event)
+        finally:
+            engine.shutdown()
+        return engine, source, player, recorder
+
+    return run
@@ -0,0 +1,49 @@
+import math
+
+from metrics import MetricsHistory
+
+
+def history(values, capacity=None):
+    """Un échantillon par seconde, horodatés 1..len(values)"""
+    history = MetricsHistory(capacity=capacity or len(values))
+    for t, value in enumerate(values, start=1):
+        history.append(value or 0.0, 40.0, battery=value, timestamp=float(t))
+    return history
+
+
+def test_latest_and_empty_history():
+    empty = MetricsHistory(capacity=4)
+    assert empty.latest("cpu") is None
+    assert empty.stats("cpu", 60, now=10.0) is None
+    samples = history([1.0, 2.0, None])
+    assert samples.latest("timestamp") == 3.0
+    assert samples.latest("battery") is None
+
+
+def test_stats_cover_only_the_window_and_skip_missing_values():
+    samples = history([90.0, 10.0, None, 30.0, 20.0])
+    assert samples.stats("battery", 2, now=5.0) == {"min": 20.0, "max": 30.0, "mean": 25.0}
+    assert samples.stats("battery", 60, now=5.0) == {"min": 10.0, "max": 90.0, "mean": 37.5}
+    assert history([10.0, None]).stats("battery", 0.5, now=2.0) is None
+
+
+def test_stats_after_wrap_around():
+    samples = history([float(i) for i in range(10)], capacity=4)
+    assert len(samples) == 4
+    assert samples.latest("cpu") == 9.0
+    assert samples.stats("cpu", 3600, now=10.0) == {"min": 6.0, "max": 9.0, "mean": 7.5}
+
+
+def test_decimate_matches_a_per_sample_reduction():
+    values = [None if i % 7 == 0 else 50 + 40 * math.sin(i / 5) for i in range(1, 301)]
+    samples = history(values, capacity=256)
+    now, seconds, buckets = 300.0, 200.0, 37
+    lows, highs = samples.decimate("battery", seconds, buckets, now)
+
+    start, step = now - seconds, seconds / buckets
+    expected = [[] for _ in range(buckets)]
+    for t, value in enumerate(values, start=1):
+        if value is not None and t >= start:
+            expected[min(buckets - 1, int((t - start) / step))].append(value)
+    assert lows == [min(column) if column else None for column in expected]
+    assert highs == [max(column) if column else None for column in expected]
@@ -0,0 +1,146 @@
+import shutil
+
+from config import Config
+from engine import MonitorEngine
+from power import PowerEventSource, PowerSupplies
+from replay import NullAlarmPlayer, VirtualClock
+from sensors import SupplyOfflineRule
+
+
+def write(root, supply, attr, value):
+    (root / supply).mkdir(exist_ok=True)
+    (root / supply / attr).write_text(value + "\n")
+
+
+def model(root):
+    clock = VirtualClock()
+    return PowerSupplies(str(root), clock=clock), clock
+
+
+def names(state):
+    return [supply.name for supply in state.supplies]
+
+
+def test_batteries_are_weighted_by_design_capacity(supply_tree):
+    supplies, _ = model(supply_tree)
+    state = supplies.snapshot()
+    # BAT0 81 % de 57 Wh, BAT1 64 % de 23 Wh ; la batterie de souris (scope Device) n'y entre pas
+    assert state.percent == (81 * 57 + 64 * 23) / (57 + 23)
+    assert state.plugged is True
+    assert "hidpp_battery_0" in names(state)
+    supplies.close()
+
+
+def test_usb_c_alone_keeps_the_machine_plugged(supply_tree):
+    write(supply_tree, "AC", "online", "0")
+    write(supply_tree, "ucsi-source-psy-USBC000:001", "online", "1")
+    supplies, _ = model(supply_tree)
+    assert supplies.snapshot().plugged is True
+    write(supply_tree, "ucsi-source-psy-USBC000:001", "online", "0")
+    supplies.invalidate()
+    assert supplies.snapshot().plugged is False
+    supplies.close()
+
+
+def test_snapshot_is_shared_until_it_expires_or_is_invalidated(supply_tree):
+    supplies, clock = model(supply_tree)
+    first = supplies.snapshot()
+    write(supply_tree, "AC", "online", "0")
+    assert supplies.snapshot() is first
+    clock.now += supplies.max_age
+    assert supplies.snapshot().plugged is False
+    write(supply_tree, "AC", "online", "1")
+    supplies.invalidate()
+    assert supplies.snapshot().plugged is True
+    assert supplies.reads == 3
+    supplies.close()
+
+
+def test_supplies_added_or_removed_are_rediscovered(supply_tree):
+    supplies, _ = model(supply_tree)
+    supplies.snapshot()
+    write(supply_tree, "ADP1", "type", "Mains")
+    write(supply_tree, "ADP1", "online", "1")
+    supplies.invalidate(rediscover=True)
+    assert "ADP1" in names(supplies.snapshot())
+
+    shutil.rmtree(supply_tree / "AC")
+    shutil.rmtree(supply_tree / "BAT1")
+    supplies.invalidate(rediscover=True)
+    state = supplies.snapshot()
+    assert "AC" not in names(state) and "BAT1" not in names(state)
+    assert state.percent == 81.0
+    supplies.close()
+
+
+def test_named_supply_alarms_when_unplugged_or_removed_after_arming(supply_tree):
+    supplies, _ = model(supply_tree)
+    rule = SupplyOfflineRule("AC")
+
+    def check(rediscover=False):
+        supplies.invalidate(rediscover)
+        return rule.check({"power": supplies.snapshot()}, None)
+
+    rule.reset()
+    assert check() is False
+    write(supply_tree, "AC", "online", "0")
+    assert check() is True
+    write(supply_tree, "AC", "online", "1")
+    assert check() is False
+    shutil.rmtree(supply_tree / "AC")
+    assert check(rediscover=True) is True
+    supplies.close()
+
+
+def test_named_supply_absent_or_offline_when_armed_is_ignored(supply_tree):
+    supplies, _ = model(supply_tree)
+    absent = SupplyOfflineRule("ADP1")
+    offline = SupplyOfflineRule("ucsi-source-psy-USBC000:001")
+    readings = {"power": supplies.snapshot()}
+    for rule in (absent, offline):
+        rule.reset()
+        assert rule.check(readings, None) is False
+
+    # Le dock branché plus tard puis retiré ne compte pas : il n'était pas là à l'armement
+    write(supply_tree, "ADP1", "type", "Mains")
+    write(supply_tree, "ADP1", "online", "1")
+    supplies.invalidate(rediscover=True)
+    shutil.rmtree(supply_tree / "ADP1")
+    supplies.invalidate(rediscover=True)
+    readings = {"power": supplies.snapshot()}
+    assert absent.check(readings, None) is False
+    assert offline.check(readings, None) is False
+
+    # Réarmement : nouvelle référence
+    write(supply_tree, "ucsi-source-psy-USBC000:001", "online", "1")
+    supplies.invalidate()
+    offline.reset()
+    assert offline.check({"power": supplies.snapshot()}, None) is False
+    write(supply_tree, "ucsi-source-psy-USBC000:001", "online", "0")
+    supplies.invalidate()
+    assert offline.check({"power": supplies.snapshot()}, None) is True
+    supplies.close()
+
+
+class SnapshotSource(PowerEventSource):
+    def __init__(self, supplies):
+        super().__init__()
+        self.supplies = supplies
+
+    def read(self):
+        return self.supplies.snapshot()
+
+
+def test_unknown_supply_names_are_reported_and_not_watched(supply_tree, tmp_path):
+    supplies, _ = model(supply_tree)
+    engine = MonitorEngine(Config(log_dir=str(tmp_path), power_supplies=("AC", "ADP1")),
+                           player=NullAlarmPlayer(), power_source_factory=lambda: SnapshotSource(supplies))
+    logs = []
+    engine.subscribe(lambda event, data: event == "log" and logs.append(data["message"]))
+    try:
+        engine.start(threaded=False)
+        assert [rule.supply for rule in engine.rules if isinstance(rule, SupplyOfflineRule)] == ["AC"]
+        assert any("ADP1" in message for message in logs)
+    finally:
+        engine.shutdown()
+        supplies.close()
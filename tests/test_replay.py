@@ -0,0 +1,37 @@
+import pytest
+
+from replay import flaky_trace, unplug_trace
+
+
+@pytest.mark.parametrize("wake_on_event", [True, False], ids=["uevent", "polling"])
+def test_flaky_charger_raises_no_incident(run_trace, wake_on_event):
+    # 24 h de micro-coupures plus courtes que l'anti-rebond
+    trace = flaky_trace(86400.0)
+    engine, _, player, _ = run_trace(trace, 86400.0, wake_on_event=wake_on_event)
+    assert engine.incident_count == 0
+    assert player.plays == []
+    assert engine.state_machine.glitches > 0
+
+
+@pytest.mark.parametrize("wake_on_event", [True, False], ids=["uevent", "polling"])
+def test_unplug_is_confirmed_once(run_trace, wake_on_event):
+    engine, _, player, _ = run_trace(unplug_trace(at=10.0, duration=30.0), 60.0, wake_on_event=wake_on_event)
+    assert engine.incident_count == 1
+    assert len(player.plays) == 1
+
+
+def test_uevent_detects_faster_than_polling(run_trace):
+    latencies = {}
+    for wake_on_event in (True, False):
+        samples = []
+        for run in range(10):
+            at = 10.0 + run * 0.0537  # phases variées par rapport à la grille des relevés
+            _, source, player, _ = run_trace(unplug_trace(at=at), at + 10.0, wake_on_event=wake_on_event)
+            samples.append(player.plays[0] - source.times[1])
+        latencies[wake_on_event] = sorted(samples)
+
+    # Réveil sur uevent : l'alarme suit le débranchement de l'anti-rebond exactement
+    assert latencies[True][-1] == pytest.approx(0.05, abs=1e-6)
+    # Polling à 1 s : jusqu'à un intervalle de relevé en plus
+    assert latencies[False][-1] <= 1.0 + 0.05 + 1e-6
+    assert latencies[False][len(latencies[False]) // 2] > latencies[True][-1]
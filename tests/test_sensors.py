@@ -0,0 +1,63 @@
+import os
+
+import sensors
+from sensors import InputIdleSensor
+
+INTERRUPTS = """           CPU0       CPU1
+  1:        {kbd}          0   IO-APIC   1-edge      i8042
+ 16:        {pad}         12   IO-APIC  16-fasteoi   i2c_designware.0, idma64.0
+"""
+NO_INPUT_INTERRUPTS = """           CPU0
+ 24:          1  IO-APIC   5-edge      ACPI:Ged
+"""
+
+
+def write(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def input_sensor(monkeypatch, tmp_path, interrupts, devices=""):
+    monkeypatch.setattr(sensors, "INTERRUPTS", str(tmp_path / "interrupts"))
+    monkeypatch.setattr(sensors, "INPUT_DEVICES", str(tmp_path / "devices"))
+    monkeypatch.setattr(sensors, "INPUT_DIR", str(tmp_path))
+    write(tmp_path / "interrupts", interrupts)
+    write(tmp_path / "devices", devices)
+    sensor = InputIdleSensor()
+    sensor.last_activity -= 600
+    return sensor
+
+
+def test_touchpad_interrupts_count_as_activity(monkeypatch, tmp_path):
+    sensor = input_sensor(monkeypatch, tmp_path, INTERRUPTS.format(kbd=10, pad=500))
+    assert sensor.poll() >= 600
+    # Clavier PS/2 immobile, pavé tactile i2c-hid utilisé
+    write(tmp_path / "interrupts", INTERRUPTS.format(kbd=10, pad=520))
+    assert sensor.poll() < 1
+
+
+def test_no_input_source_means_no_idle_reading(monkeypatch, tmp_path):
+    sensor = input_sensor(monkeypatch, tmp_path, NO_INPUT_INTERRUPTS)
+    assert sensor.poll() is None
+    assert sensor.poll() is None
+
+
+def test_readable_event_devices_take_precedence(monkeypatch, tmp_path):
+    devices = ('I: Bus=0018 Vendor=06cb Product=cd8b Version=0100\n'
+               'N: Name="SYNA8004:00 06CB:CD8B Touchpad"\n'
+               'H: Handlers=mouse1 event7\n\n'
+               'I: Bus=0019 Vendor=0000 Product=0001 Version=0000\n'
+               'N: Name="Power Button"\n'
+               'H: Handlers=kbd event0\n')
+    os.mkfifo(tmp_path / "event7")
+    sensor = input_sensor(monkeypatch, tmp_path, NO_INPUT_INTERRUPTS, devices)
+    assert sensor.poll() >= 600
+    # Seul le pavé tactile existe ici (event0 absent)
+    assert len(sensor.devices) == 1
+    writer = os.open(tmp_path / "event7", os.O_WRONLY | os.O_NONBLOCK)
+    try:
+        os.write(writer, b"\0" * 24)
+        assert sensor.poll() < 1
+    finally:
+        os.close(writer)
+        sensor.close()
@@ -0,0 +1,80 @@
+from replay import VirtualClock
+from states import ALARMING, ARMED, DISARMED, RECOVERING, SUSPECT, AlarmStateMachine
+
+
+def machine(trigger=0.05, recover=3.0):
+    clock = VirtualClock(0.0)
+    return AlarmStateMachine(trigger, recover, clock=clock), clock
+
+
+def test_arm_and_disarm():
+    states, _ = machine()
+    assert states.arm() == [(DISARMED, ARMED)]
+    assert states.arm() == []
+    assert states.disarm() == [(ARMED, DISARMED)]
+    assert states.disarm() == []
+
+
+def test_short_compromise_is_a_glitch():
+    states, clock = machine()
+    states.arm()
+    assert states.update(True) == [(ARMED, SUSPECT)]
+    clock.now = 0.03
+    assert states.update(False) == [(SUSPECT, ARMED)]
+    assert states.glitches == 1
+    assert states.next_deadline() is None
+
+
+def test_sustained_compromise_alarms_at_the_deadline():
+    states, clock = machine()
+    states.arm()
+    states.update(True)
+    assert states.next_deadline() == 0.05
+    clock.now = 0.04
+    assert states.update(True) == []
+    clock.now = 0.05
+    assert states.update(True) == [(SUSPECT, ALARMING)]
+    assert states.state == ALARMING
+
+
+def test_zero_debounce_alarms_immediately():
+    states, _ = machine(trigger=0.0)
+    states.arm()
+    assert states.update(True) == [(ARMED, SUSPECT), (SUSPECT, ALARMING)]
+
+
+def test_relapse_while_recovering_returns_to_alarming():
+    states, clock = machine()
+    states.arm()
+    states.update(True)
+    clock.now = 0.05
+    states.update(True)
+    clock.now = 1.0
+    assert states.update(False) == [(ALARMING, RECOVERING)]
+    clock.now = 2.0
+    # Pas de passage par suspect : aucun nouvel incident
+    assert states.update(True) == [(RECOVERING, ALARMING)]
+
+
+def test_recovery_confirmed_after_recover_debounce():
+    states, clock = machine()
+    states.arm()
+    states.update(True)
+    clock.now = 0.05
+    states.update(True)
+    clock.now = 1.0
+    states.update(False)
+    clock.now = 3.5
+    assert states.update(False) == []
+    clock.now = 4.0
+    assert states.update(False) == [(RECOVERING, ARMED)]
+
+
+def test_disarm_from_alarming():
+    states, clock = machine()
+    states.arm()
+    states.update(True)
+    clock.now = 0.05
+    states.update(True)
+    assert states.disarm() == [(ALARMING, DISARMED)]
+    assert states.next_deadline() is None